@@ -4,21 +4,11 @@ Script de análise de balanceamento entre camadas ontológicas
 Identifica desbalanceamentos e sugere reclassificações
 """
 
-import json
 import sys
 from collections import Counter
-from pathlib import Path
 import statistics
 
-# Caminhos
-BASE_DIR = Path(__file__).parent.parent
-CONCEPTS_FILE = BASE_DIR / 'assets' / 'concepts.json'
-
-
-def load_json(filepath):
-    """Carrega arquivo JSON com encoding UTF-8"""
-    with open(filepath, 'r', encoding='utf-8') as f:
-        return json.load(f)
+from ontology import CONCEPTS_FILE, load_json
 
 
 def analyze_balance(concepts):
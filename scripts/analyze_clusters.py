@@ -2,85 +2,58 @@
 """
 Análise e demarcação de clusters na ontologia CRIOS
 Identifica comunidades densas para visualização no rizoma 3D
-"""
-
-import json
-from collections import defaultdict, Counter
-from pathlib import Path
-
-BASE_DIR = Path(__file__).parent.parent
-CONCEPTS_FILE = BASE_DIR / 'assets' / 'concepts.json'
-RELATIONS_FILE = BASE_DIR / 'assets' / 'relations.json'
-
-
-def load_json(filepath):
-    with open(filepath, 'r', encoding='utf-8') as f:
-        return json.load(f)
 
+Uso:
+    python3 scripts/analyze_clusters.py                   # comunidades por Leiden
+    python3 scripts/analyze_clusters.py --method=lpa      # leiden | louvain | lpa
+    python3 scripts/analyze_clusters.py --seed=7
+    python3 scripts/analyze_clusters.py --samples=200     # betweenness por 200 pivôs
+"""
 
-def save_json(filepath, data):
-    with open(filepath, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+import sys
+from collections import Counter, defaultdict
 
+import numpy as np
 
-def build_adjacency_graph(concepts, relations):
-    """Constrói grafo de adjacência"""
-    graph = defaultdict(set)
-    
-    for rel in relations:
-        graph[rel['from']].add(rel['to'])
-        graph[rel['to']].add(rel['from'])
-    
-    return graph
+from ontology import ASSETS_DIR, OntologyGraph, save_json
+from ontology.centrality import betweenness
+from ontology.communities import METHODS, detect_communities, leiden_fallback
+from ontology.metrics import node_metrics
+from ontology.ranking import compute_rankings
 
+# Hubs listados por comunidade estrutural
+COMMUNITY_HUBS = 10
 
-def calculate_clustering_coefficient(concept_id, graph):
-    """Calcula coeficiente de agrupamento local"""
-    neighbors = graph[concept_id]
-    k = len(neighbors)
-    
-    if k < 2:
-        return 0.0
-    
-    # Conta conexões entre vizinhos
-    connections = 0
-    for n1 in neighbors:
-        for n2 in neighbors:
-            if n1 != n2 and n2 in graph[n1]:
-                connections += 1
-    
-    # Divide por 2 (bidirecional) e normaliza
-    return connections / (k * (k - 1))
 
-
-def detect_communities_by_layer(concepts, graph):
+def detect_communities_by_layer(graph, csr=None, metrics=None, rankings=None):
     """Detecta comunidades densas por camada ontológica"""
+    csr = graph.to_csr() if csr is None else csr
+    metrics = node_metrics(csr) if metrics is None else metrics
+    rankings = compute_rankings(csr) if rankings is None else rankings
+    layer_codes = {layer: code for code, layer in enumerate(csr.layers)}
     layer_communities = defaultdict(list)
     
-    for concept in concepts:
+    for concept in graph.concepts:
         layer = concept.get('layer', 'unknown')
-        concept_id = concept['id']
+        node = csr.node(concept['id'])
         
-        # Calcula densidade local
-        neighbors = graph[concept_id]
-        same_layer_neighbors = [
-            c for c in concepts 
-            if c['id'] in neighbors and c.get('layer') == layer
-        ]
-        
-        # Métricas de cluster
-        degree = len(neighbors)
-        same_layer_degree = len(same_layer_neighbors)
-        clustering_coef = calculate_clustering_coefficient(concept_id, graph)
+        # Métricas de cluster (vizinhos na camada desta entrada)
+        degree = int(metrics['degree'][node])
+        code = layer_codes.get(concept.get('layer'))
+        same_layer_degree = int(metrics['by_layer'][node, code]) if code is not None else 0
+        clustering_coef = float(metrics['clustering'][node])
         
         cluster_info = {
-            'id': concept_id,
+            'id': concept['id'],
             'name': concept['name'],
             'layer': layer,
             'degree': degree,
             'same_layer_degree': same_layer_degree,
             'clustering_coefficient': clustering_coef,
-            'cluster_score': clustering_coef * degree  # Score composto
+            'cluster_score': clustering_coef * degree,  # Score composto
+            'pagerank': float(rankings['pagerank'][node]),
+            'eigenvector': float(rankings['eigenvector'][node]),
+            'kcore': int(rankings['kcore'][node])
         }
         
         layer_communities[layer].append(cluster_info)
@@ -93,8 +66,8 @@ def identify_hub_clusters(communities, min_cluster_size=5):
     hub_clusters = {}
     
     for layer, members in communities.items():
-        # Ordena por cluster score
-        sorted_members = sorted(members, key=lambda x: -x['cluster_score'])
+        # Ordena por PageRank ponderado (empates pelo cluster score)
+        sorted_members = sorted(members, key=lambda x: (-x['pagerank'], -x['cluster_score']))
         
         # Identifica hubs (top 20% ou min 5)
         hub_count = max(min_cluster_size, len(members) // 5)
@@ -115,25 +88,29 @@ def identify_hub_clusters(communities, min_cluster_size=5):
     return hub_clusters
 
 
-def detect_cross_layer_bridges(concepts, graph):
+def detect_cross_layer_bridges(graph, csr=None, metrics=None):
     """Identifica conceitos-ponte entre camadas"""
+    csr = graph.to_csr() if csr is None else csr
+    metrics = node_metrics(csr) if metrics is None else metrics
+    by_layer = metrics['by_layer']
+    # Vizinhos que são conceitos mas não têm camada contam como 'unknown'
+    unknown = metrics['concept_degree'] - by_layer.sum(axis=1)
     bridges = []
     
-    for concept in concepts:
+    for concept in graph.concepts:
         concept_id = concept['id']
         layer = concept.get('layer', 'unknown')
-        neighbors = graph[concept_id]
+        node = csr.node(concept_id)
         
         # Conta conexões por camada
-        layer_connections = defaultdict(int)
-        for neighbor_id in neighbors:
-            neighbor = next((c for c in concepts if c['id'] == neighbor_id), None)
-            if neighbor:
-                neighbor_layer = neighbor.get('layer', 'unknown')
-                layer_connections[neighbor_layer] += 1
+        layer_connections = {
+            name: int(count) for name, count in zip(csr.layers, by_layer[node]) if count
+        }
+        if unknown[node]:
+            layer_connections['unknown'] = layer_connections.get('unknown', 0) + int(unknown[node])
         
         # É ponte se conecta significativamente (>30%) com outras camadas
-        total_neighbors = len(neighbors)
+        total_neighbors = int(metrics['degree'][node])
         other_layer_connections = sum(
             count for l, count in layer_connections.items() if l != layer
         )
@@ -147,27 +124,124 @@ def detect_cross_layer_bridges(concepts, graph):
                     'name': concept['name'],
                     'layer': layer,
                     'bridge_ratio': bridge_ratio,
-                    'connections_by_layer': dict(layer_connections),
+                    'connections_by_layer': layer_connections,
                     'total_connections': total_neighbors
                 })
     
     return sorted(bridges, key=lambda x: -x['bridge_ratio'])
 
 
-def generate_cluster_metadata(concepts, relations):
+def describe_communities(graph, csr, labels, quality, method, seed):
+    """Metadados das comunidades estruturais: camadas, hubs e membros"""
+    # Hubs: mais vizinhos dentro da própria comunidade
+    rows = np.repeat(np.arange(csr.n), csr.degree())
+    inside = labels[rows] == labels[csr.und_indices]
+    internal_degree = np.bincount(rows[inside], minlength=csr.n)
+    
+    members = defaultdict(list)
+    for node in range(csr.n_concepts):
+        members[int(labels[node])].append(node)
+    
+    clusters = []
+    for label in sorted(members):
+        nodes = members[label]
+        layers = Counter(graph.layer(csr.ids[node], 'unknown') for node in nodes)
+        ranked = sorted(nodes, key=lambda node: (-internal_degree[node], node))
+        clusters.append({
+            'id': label,
+            'size': len(nodes),
+            'dominant_layer': layers.most_common(1)[0][0],
+            'layers': dict(layers.most_common()),
+            'hubs': [
+                {
+                    'id': csr.ids[node],
+                    'name': graph.name(csr.ids[node]),
+                    'internal_degree': int(internal_degree[node]),
+                    'degree': int(csr.degree()[node]),
+                }
+                for node in ranked[:COMMUNITY_HUBS]
+            ],
+        })
+    
+    return {
+        'method': method,
+        'seed': seed,
+        'modularity': quality,
+        'count': len(clusters),
+        'clusters': clusters,
+        'membership': {csr.ids[node]: int(labels[node]) for node in range(csr.n_concepts)},
+    }
+
+
+def rank_structural_bridges(graph, csr, metrics, labels, values):
+    """
+    Conceitos por betweenness decrescente, com quantas comunidades e
+    camadas seus vizinhos alcançam
+    """
+    rows = np.repeat(np.arange(csr.n, dtype=np.int64), csr.degree())
+    count = int(labels.max()) + 1
+    pairs = np.unique(rows * count + labels[csr.und_indices])
+    communities_reached = np.bincount(pairs // count, minlength=csr.n)
+    layers_reached = np.count_nonzero(metrics['by_layer'], axis=1)
+    
+    ranked = sorted(range(csr.n_concepts), key=lambda node: (-values[node], node))
+    return [
+        {
+            'id': csr.ids[node],
+            'name': graph.name(csr.ids[node]),
+            'layer': graph.layer(csr.ids[node], 'unknown'),
+            'community': int(labels[node]),
+            'betweenness': float(values[node]),
+            'communities_reached': int(communities_reached[node]),
+            'layers_reached': int(layers_reached[node]),
+            'degree': int(metrics['degree'][node]),
+        }
+        for node in ranked
+    ]
+
+
+def structural_scores(csr, rankings):
+    """
+    Escores por conceito para o tamanho dos nós no rizoma: `score` é o
+    percentil do PageRank (0–1) e `hub` marca PageRank acima de μ + σ
+    """
+    pagerank = rankings['pagerank'][:csr.n_concepts]
+    order = np.argsort(pagerank, kind='stable')
+    percentile = np.empty(len(order))
+    percentile[order] = np.arange(len(order)) / max(len(order) - 1, 1)
+    threshold = pagerank.mean() + pagerank.std()
+    return {
+        csr.ids[node]: {
+            'pagerank': float(pagerank[node]),
+            'eigenvector': float(rankings['eigenvector'][node]),
+            'kcore': int(rankings['kcore'][node]),
+            'score': round(float(percentile[node]), 4),
+            'hub': bool(pagerank[node] > threshold),
+        }
+        for node in range(csr.n_concepts)
+    }
+
+
+def generate_cluster_metadata(graph, method='leiden', seed=0, samples=None):
     """Gera metadados de cluster para visualização"""
     print("🔍 ANÁLISE DE CLUSTERS NA ONTOLOGIA CRIOS")
     print("=" * 70)
     
-    # Constrói grafo
-    print("\n📊 Construindo grafo de adjacência...")
-    graph = build_adjacency_graph(concepts, relations)
+    concepts, relations = graph.concepts, graph.relations
+    
+    print("\n📊 Grafo de adjacência:")
     print(f"   • {len(concepts)} nós")
     print(f"   • {len(relations)} arestas")
     
+    # Métricas locais (grau, triângulos, clustering, vizinhos por camada)
+    csr = graph.to_csr()
+    metrics = node_metrics(csr)
+    
+    rankings = compute_rankings(csr)
+    
     # Detecta comunidades por camada
     print("\n🎯 Detectando comunidades por camada...")
-    communities = detect_communities_by_layer(concepts, graph)
+    communities = detect_communities_by_layer(graph, csr, metrics, rankings)
     hub_clusters = identify_hub_clusters(communities)
     
     print(f"\n📊 CLUSTERS POR CAMADA:")
@@ -180,26 +254,69 @@ def generate_cluster_metadata(concepts, relations):
         print(f"      Clustering médio: {info['avg_clustering']:.3f}")
         print(f"      Top 3 hubs:")
         for hub in info['hubs'][:3]:
-            print(f"         • {hub['name']} (score: {hub['cluster_score']:.2f})")
+            print(f"         • {hub['name']} (pagerank: {hub['pagerank']:.4f}, {hub['kcore']}-core)")
     
     # Detecta pontes entre camadas
     print(f"\n🌉 Detectando pontes entre camadas...")
-    bridges = detect_cross_layer_bridges(concepts, graph)
+    bridges = detect_cross_layer_bridges(graph, csr, metrics)
     
     print(f"\n   Total de pontes: {len(bridges)}")
     print(f"   Top 10 conceitos-ponte:")
     for bridge in bridges[:10]:
         print(f"      • {bridge['name']:40s} ({bridge['layer']}, {bridge['bridge_ratio']*100:.1f}% cross-layer)")
     
+    # Comunidades estruturais (independentes da camada declarada)
+    print(f"\n🧩 Detectando comunidades estruturais ({method}, seed {seed})...")
+    labels, quality = detect_communities(csr, method, seed)
+    if method == 'lpa':
+        fallback = leiden_fallback(csr, quality, seed)
+        if fallback is not None:
+            print(f"   ⚠️  LPA com modularidade {quality:.3f}, muito abaixo da do Leiden "
+                  f"({fallback[1]:.3f}): usando o Leiden")
+            method = 'leiden'
+            labels, quality = fallback
+    communities = describe_communities(graph, csr, labels, quality, method, seed)
+    
+    print(f"\n   Comunidades: {communities['count']}")
+    print(f"   Modularidade: {communities['modularity']:.3f}")
+    for cluster in communities['clusters'][:10]:
+        share = cluster['layers'][cluster['dominant_layer']] / cluster['size'] * 100
+        hubs = ', '.join(hub['name'] for hub in cluster['hubs'][:3])
+        print(f"      • #{cluster['id']:<3d} {cluster['size']:4d} conceitos "
+              f"({share:.0f}% {cluster['dominant_layer']}) — {hubs}")
+    
+    # Pontes estruturais: intermediação dos caminhos mínimos
+    print(f"\n🌉 Calculando betweenness (Brandes)...")
+    values, info = betweenness(csr, samples, seed)
+    structural_bridges = rank_structural_bridges(graph, csr, metrics, labels, values)
+    for bridge in bridges:
+        bridge['betweenness'] = float(values[csr.node(bridge['id'])])
+    
+    if info['exact']:
+        print(f"\n   Exata ({info['samples']} fontes)")
+    else:
+        print(f"\n   Aproximada: {info['samples']} pivôs, erro ≤ {info['epsilon']:.4f} "
+              f"com {(1 - info['delta']) * 100:.0f}% de confiança")
+    print(f"   Top 10 pontes estruturais:")
+    for bridge in structural_bridges[:10]:
+        print(f"      • {bridge['name']:40s} ({bridge['betweenness']:.4f}, "
+              f"{bridge['communities_reached']} comunidades, {bridge['layers_reached']} camadas)")
+    
+    node_scores = structural_scores(csr, rankings)
+    
     # Prepara metadados para export
     cluster_metadata = {
         'layer_clusters': hub_clusters,
+        'communities': communities,
         'bridges': bridges[:50],  # Top 50 pontes
+        'structural_bridges': structural_bridges[:50],
+        'node_scores': node_scores,
         'global_stats': {
             'total_concepts': len(concepts),
             'total_relations': len(relations),
-            'avg_degree': sum(len(graph[c['id']]) for c in concepts) / len(concepts),
-            'layers': sorted(hub_clusters.keys())
+            'avg_degree': sum(graph.degree(c['id']) for c in concepts) / len(concepts),
+            'layers': sorted(hub_clusters.keys()),
+            'betweenness': info
         }
     }
     
@@ -220,25 +337,37 @@ def create_cluster_colors():
     }
 
 
+def option(name, default):
+    """Valor de uma opção --nome=valor"""
+    values = [a.split('=', 1)[1] for a in sys.argv[1:] if a.startswith(f'--{name}=')]
+    return values[-1] if values else default
+
+
 def main():
+    method = option('method', 'leiden')
+    seed = int(option('seed', 0))
+    samples = int(option('samples', 0)) or None
+    if method not in METHODS:
+        print(f"❌ Método desconhecido: {method} (use {', '.join(METHODS)})")
+        sys.exit(1)
+    
     print("🎨 DEMARCAÇÃO DE CLUSTERS - ONTOLOGIA CRIOS")
     print("=" * 70)
     
     # Carrega dados
     print("\n📂 Carregando dados...")
-    concepts = load_json(CONCEPTS_FILE)
-    relations = load_json(RELATIONS_FILE)
-    print(f"   ✅ {len(concepts)} conceitos")
-    print(f"   ✅ {len(relations)} relações")
+    graph = OntologyGraph.load()
+    print(f"   ✅ {len(graph.concepts)} conceitos")
+    print(f"   ✅ {len(graph.relations)} relações")
     
     # Gera análise de clusters
-    metadata = generate_cluster_metadata(concepts, relations)
+    metadata = generate_cluster_metadata(graph, method, seed, samples)
     
     # Define cores
     metadata['colors'] = create_cluster_colors()
     
     # Salva metadados
-    output_file = BASE_DIR / 'assets' / 'cluster_metadata.json'
+    output_file = ASSETS_DIR / 'cluster_metadata.json'
     save_json(output_file, metadata)
     
     print(f"\n💾 Metadados de cluster salvos em:")
@@ -249,6 +378,7 @@ def main():
     print("\n💡 Use esses metadados para:")
     print("   • Colorir clusters no globo 3D por camada")
     print("   • Destacar conceitos-hub dentro de cada cluster")
+    print("   • Agrupar o rizoma pelas comunidades estruturais ('communities')")
     print("   • Visualizar pontes entre camadas")
     print("   • Aplicar física específica por cluster")
 
@@ -1,31 +1,24 @@
 #!/usr/bin/env python3
 """
 Aplica novas relações propostas ao grafo, evitando duplicatas.
+
+Uso:
+    python3 scripts/apply_new_relations.py         # registra no journal
+    python3 scripts/apply_new_relations.py --db    # insere no banco SQLite e exporta relations.json
 """
+import sys
 
-import json
-from collections import defaultdict
+from ontology import PROPOSALS_FILE, OntologyGraph, load_json, pair_key
+from ontology.journal import add_relation_op
+from ontology.store import STORE_FILE, open_store
 
-def main():
-    # Carregar dados
-    print("📂 Carregando dados...")
-    with open('assets/relations.json', 'r', encoding='utf-8') as f:
-        existing_relations = json.load(f)
-    
-    with open('assets/new_relations_proposals.json', 'r', encoding='utf-8') as f:
-        proposals = json.load(f)
-    
-    with open('assets/concepts.json', 'r', encoding='utf-8') as f:
-        concepts = json.load(f)
-    
-    # Criar índice de conceitos
-    concept_ids = {c['id'] for c in concepts}
+def apply_proposals(graph, store=None):
+    """Filtra as propostas e aplica as válidas (no journal, ou no banco se `store`)"""
+    existing_relations = graph.relations
+    proposals = load_json(PROPOSALS_FILE)
     
-    # Criar índice de relações existentes (normalizado para detectar duplicatas)
-    existing_pairs = set()
-    for rel in existing_relations:
-        pair = tuple(sorted([rel['from'], rel['to']]))
-        existing_pairs.add(pair)
+    # Índice de relações existentes (normalizado para detectar duplicatas)
+    existing_pairs = set(graph.pairs)
     
     print(f"   Relações existentes: {len(existing_relations)}")
     print(f"   Pares únicos existentes: {len(existing_pairs)}")
@@ -39,12 +32,12 @@ def main():
     
     for prop in proposals:
         # Verificar se IDs existem
-        if prop['from'] not in concept_ids or prop['to'] not in concept_ids:
+        if prop['from'] not in graph or prop['to'] not in graph:
             invalid_ids += 1
             continue
         
         # Verificar duplicata
-        pair = tuple(sorted([prop['from'], prop['to']]))
+        pair = pair_key(prop['from'], prop['to'])
         if pair in existing_pairs:
             duplicates += 1
             continue
@@ -79,25 +72,41 @@ def main():
         return
     
     # Mesclar relações
+    total_before = len(existing_relations)
     all_relations = existing_relations + valid_proposals
     
-    # Salvar backup
-    import shutil
-    from datetime import datetime
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    backup_path = f'assets/relations.json.backup_{timestamp}'
-    shutil.copy('assets/relations.json', backup_path)
-    print(f"💾 Backup criado: {backup_path}")
-    
-    # Salvar arquivo atualizado
-    with open('assets/relations.json', 'w', encoding='utf-8') as f:
-        json.dump(all_relations, f, ensure_ascii=False, indent=2)
+    if store is not None:
+        # Só as linhas novas são inseridas; relations.json sai do banco
+        for rel in valid_proposals:
+            graph.add_relation(dict(rel))
+        inserted = store.save_graph(graph)['relations'][2]
+        store.export_json(concepts_file=None, referencias_file=None)
+        print(f"💾 {STORE_FILE.name}: {inserted} relações inseridas, relations.json exportado")
+    else:
+        # Registrar no journal (desfazível com 'make journal-undo')
+        tx = graph.record('apply_new_relations', [add_relation_op(rel) for rel in valid_proposals])
+        print(f"📝 Transação #{tx} registrada no journal")
     
     print(f"\n✅ SUCESSO!")
-    print(f"   Relações totais: {len(existing_relations)} → {len(all_relations)}")
-    print(f"   Incremento: +{len(valid_proposals)} ({(len(valid_proposals)/len(existing_relations)*100):.1f}%)")
+    print(f"   Relações totais: {total_before} → {len(all_relations)}")
+    print(f"   Incremento: +{len(valid_proposals)} ({(len(valid_proposals)/total_before*100):.1f}%)")
     print()
     print(f"   Execute 'make ontology' para validar o grafo atualizado.")
 
+def main():
+    # Carregar dados
+    print("📂 Carregando dados...")
+    if '--db' not in sys.argv:
+        apply_proposals(OntologyGraph.load())
+        return
+    
+    try:
+        store = open_store()
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    with store:
+        apply_proposals(store.graph(), store)
+
 if __name__ == '__main__':
     main()
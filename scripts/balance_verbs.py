@@ -4,38 +4,12 @@ Script para equilibrar verbos nas relações da ontologia CRIOS
 Diversifica verbos genéricos em variantes contextuais para aumentar riqueza semântica
 """
 
-import json
-import re
-from collections import defaultdict, Counter
-from pathlib import Path
+from collections import defaultdict
 
-# Caminhos
-BASE_DIR = Path(__file__).parent.parent
-CONCEPTS_FILE = BASE_DIR / 'assets' / 'concepts.json'
-RELATIONS_FILE = BASE_DIR / 'assets' / 'relations.json'
+from ontology import OntologyGraph
 
 
-def load_json(filepath):
-    """Carrega arquivo JSON com encoding UTF-8"""
-    with open(filepath, 'r', encoding='utf-8') as f:
-        return json.load(f)
-
-
-def save_json(filepath, data):
-    """Salva arquivo JSON com encoding UTF-8 e formatação"""
-    with open(filepath, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
-
-
-def get_concept_layer(concept_id, concepts):
-    """Retorna a camada de um conceito"""
-    for c in concepts:
-        if c['id'] == concept_id:
-            return c.get('layer', 'desconhecida')
-    return 'desconhecida'
-
-
-def diversify_relaciona_se_com(relation, index, concepts):
+def diversify_relaciona_se_com(relation, index, graph):
     """
     Diversifica 'relaciona-se com' baseado em:
     - Camadas dos conceitos envolvidos
@@ -46,8 +20,8 @@ def diversify_relaciona_se_com(relation, index, concepts):
     from_id = relation['from']
     to_id = relation['to']
     
-    from_layer = get_concept_layer(from_id, concepts)
-    to_layer = get_concept_layer(to_id, concepts)
+    from_layer = graph.layer(from_id)
+    to_layer = graph.layer(to_id)
     
     # CONTEXTOS FUNDACIONAIS
     if from_layer == 'fundacional' or to_layer == 'fundacional':
@@ -195,7 +169,7 @@ def diversify_relaciona_se_com(relation, index, concepts):
     return vertical_verbs[index % len(vertical_verbs)]
 
 
-def diversify_fundamenta(relation, index, concepts):
+def diversify_fundamenta(relation, index, graph):
     """Diversifica variações de 'fundamenta'"""
     desc = relation['description'].lower()
     
@@ -210,7 +184,7 @@ def diversify_fundamenta(relation, index, concepts):
     return options[index % len(options)]
 
 
-def diversify_constitui(relation, index, concepts):
+def diversify_constitui(relation, index, graph):
     """Diversifica 'constitui'"""
     desc = relation['description'].lower()
     
@@ -225,7 +199,7 @@ def diversify_constitui(relation, index, concepts):
     return options[index % len(options)]
 
 
-def diversify_temporaliza(relation, index, concepts):
+def diversify_temporaliza(relation, index, graph):
     """Diversifica 'temporaliza'"""
     desc = relation['description'].lower()
     
@@ -247,15 +221,15 @@ def main():
     
     # Carrega dados
     print("\n📂 Carregando dados...")
-    concepts = load_json(CONCEPTS_FILE)
-    relations = load_json(RELATIONS_FILE)
+    graph = OntologyGraph.load()
+    concepts, relations = graph.concepts, graph.relations
     
     print(f"   • {len(concepts)} conceitos")
     print(f"   • {len(relations)} relações")
     
     # Analisa estado atual
     print("\n📊 Estado atual dos verbos:")
-    verb_counts = Counter(r['name'] for r in relations)
+    verb_counts = graph.verb_counts()
     print(f"   • Verbos únicos: {len(verb_counts)}")
     print(f"\n   Top 10 verbos mais usados:")
     for verb, count in verb_counts.most_common(10):
@@ -279,31 +253,32 @@ def main():
         
         # Diversifica 'relaciona-se com' (o mais crítico - 15.9%)
         if rel['name'] == 'relaciona-se com':
-            rel['name'] = diversify_relaciona_se_com(rel, i, concepts)
+            rel['name'] = diversify_relaciona_se_com(rel, i, graph)
             if rel['name'] != original:
                 changes['relaciona-se com'] += 1
         
         # Diversifica 'fundamenta'
         elif rel['name'] in ['fundamenta', 'fundamenta-se']:
-            rel['name'] = diversify_fundamenta(rel, i, concepts)
+            rel['name'] = diversify_fundamenta(rel, i, graph)
             if rel['name'] != original:
                 changes['fundamenta'] += 1
         
         # Diversifica 'constitui'
         elif rel['name'] in ['constitui', 'constitui ontologicamente']:
-            rel['name'] = diversify_constitui(rel, i, concepts)
+            rel['name'] = diversify_constitui(rel, i, graph)
             if rel['name'] != original:
                 changes['constitui'] += 1
         
         # Diversifica 'temporaliza'
         elif rel['name'] in ['temporaliza', 'temporaliza-se em']:
-            rel['name'] = diversify_temporaliza(rel, i, concepts)
+            rel['name'] = diversify_temporaliza(rel, i, graph)
             if rel['name'] != original:
                 changes['temporaliza'] += 1
     
     # Salva resultado
     print("\n💾 Salvando mudanças...")
-    save_json(RELATIONS_FILE, relations)
+    # Via graph.save(): se havia transações no journal, compacta e arquiva
+    graph.save(concepts_file=None)
     
     # Relatório de mudanças
     print("\n✅ Diversificação concluída:")
@@ -314,7 +289,8 @@ def main():
     
     # Estatísticas finais
     print("\n📊 Estado final dos verbos:")
-    final_verb_counts = Counter(r['name'] for r in relations)
+    graph.reindex()
+    final_verb_counts = graph.verb_counts()
     print(f"   • Verbos únicos: {len(final_verb_counts)} (antes: {len(verb_counts)})")
     print(f"   • Ganho de diversidade: +{len(final_verb_counts) - len(verb_counts)} verbos")
     
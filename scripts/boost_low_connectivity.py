@@ -6,49 +6,78 @@ conectando-os semanticamente a conceitos relacionados.
 Abordagem RIZOMÁTICA - sem hierarquia, apenas multiplicidade de conexões.
 """
 
-import json
 import random
 from collections import defaultdict
 
-def load_data():
-    """Carrega conceitos e relações"""
-    with open('assets/concepts.json', 'r', encoding='utf-8') as f:
-        concepts = json.load(f)
-    
-    with open('assets/relations.json', 'r', encoding='utf-8') as f:
-        relations = json.load(f)
-    
-    return concepts, relations
+from ontology import OntologyGraph
+from ontology.journal import add_relation_op, update_concept_op
 
-def save_data(concepts, relations):
-    """Salva dados atualizados"""
-    with open('assets/concepts.json', 'w', encoding='utf-8') as f:
-        json.dump(concepts, f, ensure_ascii=False, indent=2)
-    
-    with open('assets/relations.json', 'w', encoding='utf-8') as f:
-        json.dump(relations, f, ensure_ascii=False, indent=2)
+# Vizinhos no embedding node2vec consultados por conceito
+EMBEDDING_NEIGHBORS = 20
+
+# Alvos a 2 passos (predição de links) considerados por conceito
+LINK_CANDIDATES = 30
 
-def find_semantic_matches(concept, all_concepts, max_matches=5):
+# Vizinhos TF-IDF (nome + descrição) considerados por conceito
+TEXT_NEIGHBORS = 30
+TEXT_WEIGHT = 5
+
+def embedding_neighbors(concepts, k=EMBEDDING_NEIGHBORS):
+    """
+    {id: {id vizinho: similaridade}} pelos vetores node2vec do snapshot,
+    consultados na floresta de vizinhos aproximados (O(log n) por conceito)
+    """
+    import numpy as np
+    from ontology.node2vec import load_node2vec
+    from ontology.snapshot import load_snapshot
+    snapshot = load_snapshot()
+    csr = snapshot.csr
+    _, index = load_node2vec(snapshot)
+    known = [c['id'] for c in concepts if c['id'] in csr.index]
+    if not known:
+        return {}
+    nodes = np.array([csr.index[cid] for cid in known])
+    distances, found = index.neighbors(nodes, k)
+    # Vetores unitários: cosseno = 1 - d²/2
+    similarity = 1.0 - distances ** 2 / 2
+    return {cid: {csr.ids[j]: s for j, s in zip(row, sims) if j >= 0}
+            for cid, row, sims in zip(known, found.tolist(), similarity.tolist())}
+
+def find_semantic_matches(concept, graph, max_matches=5, neighbors=None, links=None, text=None):
     """
     Encontra conceitos semanticamente relacionados baseado em:
-    - Palavras-chave na descrição
+    - Similaridade TF-IDF de nome + descrição (sem stopwords)
     - Camada compartilhada
-    - Conexões existentes (amigos de amigos)
+    - Proximidade estrutural (vizinhos no embedding node2vec)
+    
+    Só são avaliados os vizinhos no embedding, os vizinhos TF-IDF (`text`) e
+    os alvos a 2 passos da predição de links (`links`), não todos os conceitos
     """
     matches = []
-    concept_words = set(concept['description'].lower().split())
     
-    # Amigos de amigos (conceitos conectados aos que já estão conectados)
-    friends_of_friends = set()
-    for conn_id in concept['connections']:
-        conn_concept = next((c for c in all_concepts if c['id'] == conn_id), None)
-        if conn_concept:
-            friends_of_friends.update(conn_concept['connections'])
+    # Vizinhos no embedding (passeios aleatórios vão além dos amigos de amigos)
+    if neighbors is None:
+        neighbors = embedding_neighbors([concept]).get(concept['id'], {})
+    if links is None:
+        from ontology.linkpred import candidates_by_id
+        from ontology.snapshot import load_snapshot
+        links = candidates_by_id(load_snapshot().csr, [concept['id']],
+                                 k=LINK_CANDIDATES).get(concept['id'], [])
+    if text is None:
+        from ontology.textsim import similar_by_id
+        text = similar_by_id([concept['id']], concepts=graph.concepts,
+                             k=TEXT_NEIGHBORS).get(concept['id'], {})
+    
+    # Score de vizinhança compartilhada relativo ao melhor alvo do conceito
+    top_link = max((score for score, _ in links), default=0) or 1
+    link_scores = {other_id: score / top_link for score, other_id in links}
     
-    friends_of_friends.discard(concept['id'])
-    friends_of_friends -= set(concept['connections'])
+    candidate_ids = list(neighbors) + list(link_scores) + list(text)
+    candidates = [graph.concept(cid) for cid in dict.fromkeys(candidate_ids)]
     
-    for other in all_concepts:
+    for other in candidates:
+        if other is None:
+            continue
         if other['id'] == concept['id']:
             continue
         if other['id'] in concept['connections']:
@@ -56,18 +85,19 @@ def find_semantic_matches(concept, all_concepts, max_matches=5):
             
         score = 0
         
-        # 1. Amigos de amigos (forte indicador)
-        if other['id'] in friends_of_friends:
-            score += 10
+        # 1. Proximidade estrutural (forte indicador)
+        if other['id'] in neighbors:
+            score += 10 * max(neighbors[other['id']], 0)
+        
+        # 1b. Vizinhos em comum (alocação de recursos × camada)
+        score += 10 * link_scores.get(other['id'], 0)
         
         # 2. Mesma camada
         if other['layer'] == concept['layer']:
             score += 3
         
-        # 3. Palavras em comum na descrição
-        other_words = set(other['description'].lower().split())
-        common_words = concept_words & other_words
-        score += len(common_words) * 0.5
+        # 3. Texto parecido (cosseno TF-IDF)
+        score += TEXT_WEIGHT * text.get(other['id'], 0)
         
         # 4. Conceitos bem conectados são melhores (hubs)
         score += min(len(other['connections']) / 10, 2)
@@ -109,7 +139,8 @@ def boost_connectivity(min_connections=6):
     print("🔗 BOOST DE CONECTIVIDADE RIZOMÁTICA")
     print("=" * 70)
     
-    concepts, relations = load_data()
+    graph = OntologyGraph.load()
+    concepts, relations = graph.concepts, graph.relations
     
     # Identificar conceitos sub-conectados
     low_conn = [c for c in concepts if len(c['connections']) <= 5]
@@ -129,7 +160,15 @@ def boost_connectivity(min_connections=6):
     
     # Processar cada conceito sub-conectado
     new_relations = []
-    concepts_dict = {c['id']: c for c in concepts}
+    touched = {}
+    
+    print(f"\n🧭 Calculando vizinhos no embedding node2vec, vizinhos TF-IDF e alvos a 2 passos...")
+    neighbors = embedding_neighbors(low_conn)
+    from ontology.linkpred import candidates_by_id
+    from ontology.snapshot import load_snapshot
+    links = candidates_by_id(load_snapshot().csr, [c['id'] for c in low_conn], k=LINK_CANDIDATES)
+    from ontology.textsim import similar_by_id
+    text = similar_by_id([c['id'] for c in low_conn], concepts=concepts, k=TEXT_NEIGHBORS)
     
     print(f"\n🌱 Criando novas conexões...")
     
@@ -141,7 +180,10 @@ def boost_connectivity(min_connections=6):
             continue
         
         # Encontrar matches semânticos
-        matches = find_semantic_matches(concept, concepts, max_matches=needed * 2)
+        matches = find_semantic_matches(concept, graph, max_matches=needed * 2,
+                                        neighbors=neighbors.get(concept['id'], {}),
+                                        links=links.get(concept['id'], []),
+                                        text=text.get(concept['id'], {}))
         
         added = 0
         for match in matches:
@@ -170,8 +212,10 @@ def boost_connectivity(min_connections=6):
             # Atualizar connections
             if match['id'] not in concept['connections']:
                 concept['connections'].append(match['id'])
+                touched[concept['id']] = concept
             if concept['id'] not in match['connections']:
                 match['connections'].append(concept['id'])
+                touched[match['id']] = match
             
             added += 1
             
@@ -179,10 +223,15 @@ def boost_connectivity(min_connections=6):
             print(f"   • {concept['name']:40s} {current_conn} → {len(concept['connections'])} (+{added})")
     
     # Adicionar novas relações
-    relations.extend(new_relations)
+    for rel in new_relations:
+        graph.add_relation(rel)
     
-    # Salvar
-    save_data(concepts, relations)
+    # Registrar no journal em vez de regravar os JSON
+    ops = [add_relation_op(rel) for rel in new_relations]
+    ops += [update_concept_op(cid, {'connections': c['connections']}) for cid, c in touched.items()]
+    tx = graph.record('boost_low_connectivity', ops)
+    if tx:
+        print(f"\n📝 Transação #{tx} registrada no journal ({len(ops)} operações)")
     
     # Estatísticas finais
     final_low = len([c for c in concepts if len(c['connections']) <= 5])
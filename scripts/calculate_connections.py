@@ -2,29 +2,34 @@
 """
 Calcula conexões a partir de relations.json
 Usado pelos comandos do Makefile para estatísticas
+
+    python3 scripts/calculate_connections.py hubs 10 --by pagerank   # degree | pagerank | eigenvector | kcore
+
+Se o daemon estiver no ar (`serve`), os comandos são respondidos por ele com o
+grafo já carregado; senão são calculados aqui mesmo. `--local` força o cálculo
+em processo
 """
-import json
 import sys
-from collections import defaultdict
 
-def load_json(filepath):
-    with open(filepath, 'r', encoding='utf-8') as f:
-        return json.load(f)
+from ontology import daemon
 
-def calculate_connections():
+def calculate_connections(graph=None):
     """Calcula conexões bidirecionais a partir de relations.json"""
-    concepts = load_json('assets/concepts.json')
-    relations = load_json('assets/relations.json')
-    
-    # Criar mapa de conexões
-    connections = defaultdict(set)
+    if graph is None:
+        # Snapshot binário mapeado em memória (refeito se os JSON mudaram);
+        # importado aqui para o cliente do daemon não carregar NumPy
+        from ontology.ranking import load_rankings
+        from ontology.snapshot import load_snapshot
+        snapshot = load_snapshot()
+        concepts, csr = snapshot.concepts, snapshot.csr
+        rankings = load_rankings(snapshot)
+    else:
+        from ontology.ranking import compute_rankings
+        concepts, csr = graph.concepts, graph.to_csr()
+        rankings = compute_rankings(csr)
     
-    # Processar relações (bidirecionais)
-    for rel in relations:
-        from_id = rel['from']
-        to_id = rel['to']
-        connections[from_id].add(to_id)
-        connections[to_id].add(from_id)
+    # Graus vetorizados sobre a adjacência CSR (IDs internados)
+    degrees = csr.degree()
     
     # Criar dicionário de resultados
     results = {}
@@ -34,14 +39,18 @@ def calculate_connections():
             'id': concept_id,
             'name': concept['name'],
             'layer': concept.get('layer', 'undefined'),
-            'connection_count': len(connections.get(concept_id, set()))
+            'connection_count': int(degrees[csr.index[concept_id]]),
+            'pagerank': float(rankings['pagerank'][csr.index[concept_id]]),
+            'eigenvector': float(rankings['eigenvector'][csr.index[concept_id]]),
+            'kcore': int(rankings['kcore'][csr.index[concept_id]]),
         }
     
     return results
 
-def get_stats():
+def get_stats(conn_data=None):
     """Retorna estatísticas de conectividade"""
-    conn_data = calculate_connections()
+    if conn_data is None:
+        conn_data = calculate_connections()
     
     if not conn_data:
         return {
@@ -66,52 +75,136 @@ def get_stats():
         'min_count': min_item['connection_count']
     }
 
-def get_top_hubs(limit=10):
-    """Retorna os conceitos mais conectados"""
-    conn_data = calculate_connections()
-    sorted_data = sorted(conn_data.values(), key=lambda x: x['connection_count'], reverse=True)
+# Critérios de `hubs --by`: campo ordenado e formato do valor
+HUB_RANKINGS = {
+    'degree': ('connection_count', None),
+    'pagerank': ('pagerank', '{:.4f} pagerank'),
+    'eigenvector': ('eigenvector', '{:.4f} autovetor'),
+    'kcore': ('kcore', '{:2d}-core'),
+}
+
+def get_top_hubs(limit=10, conn_data=None, by='degree'):
+    """Retorna os conceitos mais centrais (grau, PageRank, autovetor ou k-core)"""
+    if conn_data is None:
+        conn_data = calculate_connections()
+    field = HUB_RANKINGS[by][0]
+    # Empates no ranking estrutural são desfeitos pelo grau
+    sorted_data = sorted(conn_data.values(),
+                         key=lambda x: (x[field], x['connection_count']), reverse=True)
     return sorted_data[:limit]
 
-def get_underconnected(threshold=3):
+def hub_options(args):
+    """(limite, critério) de `hubs [N] [--by CRITÉRIO]`"""
+    limit, by = 10, 'degree'
+    rest = list(args)
+    while rest:
+        arg = rest.pop(0)
+        if arg.startswith('--by='):
+            by = arg.split('=', 1)[1]
+        elif arg == '--by' and rest:
+            by = rest.pop(0)
+        else:
+            limit = int(arg)
+    return limit, by
+
+def get_underconnected(threshold=3, conn_data=None):
     """Retorna conceitos sub-conectados"""
-    conn_data = calculate_connections()
+    if conn_data is None:
+        conn_data = calculate_connections()
     if threshold == 0:
         # Para threshold 0, retornar apenas os exatamente com 0 conexões
         return [data for data in conn_data.values() if data['connection_count'] == 0]
     return [data for data in conn_data.values() if data['connection_count'] <= threshold]
 
-if __name__ == '__main__':
-    command = sys.argv[1] if len(sys.argv) > 1 else 'stats'
+def run_command(command, args, conn_data=None):
+    """Executa um subcomando e retorna as linhas de saída"""
+    if conn_data is None:
+        conn_data = calculate_connections()
+    lines = []
     
     if command == 'stats':
-        stats = get_stats()
-        print(f"{stats['avg']}")
+        stats = get_stats(conn_data)
+        lines.append(f"{stats['avg']}")
         
     elif command == 'max':
-        stats = get_stats()
-        print(f"{stats['max_concept']} ({stats['max_count']} conexões)")
+        stats = get_stats(conn_data)
+        lines.append(f"{stats['max_concept']} ({stats['max_count']} conexões)")
         
     elif command == 'min':
-        stats = get_stats()
-        print(f"{stats['min_concept']} ({stats['min_count']} conexões)")
+        stats = get_stats(conn_data)
+        lines.append(f"{stats['min_concept']} ({stats['min_count']} conexões)")
         
     elif command == 'hubs':
-        limit = int(sys.argv[2]) if len(sys.argv) > 2 else 10
-        hubs = get_top_hubs(limit)
+        limit, by = hub_options(args)
+        if by not in HUB_RANKINGS:
+            return [f"Critério desconhecido: {by} (use {', '.join(HUB_RANKINGS)})"]
+        field, template = HUB_RANKINGS[by]
+        hubs = get_top_hubs(limit, conn_data, by)
         for i, hub in enumerate(hubs, 1):
-            print(f"{i:2d}. {hub['name']:<40s} {hub['connection_count']:2d} conexões")
+            line = f"{i:2d}. {hub['name']:<40s} {hub['connection_count']:2d} conexões"
+            if template:
+                line += f"  {template.format(hub[field])}"
+            lines.append(line)
             
     elif command == 'underconnected':
-        threshold = int(sys.argv[2]) if len(sys.argv) > 2 else 3
-        under = get_underconnected(threshold)
-        print(f"{len(under)}")
+        threshold = int(args[0]) if args else 3
+        under = get_underconnected(threshold, conn_data)
+        lines.append(f"{len(under)}")
         
     elif command == 'distribution':
-        conn_data = calculate_connections()
         counts = {}
         for data in conn_data.values():
             count = data['connection_count']
             counts[count] = counts.get(count, 0) + 1
         
         for count in sorted(counts.keys()):
-            print(f"{count:3d} conexões: {counts[count]:3d} conceitos")
+            lines.append(f"{count:3d} conexões: {counts[count]:3d} conceitos")
+    
+    elif command == 'concept':
+        for concept_id in args:
+            data = conn_data.get(concept_id)
+            if data is None:
+                lines.append(f"{concept_id}: conceito inexistente")
+            else:
+                lines.append(f"{data['name']} [{data['layer']}] ({data['connection_count']} conexões)")
+    
+    return lines
+
+def serve():
+    """Mantém o mapa de conexões em memória e atende pelo socket do daemon"""
+    server = daemon.QueryDaemon(
+        load=calculate_connections,
+        # Mudanças: rankings refeitos sobre o grafo residente, sem snapshot
+        update=lambda conn_data, graph: calculate_connections(graph),
+        handle=lambda conn_data, command, args: run_command(command, args, conn_data),
+    )
+    print(f"🛰️  Daemon de conexões em {server.socket_path} (Ctrl+C para parar)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    except RuntimeError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+if __name__ == '__main__':
+    argv = [a for a in sys.argv[1:] if a != '--local']
+    command = argv[0] if argv else 'stats'
+    args = argv[1:]
+    
+    if command == 'serve':
+        serve()
+    elif command in ('ping', 'shutdown'):
+        response = daemon.request({'command': command})
+        print(response['lines'][0] if response else "ℹ️  Nenhum daemon rodando")
+    else:
+        response = None
+        if '--local' not in sys.argv:
+            response = daemon.request({'command': command, 'args': args})
+        if response is None or 'error' in response:
+            # Sem daemon (ou daemon com erro): calcula em processo
+            lines = run_command(command, args)
+        else:
+            lines = response['lines']
+        for line in lines:
+            print(line)
@@ -7,13 +7,13 @@ Categoriza conceitos em subcamadas SEMANTICAMENTE:
 - 3: Mista (conceitos híbridos, transversais, integrados)
 """
 
-import json
+from ontology import OntologyGraph
+from ontology.text import fold
 
 def categorize_concept(concept, layer):
     """Categoriza conceito baseado em análise semântica"""
-    name = concept['name'].lower()
-    desc = concept['description'].lower()
-    text = f"{name} {desc}"
+    # Sem acentos dos dois lados: 'política' casa com 'politica'
+    text = fold(f"{concept['name']} {concept['description']}")
     
     # Palavras-chave para cada categoria
     pratica_keywords = ['prática', 'prátic', 'ação', 'fazer', 'aplicação', 'institucional', 
@@ -29,9 +29,9 @@ def categorize_concept(concept, layer):
                      'existência', 'ontologia', 'epistemologia', 'metafísica', 'universal']
     
     # Conta ocorrências
-    pratica_score = sum(1 for kw in pratica_keywords if kw in text)
-    relacional_score = sum(1 for kw in relacional_keywords if kw in text)
-    geral_score = sum(1 for kw in geral_keywords if kw in text)
+    pratica_score = sum(1 for kw in pratica_keywords if fold(kw) in text)
+    relacional_score = sum(1 for kw in relacional_keywords if fold(kw) in text)
+    geral_score = sum(1 for kw in geral_keywords if fold(kw) in text)
     
     # Conceitos híbridos/mistos: têm scores similares em múltiplas categorias
     scores = [pratica_score, relacional_score, geral_score]
@@ -54,8 +54,8 @@ def main():
     print("🎯 CATEGORIZAÇÃO SEMÂNTICA DE SUBCAMADAS")
     print("=" * 70)
     
-    with open('assets/concepts.json', 'r', encoding='utf-8') as f:
-        concepts = json.load(f)
+    graph = OntologyGraph.load()
+    concepts = graph.concepts
     
     # Camadas para categorizar
     layers_to_process = ['epistemica', 'temporal', 'ecologica', 'etica']
@@ -93,9 +93,8 @@ def main():
                 examples = [c['name'] for c in categorized[cat][:3]]
                 print(f"      Ex: {', '.join(examples)}")
     
-    # Salva
-    with open('assets/concepts.json', 'w', encoding='utf-8') as f:
-        json.dump(concepts, f, ensure_ascii=False, indent=2)
+    # Salva (via graph.save(): se havia transações no journal, compacta e arquiva)
+    graph.save(relations_file=None)
     
     print(f"\n✅ {len(changes)} conceitos recategorizados")
     print("=" * 70)
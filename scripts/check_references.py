@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Confere os conceitos citados em assets/referencias.json contra o rizoma
+Nomes comparados por `ontology.text.normalize_term()` (sem acentos, hífens
+como espaço, mesmos sufixos que antes eram removidos em Node no Makefile)
+
+Uso:
+    python3 scripts/check_references.py unmapped      # citados sem conceito no rizoma
+    python3 scripts/check_references.py duplicates    # grafias diferentes do mesmo conceito
+"""
+
+import sys
+
+from ontology import CONCEPTS_FILE, REFERENCIAS_FILE, load_json
+from ontology.text import normalize_term
+
+
+def referenced_concepts(refs):
+    """Conceitos citados nas referências, na ordem (com repetições)"""
+    result = []
+    for ref in refs:
+        result.extend(ref.get('conceitos') or [])
+    return result
+
+
+def check_unmapped(refs, concepts):
+    first = {}
+    for name in referenced_concepts(refs):
+        first.setdefault(normalize_term(name), name)
+    ids = {normalize_term(c['id']) for c in concepts}
+    unmapped = [name for name in first.values() if normalize_term(name) not in ids]
+
+    total = len(first)
+    mapped = total - len(unmapped)
+    print('Total conceitos únicos nas referências:', total)
+    print('Mapeados no rizoma:', mapped, f'({mapped / total * 100:.1f}%)')
+    print('Não mapeados:', len(unmapped), f'({len(unmapped) / total * 100:.1f}%)')
+    if unmapped:
+        print('\nPrimeiros 20 não mapeados:')
+        for i, name in enumerate(unmapped[:20], 1):
+            print(' ', f'{i}.', name)
+
+
+def check_duplicates(refs):
+    names = referenced_concepts(refs)
+    groups = {}
+    for name in names:
+        groups.setdefault(normalize_term(name), []).append(name)
+    dups = [(key, list(dict.fromkeys(items))) for key, items in groups.items()]
+    dups = sorted([(key, items) for key, items in dups if len(items) > 1],
+                  key=lambda d: -len(d[1]))
+
+    print('Total conceitos:', len(names))
+    print('Grupos de duplicatas:', len(dups))
+    if dups:
+        print('\nDuplicatas encontradas:')
+        for key, items in dups:
+            print(' ', f"[{', '.join(items)}] ->", key)
+
+
+def main():
+    command = sys.argv[1] if len(sys.argv) > 1 else 'unmapped'
+    refs = load_json(REFERENCIAS_FILE)
+    if command == 'unmapped':
+        check_unmapped(refs, load_json(CONCEPTS_FILE))
+    elif command == 'duplicates':
+        check_duplicates(refs)
+    else:
+        print(f"❌ Comando desconhecido: {command} (use unmapped ou duplicates)")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Pré-calcula o layout 3D do rizoma (assets/layout.json)
+O frontend usa essas posições como layout inicial e pula o relaxamento O(n²)
+
+Uso:
+    python3 scripts/compute_layout.py                    # só recalcula se os JSON mudaram
+    python3 scripts/compute_layout.py --init=layers      # communities | spectral | layers
+
+Com `communities` em assets/cluster_metadata.json (`make analyze-clusters`),
+o padrão é partir dos clusters por comunidade, os mesmos que o frontend usa
+para agrupar os nós; sem elas, do embedding espectral
+    python3 scripts/compute_layout.py --seed=7 --iterations=500 --theta=0.6
+    python3 scripts/compute_layout.py --force
+"""
+
+import hashlib
+import json
+import sys
+import time
+
+from ontology import ASSETS_DIR, load_json
+from ontology.embedding import load_embedding
+from ontology.layout import (
+    ITERATIONS,
+    RADIUS,
+    THETA,
+    community_groups,
+    compute_layout,
+    read_layout_info,
+    save_layout,
+)
+from ontology.snapshot import load_snapshot
+
+LAYOUT_FILE = ASSETS_DIR / 'layout.json'
+CLUSTER_METADATA_FILE = ASSETS_DIR / 'cluster_metadata.json'
+INITIAL_LAYOUTS = ('communities', 'spectral', 'layers')
+
+
+def load_membership():
+    """`communities.membership` do cluster_metadata.json ({id: comunidade}) ou None"""
+    try:
+        return load_json(CLUSTER_METADATA_FILE)['communities']['membership']
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def option(name, default):
+    """Valor de uma opção --nome=valor"""
+    values = [a.split('=', 1)[1] for a in sys.argv[1:] if a.startswith(f'--{name}=')]
+    return values[-1] if values else default
+
+
+def main():
+    seed = int(option('seed', 0))
+    iterations = int(option('iterations', ITERATIONS))
+    theta = float(option('theta', THETA))
+    membership = load_membership()
+    init = option('init', 'communities' if membership else 'spectral')
+    if init not in INITIAL_LAYOUTS:
+        print(f"❌ Layout inicial desconhecido: {init} (use {', '.join(INITIAL_LAYOUTS)})")
+        sys.exit(1)
+    if init == 'communities' and not membership:
+        print(f"❌ Sem comunidades em {CLUSTER_METADATA_FILE.name}: rode 'make analyze-clusters' antes")
+        sys.exit(1)
+
+    print("🌐 LAYOUT 3D DO RIZOMA (Barnes-Hut)")
+    print("=" * 70)
+
+    snapshot = load_snapshot()
+    csr = snapshot.csr
+    info = {'token': snapshot.token, 'seed': seed, 'iterations': iterations,
+            'theta': theta, 'init': init, 'radius': RADIUS}
+    if init == 'communities':
+        # Comunidades novas também invalidam o layout salvo
+        encoded = json.dumps(membership, sort_keys=True).encode('utf-8')
+        info['communities'] = hashlib.sha1(encoded).hexdigest()[:12]
+
+    # Mesmo snapshot e mesmos parâmetros: nada a refazer
+    if '--force' not in sys.argv and snapshot.token and read_layout_info(LAYOUT_FILE) == info:
+        print(f"\n✅ Layout já atualizado: {LAYOUT_FILE}")
+        return
+
+    print(f"\n📐 {csr.n_concepts} conceitos, {iterations} iterações (θ = {theta})...")
+    start = time.perf_counter()
+    vectors = load_embedding(snapshot)[0] if init == 'spectral' else None
+    groups = community_groups(csr, membership) if init == 'communities' else None
+    positions = compute_layout(csr, iterations, seed, theta, vectors=vectors, groups=groups)
+    elapsed = time.perf_counter() - start
+
+    save_layout(LAYOUT_FILE, csr.ids[:csr.n_concepts], positions, info)
+    print(f"   ✅ Concluído em {elapsed:.1f}s")
+    print(f"\n💾 Layout salvo em:")
+    print(f"   {LAYOUT_FILE}")
+
+
+if __name__ == '__main__':
+    main()
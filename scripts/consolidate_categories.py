@@ -3,8 +3,7 @@
 Consolida categorias redundantes ou sobrepostas em referencias.json
 """
 
-import json
-from pathlib import Path
+from ontology import REFERENCIAS_FILE, load_json, save_json
 
 # Mapeamento de consolidação
 CONSOLIDATION_MAP = {
@@ -70,9 +69,7 @@ def consolidate_categories():
     """Consolida categorias em referencias.json"""
     
     # Carrega dados
-    refs_path = Path(__file__).parent.parent / 'assets' / 'referencias.json'
-    with open(refs_path, 'r', encoding='utf-8') as f:
-        referencias = json.load(f)
+    referencias = load_json(REFERENCIAS_FILE)
     
     # Contadores
     changes = {}
@@ -89,8 +86,7 @@ def consolidate_categories():
             changes[key] = changes.get(key, 0) + 1
     
     # Salva resultado
-    with open(refs_path, 'w', encoding='utf-8') as f:
-        json.dump(referencias, f, ensure_ascii=False, indent=2)
+    save_json(REFERENCIAS_FILE, referencias)
     
     # Mostra resumo
     print("Consolidação de categorias concluída!\n")
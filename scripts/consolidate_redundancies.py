@@ -3,10 +3,15 @@
 Consolida conceitos redundantes na ontologia.
 Estratégia: fundir duplicatas mantendo o conceito mais desenvolvido
 e transferir todas as relações para a versão consolidada.
+
+Uso:
+    python3 scripts/consolidate_redundancies.py         # lê e grava os JSON
+    python3 scripts/consolidate_redundancies.py --db    # grava no banco SQLite e exporta os JSON
 """
+import sys
 
-import json
-from pathlib import Path
+from ontology import CONCEPTS_FILE, RELATIONS_FILE, OntologyGraph, load_json
+from ontology.store import STORE_FILE, open_store
 
 # Redundâncias identificadas: (manter, remover, motivo)
 REDUNDANCIES = [
@@ -43,21 +48,14 @@ REDUNDANCIES = [
     }
 ]
 
-def load_json(filepath):
-    """Carrega JSON com encoding UTF-8"""
-    with open(filepath, 'r', encoding='utf-8') as f:
-        return json.load(f)
-
-def save_json(filepath, data):
-    """Salva JSON com indentação e UTF-8"""
-    with open(filepath, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
-
-def consolidate_concepts(concepts_path, relations_path):
-    """Consolida conceitos redundantes"""
+def consolidate_concepts(concepts_path, relations_path, store=None):
+    """Consolida conceitos redundantes (no banco SQLite se `store`)"""
     
-    concepts = load_json(concepts_path)
-    relations = load_json(relations_path)
+    if store is not None:
+        graph = store.graph()
+    else:
+        graph = OntologyGraph.load(concepts_path, relations_path)
+    concepts, relations = graph.concepts, graph.relations
     
     print(f"📊 Estado inicial: {len(concepts)} conceitos, {len(relations)} relações\n")
     
@@ -90,6 +88,7 @@ def consolidate_concepts(concepts_path, relations_path):
                         if other['layer'] in ['politica', 'pratica']:
                             idx = other['connections'].index(old_id)
                             other['connections'][idx] = 'politica-escala'
+        graph.reindex()
         print()
     
     # 2. Processar redundâncias
@@ -109,8 +108,8 @@ def consolidate_concepts(concepts_path, relations_path):
         print(f"   Motivo: {reason}")
         
         # Verificar se ambos existem
-        keep_concept = next((c for c in concepts if c['id'] == keep_id), None)
-        remove_concept = next((c for c in concepts if c['id'] == remove_id), None)
+        keep_concept = graph.concept(keep_id)
+        remove_concept = graph.concept(remove_id)
         
         if not keep_concept:
             print(f"   ⚠️  Conceito '{keep_id}' não encontrado - pulando")
@@ -129,13 +128,12 @@ def consolidate_concepts(concepts_path, relations_path):
             print(f"   + {len(new_connections)} conexões transferidas: {', '.join(new_connections)}")
         
         # Atualizar todas as relações que referenciam o conceito removido
-        for relation in relations:
-            if relation['from'] == remove_id:
-                relation['from'] = keep_id
-                updated_relations += 1
-            if relation['to'] == remove_id:
-                relation['to'] = keep_id
-                updated_relations += 1
+        for relation in list(graph.relations_from(remove_id)):
+            graph.retarget_relation(relation, from_id=keep_id)
+            updated_relations += 1
+        for relation in list(graph.relations_to(remove_id)):
+            graph.retarget_relation(relation, to_id=keep_id)
+            updated_relations += 1
         
         # Atualizar referências em connections de outros conceitos
         for concept in concepts:
@@ -146,7 +144,7 @@ def consolidate_concepts(concepts_path, relations_path):
                     print(f"   ↪ Atualizada referência em '{concept['id']}'")
         
         # Remover conceito redundante
-        concepts = [c for c in concepts if c['id'] != remove_id]
+        graph.remove_concept(remove_id)
         removed_count += 1
         print(f"   ✓ Conceito '{remove_id}' removido\n")
     
@@ -175,8 +173,17 @@ def consolidate_concepts(concepts_path, relations_path):
         print(f"\n🔧 {duplicates_removed} relações duplicadas removidas")
     
     # Salvar
-    save_json(concepts_path, concepts)
-    save_json(relations_path, unique_relations)
+    graph.concepts, graph.relations = concepts, unique_relations
+    if store is not None:
+        # Só as linhas alteradas/removidas são gravadas; os JSON saem do banco
+        changed = store.save_graph(graph)
+        store.export_json(concepts_path, relations_path, referencias_file=None)
+        print(f"\n💾 {STORE_FILE.name}: {changed['concepts'][0]} conceitos alterados, "
+              f"{changed['concepts'][1]} removidos; {changed['relations'][0]} relações "
+              f"alteradas, {changed['relations'][1]} removidas")
+    else:
+        # Via graph.save(): se havia transações no journal, compacta e arquiva
+        graph.save(concepts_path, relations_path)
     
     print(f"\n✅ Consolidação completa:")
     print(f"   Conceitos: {len(load_json(concepts_path))} ({len(concepts)} → {len(concepts) - removed_count} = -{removed_count})")
@@ -189,14 +196,22 @@ def consolidate_concepts(concepts_path, relations_path):
     }
 
 if __name__ == '__main__':
-    base_path = Path(__file__).parent.parent / 'assets'
-    concepts_path = base_path / 'concepts.json'
-    relations_path = base_path / 'relations.json'
+    concepts_path = CONCEPTS_FILE
+    relations_path = RELATIONS_FILE
     
     print("=" * 60)
     print("CONSOLIDAÇÃO DE REDUNDÂNCIAS CONCEITUAIS")
     print("=" * 60 + "\n")
     
-    result = consolidate_concepts(concepts_path, relations_path)
+    if '--db' in sys.argv:
+        try:
+            store = open_store()
+        except ValueError as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+        with store:
+            result = consolidate_concepts(concepts_path, relations_path, store)
+    else:
+        result = consolidate_concepts(concepts_path, relations_path)
     
     print("\n" + "=" * 60)
@@ -4,17 +4,9 @@ Diversifica tipos de relações para aumentar riqueza semântica do rizoma.
 Substitui relações genéricas por variações contextuais.
 """
 
-import json
-import re
 from collections import defaultdict
 
-def load_json(filepath):
-    with open(filepath, 'r', encoding='utf-8') as f:
-        return json.load(f)
-
-def save_json(filepath, data):
-    with open(filepath, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+from ontology import OntologyGraph
 
 def diversify_emancipa(relation, index):
     """Diversifica 'emancipa-se via' baseado em contexto."""
@@ -145,7 +137,8 @@ def main():
     print("🔄 Diversificando tipos de relações...")
     
     # Carrega dados
-    relations = load_json('assets/relations.json')
+    graph = OntologyGraph.load()
+    relations = graph.relations
     
     # Contadores
     changes = defaultdict(int)
@@ -169,8 +162,8 @@ def main():
             if rel['name'] != original:
                 changes['possibilita'] += 1
     
-    # Salva resultado
-    save_json('assets/relations.json', relations)
+    # Salva resultado (via graph.save(): se havia transações no journal, compacta e arquiva)
+    graph.save(concepts_file=None)
     
     print(f"\n✅ Diversificação concluída:")
     for tipo, count in sorted(changes.items(), key=lambda x: x[1], reverse=True):
@@ -7,21 +7,15 @@ Gera chapter-metadata.json com informações sobre conceitos, autores e distribu
 import json
 import re
 from collections import defaultdict
-from pathlib import Path
 
-def load_concepts():
-    """Carrega os conceitos do arquivo JSON"""
-    with open('assets/concepts.json', 'r', encoding='utf-8') as f:
-        return json.load(f)
+from ontology import ASSETS_DIR, BASE_DIR, OntologyGraph
+from ontology.matcher import load_matcher
 
-def load_relations():
-    """Carrega as relações do arquivo JSON"""
-    with open('assets/relations.json', 'r', encoding='utf-8') as f:
-        return json.load(f)
+LIVRO_FILE = BASE_DIR / '…_.md'
 
 def load_livro_markdown():
     """Carrega o conteúdo do livro"""
-    with open('…_.md', 'r', encoding='utf-8') as f:
+    with open(LIVRO_FILE, 'r', encoding='utf-8') as f:
         return f.read()
 
 def extract_chapters(markdown_content):
@@ -56,65 +50,57 @@ def extract_chapters(markdown_content):
     
     return chapters
 
-def extract_concepts_from_text(text, concepts):
-    """Extrai conceitos mencionados no texto"""
-    concept_mentions = defaultdict(int)
-    
-    # Criar mapa de nomes de conceitos
+# Lista de autores conhecidos do contexto do livro
+KNOWN_AUTHORS = [
+    'Nāgārjuna', 'Carlo Rovelli', 'Karen Barad', 'Jay Garfield',
+    'Jan Westerhoff', 'Graham Priest', 'Slavoj Žižek',
+    'Michel Foucault', 'Judith Butler', 'bell hooks',
+    'Donna Haraway', 'Bruno Latour', 'Isabelle Stengers',
+    'Eduardo Viveiros de Castro', 'Ailton Krenak',
+    'Denise Ferreira da Silva', 'Lélia Gonzalez',
+    'Patricia Hill Collins', 'Frantz Fanon',
+    'Gayatri Spivak', 'Sara Ahmed', 'Eve Tuck',
+    'Robin Wall Kimmerer', 'Tyson Yunkaporta',
+    'Leanne Betasamosake Simpson', 'Glen Coulthard',
+    'Audra Simpson', 'Kim TallBear', 'Zoe Todd',
+    'Vanessa Watts', 'Kyle Whyte', 'Dian Million'
+]
+
+def mention_matcher(concepts):
+    """
+    Autômato único (Aho-Corasick) com os nomes de todos os conceitos e dos
+    autores conhecidos, reaproveitado do cache enquanto a lista não mudar
+    """
+    patterns = defaultdict(list)
+    # Nomes repetidos (sem diferença de caixa): vale o último conceito
     concept_map = {c['name'].lower(): c for c in concepts}
-    
-    # Contar menções de cada conceito
     for concept_name, concept in concept_map.items():
-        # Buscar o nome do conceito com word boundaries
-        pattern = r'\b' + re.escape(concept_name) + r'\b'
-        matches = re.findall(pattern, text, re.IGNORECASE)
-        if matches:
-            concept_mentions[concept['id']] = len(matches)
-    
-    return concept_mentions
+        patterns[concept_name].append(('concept', concept['id']))
+    for author in KNOWN_AUTHORS:
+        patterns[author].append(('author', author))
+    return load_matcher(dict(patterns))
 
-def extract_authors_from_text(text):
-    """Extrai citações de autores do texto"""
+def extract_mentions(text, matcher):
+    """
+    Conceitos ({id: menções}) e autores citados no texto, numa única
+    passada (fronteira de palavra, sem acentos, vale a menção mais longa)
+    """
+    concept_mentions = defaultdict(int)
     authors = set()
-    
-    # Padrões comuns de citação
-    # Padrão 1: Nome com inicial maiúscula seguido de vírgula ou ponto
-    # Padrão 2: Nome entre parênteses
-    # Padrão 3: Nome seguido de ano entre parênteses
-    
-    # Lista de autores conhecidos do contexto do livro
-    known_authors = [
-        'Nāgārjuna', 'Carlo Rovelli', 'Karen Barad', 'Jay Garfield',
-        'Jan Westerhoff', 'Graham Priest', 'Slavoj Žižek',
-        'Michel Foucault', 'Judith Butler', 'bell hooks',
-        'Donna Haraway', 'Bruno Latour', 'Isabelle Stengers',
-        'Eduardo Viveiros de Castro', 'Ailton Krenak',
-        'Denise Ferreira da Silva', 'Lélia Gonzalez',
-        'Patricia Hill Collins', 'Frantz Fanon',
-        'Gayatri Spivak', 'Sara Ahmed', 'Eve Tuck',
-        'Robin Wall Kimmerer', 'Tyson Yunkaporta',
-        'Leanne Betasamosake Simpson', 'Glen Coulthard',
-        'Audra Simpson', 'Kim TallBear', 'Zoe Todd',
-        'Vanessa Watts', 'Kyle Whyte', 'Dian Million'
-    ]
-    
-    for author in known_authors:
-        # Buscar menções do autor (case insensitive)
-        if re.search(r'\b' + re.escape(author) + r'\b', text, re.IGNORECASE):
-            authors.add(author)
-    
-    return list(authors)
+    for (kind, value), count in matcher.count(text).items():
+        if kind == 'concept':
+            concept_mentions[value] = count
+        else:
+            authors.add(value)
+    return concept_mentions, [author for author in KNOWN_AUTHORS if author in authors]
 
-def calculate_layer_distribution(concept_mentions, concepts):
+def calculate_layer_distribution(concept_mentions, graph):
     """Calcula a distribuição de conceitos por camada ontológica"""
     distribution = defaultdict(int)
     
-    # Criar mapa de conceitos por ID
-    concept_map = {c['id']: c for c in concepts}
-    
     for concept_id, mentions in concept_mentions.items():
-        if concept_id in concept_map:
-            layer = concept_map[concept_id]['layer']
+        if concept_id in graph:
+            layer = graph.concept(concept_id)['layer']
             # Remover sufixo numérico de subcamadas
             base_layer = layer.split('-')[0]
             distribution[base_layer] += mentions
@@ -154,7 +140,7 @@ def generate_chapter_id(title):
     
     return chapter_id
 
-def extract_chapter_metadata(chapters, concepts, relations):
+def extract_chapter_metadata(chapters, graph):
     """Extrai metadados de todos os capítulos"""
     metadata = {
         'chapters': []
@@ -162,6 +148,7 @@ def extract_chapter_metadata(chapters, concepts, relations):
     
     # Identificar partes do livro (análise simples)
     current_part = 'I'
+    matcher = mention_matcher(graph.concepts)
     
     for i, chapter in enumerate(chapters, start=1):
         title = chapter['title']
@@ -174,9 +161,8 @@ def extract_chapter_metadata(chapters, concepts, relations):
             current_part = 'III'
         
         # Extrair informações
-        concept_mentions = extract_concepts_from_text(content, concepts)
-        authors = extract_authors_from_text(content)
-        layer_dist = calculate_layer_distribution(concept_mentions, concepts)
+        concept_mentions, authors = extract_mentions(content, matcher)
+        layer_dist = calculate_layer_distribution(concept_mentions, graph)
         protocols = identify_protocols(content)
         
         # Criar estrutura de metadados
@@ -206,13 +192,10 @@ def main():
     print('🔍 Extraindo metadados dos capítulos...\n')
     
     # Carregar dados
-    print('📚 Carregando conceitos...')
-    concepts = load_concepts()
-    print(f'  ✓ {len(concepts)} conceitos carregados')
-    
-    print('🔗 Carregando relações...')
-    relations = load_relations()
-    print(f'  ✓ {len(relations)} relações carregadas')
+    print('📚 Carregando ontologia...')
+    graph = OntologyGraph.load()
+    print(f'  ✓ {len(graph.concepts)} conceitos carregados')
+    print(f'  ✓ {len(graph.relations)} relações carregadas')
     
     print('📖 Carregando livro...')
     markdown = load_livro_markdown()
@@ -223,7 +206,7 @@ def main():
     print(f'  ✓ {len(chapters)} capítulos encontrados')
     
     print('\n🔬 Analisando capítulos...')
-    metadata = extract_chapter_metadata(chapters, concepts, relations)
+    metadata = extract_chapter_metadata(chapters, graph)
     
     # Estatísticas
     total_concepts = sum(len(ch['concepts']) for ch in metadata['chapters'])
@@ -235,7 +218,7 @@ def main():
     print(f'  • {total_authors} citações de autores identificadas')
     
     # Salvar arquivo
-    output_path = Path('assets/chapter-metadata.json')
+    output_path = ASSETS_DIR / 'chapter-metadata.json'
     print(f'\n💾 Salvando em {output_path}...')
     
     with open(output_path, 'w', encoding='utf-8') as f:
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Encontra quase-duplicatas na ontologia CRIOS (MinHash + LSH)
+Substitui a caça manual de redundâncias (REDUNDANCIES em
+consolidate_redundancies.py, casos especiais em fix_duplicates.py)
+
+- conceitos: pares com nome + descrição parecidos, com sugestão de qual
+  manter (mais conexões, depois descrição mais longa)
+- relações: descrições quase iguais ligando o mesmo par de conceitos
+  (candidatas a fusão) e os maiores grupos de descrições-modelo
+
+Uso:
+    python3 scripts/find_duplicates.py                         # conceitos
+    python3 scripts/find_duplicates.py --target=relations
+    python3 scripts/find_duplicates.py --threshold=0.7 --limit=50
+    python3 scripts/find_duplicates.py --json                  # formato de REDUNDANCIES
+"""
+
+import json
+import sys
+import time
+
+from ontology import OntologyGraph, pair_key
+from ontology.dedup import THRESHOLD, duplicate_groups, near_duplicates
+
+TARGETS = ('concepts', 'relations')
+
+# Grupos de descrições-modelo listados para relações
+TEMPLATE_GROUPS = 10
+
+
+def option(name, default):
+    """Valor de uma opção --nome=valor"""
+    values = [a.split('=', 1)[1] for a in sys.argv[1:] if a.startswith(f'--{name}=')]
+    return values[-1] if values else default
+
+
+def concept_text(concept):
+    """Texto comparado de um conceito (nome + descrição)"""
+    return f"{concept.get('name', '')} {concept.get('description', '')}"
+
+
+def concept_candidates(graph, threshold):
+    """[(jaccard, manter, remover), ...] em ordem decrescente de similaridade"""
+    concepts = graph.concepts
+    pairs = near_duplicates([concept_text(c) for c in concepts], threshold)
+    result = []
+    for similarity, i, j in pairs:
+        a, b = concepts[i], concepts[j]
+        rank_a = (graph.degree(a['id']), len(a.get('description', '')))
+        rank_b = (graph.degree(b['id']), len(b.get('description', '')))
+        keep, remove = (a, b) if rank_a >= rank_b else (b, a)
+        result.append((similarity, keep, remove))
+    return result
+
+
+def relation_candidates(graph, threshold):
+    """
+    ([(jaccard, relação, relação), ...] no mesmo par de conceitos,
+    [grupo de índices, ...] de descrições parecidas em qualquer par)
+    """
+    relations = graph.relations
+    pairs = near_duplicates([r.get('description', '') for r in relations], threshold)
+    same_pair = [(similarity, relations[i], relations[j]) for similarity, i, j in pairs
+                 if pair_key(relations[i]['from'], relations[i]['to'])
+                 == pair_key(relations[j]['from'], relations[j]['to'])]
+    return same_pair, duplicate_groups(pairs, len(relations))
+
+
+def report_concepts(graph, threshold, limit, as_json):
+    candidates = concept_candidates(graph, threshold)
+    if as_json:
+        print(json.dumps([{
+            'keep': keep['id'],
+            'remove': remove['id'],
+            'reason': f"Descrições quase idênticas (Jaccard {similarity:.2f})",
+        } for similarity, keep, remove in candidates[:limit]], ensure_ascii=False, indent=2))
+        return
+
+    print(f"\n🔁 {len(candidates)} pares de conceitos com Jaccard ≥ {threshold}:")
+    for similarity, keep, remove in candidates[:limit]:
+        print(f"   {similarity:.2f}  {keep['name'][:35]:35s} ← {remove['name'][:35]:35s}"
+              f" ({keep['id']} mantém, {remove['id']} sai)")
+
+
+def report_relations(graph, threshold, limit, as_json):
+    same_pair, groups = relation_candidates(graph, threshold)
+    relations = graph.relations
+    if as_json:
+        print(json.dumps([{
+            'similarity': round(similarity, 4),
+            'keep': {k: a[k] for k in ('from', 'to', 'name')},
+            'remove': {k: b[k] for k in ('from', 'to', 'name')},
+        } for similarity, a, b in same_pair[:limit]], ensure_ascii=False, indent=2))
+        return
+
+    print(f"\n🔁 {len(same_pair)} pares de relações parecidas no mesmo par de conceitos:")
+    for similarity, a, b in same_pair[:limit]:
+        print(f"   {similarity:.2f}  {a['from']} ↔ {a['to']}: '{a['name']}' / '{b['name']}'")
+
+    print(f"\n📋 {len(groups)} grupos de descrições parecidas (maiores):")
+    for group in groups[:TEMPLATE_GROUPS]:
+        sample = relations[group[0]].get('description', '')
+        print(f"   {len(group):5d} × {sample[:70]}")
+
+
+def main():
+    target = option('target', 'concepts')
+    threshold = float(option('threshold', THRESHOLD))
+    limit = int(option('limit', 30))
+    as_json = '--json' in sys.argv
+    if target not in TARGETS:
+        print(f"❌ Alvo desconhecido: {target} (use {', '.join(TARGETS)})")
+        sys.exit(1)
+
+    graph = OntologyGraph.load()
+    start = time.perf_counter()
+    if target == 'concepts':
+        if not as_json:
+            print("🔍 QUASE-DUPLICATAS DE CONCEITOS (MinHash + LSH)")
+            print("=" * 70)
+        report_concepts(graph, threshold, limit, as_json)
+    else:
+        if not as_json:
+            print("🔍 QUASE-DUPLICATAS DE RELAÇÕES (MinHash + LSH)")
+            print("=" * 70)
+        report_relations(graph, threshold, limit, as_json)
+    if not as_json:
+        print(f"\n⏱️  {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -2,56 +2,25 @@
 """
 Ajusta fino a distribuição para maximizar o score de normalidade
 """
-import json
-import math
 import random
-from pathlib import Path
 from collections import Counter
 
-def load_json(filepath):
-    with open(filepath, 'r', encoding='utf-8') as f:
-        return json.load(f)
-
-def save_json(filepath, data):
-    with open(filepath, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
-
-def calculate_score(connections):
-    n = len(connections)
-    mean = sum(connections) / n
-    variance = sum((x - mean) ** 2 for x in connections) / n
-    std_dev = math.sqrt(variance)
-    
-    skewness = sum((x - mean) ** 3 for x in connections) / (n * std_dev ** 3) if std_dev > 0 else 0
-    kurtosis = sum((x - mean) ** 4 for x in connections) / (n * std_dev ** 4) - 3 if std_dev > 0 else 0
-    
-    within_1sigma = sum(1 for x in connections if abs(x - mean) <= std_dev)
-    within_2sigma = sum(1 for x in connections if abs(x - mean) <= 2 * std_dev)
-    
-    deviation_1sigma = abs(within_1sigma/n*100 - 68)
-    deviation_2sigma = abs(within_2sigma/n*100 - 95)
-    
-    score = 100
-    score -= min(deviation_1sigma * 2, 30)
-    score -= min(deviation_2sigma * 1, 20)
-    score -= min(abs(skewness) * 20, 20)
-    score -= min(abs(kurtosis) * 10, 15)
-    
-    return score, mean, std_dev, skewness, kurtosis, within_1sigma/n*100
+from ontology import OntologyGraph
+from ontology.distribution import DegreeAccumulator
 
 def main():
-    assets_dir = Path(__file__).parent.parent / 'assets'
-    concepts_file = assets_dir / 'concepts.json'
-    relations_file = assets_dir / 'relations.json'
-    
     print("🎯 AJUSTE FINO DA DISTRIBUIÇÃO DE CONECTIVIDADE")
     print("=" * 70)
     
-    concepts = load_json(concepts_file)
-    relations = load_json(relations_file)
+    graph = OntologyGraph.load()
+    concepts = graph.concepts
     
     connections = [len(c['connections']) for c in concepts]
-    score_before, mean, std_dev, skew, kurt, within1 = calculate_score(connections)
+    # Score incremental: cada movimento candidato é avaliado em O(1)
+    degrees = DegreeAccumulator(connections)
+    before = degrees.normality()
+    score_before, skew, kurt, within1 = (before['score'], before['skewness'],
+                                         before['kurtosis'], before['within_1sigma'])
     
     print(f"\n📊 ESTADO ATUAL:")
     print(f"   Score: {score_before:.0f}/100")
@@ -68,7 +37,7 @@ def main():
     # Mover alguns de 8,9,10 para 7
     # Mover alguns de 4 para 5
     
-    concepts_by_id = {c['id']: c for c in concepts}
+    concepts_by_id = graph.by_id
     
     print(f"\n🔄 AJUSTE:")
     changes = 0
@@ -82,10 +51,11 @@ def main():
                          and len(c['connections']) <= 8]
             if candidates:
                 target = random.choice(candidates)
+                degrees.apply([(4, 5), (len(target['connections']), len(target['connections']) + 1)])
                 concept['connections'].append(target['id'])
                 target['connections'].append(concept['id'])
                 
-                relations.append({
+                graph.add_relation({
                     'from': concept['id'],
                     'to': target['id'],
                     'name': 'relaciona-se com',
@@ -106,15 +76,14 @@ def main():
             if well_connected:
                 to_remove = well_connected[0]
                 concept['connections'].remove(to_remove)
+                degrees.change(9, 8)
                 
                 other = concepts_by_id[to_remove]
                 if concept['id'] in other['connections']:
                     other['connections'].remove(concept['id'])
+                    degrees.change(len(other['connections']) + 1, len(other['connections']))
                 
-                relations[:] = [r for r in relations if not (
-                    (r['from'] == concept['id'] and r['to'] == to_remove) or
-                    (r['from'] == to_remove and r['to'] == concept['id'])
-                )]
+                graph.remove_relations_between(concept['id'], to_remove)
                 
                 moved_down += 1
     
@@ -122,7 +91,9 @@ def main():
     
     # Resultado
     connections_new = [len(c['connections']) for c in concepts]
-    score_after, mean2, std2, skew2, kurt2, within1_2 = calculate_score(connections_new)
+    after = degrees.normality()
+    score_after, skew2, kurt2, within1_2 = (after['score'], after['skewness'],
+                                            after['kurtosis'], after['within_1sigma'])
     
     print(f"\n📊 RESULTADO:")
     print(f"   Score: {score_before:.0f} → {score_after:.0f}")
@@ -138,8 +109,7 @@ def main():
     
     if score_after > score_before:
         print(f"\n   ✅ MELHORIA: +{score_after - score_before:.0f} pontos")
-        save_json(concepts_file, concepts)
-        save_json(relations_file, relations)
+        graph.save()
         print(f"   💾 Mudanças salvas")
     else:
         print(f"\n   ⚠️  Score não melhorou, não salvando")
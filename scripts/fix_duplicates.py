@@ -2,28 +2,15 @@
 """
 Fix duplicate concepts and orphan references
 """
-import json
-from pathlib import Path
-
-def load_json(filepath):
-    with open(filepath, 'r', encoding='utf-8') as f:
-        return json.load(f)
-
-def save_json(filepath, data):
-    with open(filepath, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+from ontology import OntologyGraph
 
 def main():
-    assets_dir = Path(__file__).parent.parent / 'assets'
-    concepts_file = assets_dir / 'concepts.json'
-    relations_file = assets_dir / 'relations.json'
-    
     print("🔧 CORREÇÃO DE DUPLICATAS E REFERÊNCIAS ÓRFÃS")
     print("=" * 60)
     
     # Load data
-    concepts = load_json(concepts_file)
-    relations = load_json(relations_file)
+    graph = OntologyGraph.load()
+    concepts, relations = graph.concepts, graph.relations
     
     print(f"\n📚 Carregando dados:")
     print(f"   • {len(concepts)} conceitos")
@@ -41,7 +28,7 @@ def main():
             print(f"   🗑️  Removendo duplicata: {concept['id']}")
             removed_ids.add(concept['id'])
             # Merge connections into the kept one
-            kept_concept = next(c for c in concepts if c['id'] == 'realismo agencial')
+            kept_concept = graph.concept('realismo agencial')
             for conn in concept['connections']:
                 if conn not in kept_concept['connections']:
                     kept_concept['connections'].append(conn)
@@ -116,10 +103,10 @@ def main():
     
     # Save
     print(f"\n💾 Salvando mudanças:")
-    save_json(concepts_file, concepts_filtered)
+    # Via graph.save(): se havia transações no journal, compacta e arquiva
+    graph.concepts, graph.relations = concepts_filtered, relations_final
+    graph.save()
     print(f"   ✅ Conceitos: {len(concepts_filtered)} (era {len(concepts)})")
-    
-    save_json(relations_file, relations_final)
     print(f"   ✅ Relações: {len(relations_final)} (era {len(relations)})")
     
     print("\n" + "=" * 60)
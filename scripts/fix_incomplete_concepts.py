@@ -6,16 +6,17 @@ Fix incomplete concepts in concepts.json:
 3. Add empty connections array if missing
 """
 
-import json
 import sys
 from pathlib import Path
 
+from ontology import CONCEPTS_FILE, OntologyGraph
+
 def fix_concepts(concepts_path: Path):
     """Fix incomplete concepts."""
     
-    # Load concepts
-    with open(concepts_path, 'r', encoding='utf-8') as f:
-        concepts = json.load(f)
+    # Load concepts (pending journal transactions replayed)
+    graph = OntologyGraph.load(concepts_file=concepts_path)
+    concepts = graph.concepts
     
     fixed_count = 0
     
@@ -43,15 +44,14 @@ def fix_concepts(concepts_path: Path):
         if changed:
             fixed_count += 1
     
-    # Save fixed concepts
-    with open(concepts_path, 'w', encoding='utf-8') as f:
-        json.dump(concepts, f, ensure_ascii=False, indent=2)
+    # Save fixed concepts (compacts and archives the journal if it had pending transactions)
+    graph.save(concepts_file=concepts_path, relations_file=None)
     
     print(f"✅ Fixed {fixed_count} concepts")
     return fixed_count
 
 if __name__ == '__main__':
-    concepts_path = Path(__file__).parent.parent / 'assets' / 'concepts.json'
+    concepts_path = CONCEPTS_FILE
     
     if not concepts_path.exists():
         print(f"❌ Concepts file not found: {concepts_path}")
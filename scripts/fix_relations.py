@@ -1,15 +1,16 @@
 #!/usr/bin/env python3
 """
 Script para corrigir relações quebradas após mesclas de conceitos
+
+Uso:
+    python3 scripts/fix_relations.py         # corrige assets/relations.json
+    python3 scripts/fix_relations.py --db    # corrige assets/ontology.sqlite e exporta o JSON
 """
 
-import json
-from pathlib import Path
+import sys
 
-# Caminhos
-BASE_DIR = Path(__file__).parent.parent
-CONCEPTS_FILE = BASE_DIR / 'assets' / 'concepts.json'
-RELATIONS_FILE = BASE_DIR / 'assets' / 'relations.json'
+from ontology import OntologyGraph
+from ontology.store import STORE_FILE, open_store
 
 # Mapeamento de IDs antigos para novos (baseado em mesclas anteriores)
 ID_MAPPING = {
@@ -26,98 +27,141 @@ ID_MAPPING = {
 }
 
 
-def load_json(filepath):
-    with open(filepath, 'r', encoding='utf-8') as f:
-        return json.load(f)
-
-
-def save_json(filepath, data):
-    with open(filepath, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
-
-
-def main():
-    print("="*60)
-    print("  CORREÇÃO DE RELAÇÕES QUEBRADAS")
-    print("="*60)
+def fix_relation(rel, valid_ids):
+    """
+    (origem, destino, IDs mapeados, válida): válida é False se a relação
+    deve ser removida (ID inválido ou auto-relação)
+    """
+    from_id = rel['from']
+    to_id = rel['to']
+    updated = 0
     
-    # Carregar dados
-    concepts = load_json(CONCEPTS_FILE)
-    relations = load_json(RELATIONS_FILE)
+    # Mapear IDs antigos
+    if from_id in ID_MAPPING:
+        old_from = from_id
+        from_id = ID_MAPPING[from_id]
+        print(f"🔄 FROM: {old_from} → {from_id}")
+        updated += 1
     
-    # Criar set de IDs válidos
-    valid_ids = set(c['id'] for c in concepts)
+    if to_id in ID_MAPPING:
+        old_to = to_id
+        to_id = ID_MAPPING[to_id]
+        print(f"🔄 TO: {old_to} → {to_id}")
+        updated += 1
     
-    print(f"\n📚 {len(concepts)} conceitos válidos")
-    print(f"🔗 {len(relations)} relações totais\n")
+    # Verificar se IDs existem
+    if from_id not in valid_ids:
+        print(f"🗑️  Removendo (origem inválida): {from_id} → {to_id}")
+        return from_id, to_id, updated, False
     
-    # Corrigir relações
-    fixed_relations = []
-    removed = 0
-    updated = 0
+    if to_id not in valid_ids:
+        print(f"🗑️  Removendo (destino inválido): {from_id} → {to_id}")
+        return from_id, to_id, updated, False
     
-    for rel in relations:
-        from_id = rel['from']
-        to_id = rel['to']
-        
-        # Mapear IDs antigos
-        if from_id in ID_MAPPING:
-            old_from = from_id
-            from_id = ID_MAPPING[from_id]
-            print(f"🔄 FROM: {old_from} → {from_id}")
-            updated += 1
-        
-        if to_id in ID_MAPPING:
-            old_to = to_id
-            to_id = ID_MAPPING[to_id]
-            print(f"🔄 TO: {old_to} → {to_id}")
-            updated += 1
-        
-        # Verificar se IDs existem
-        if from_id not in valid_ids:
-            print(f"🗑️  Removendo (origem inválida): {from_id} → {to_id}")
-            removed += 1
-            continue
-        
-        if to_id not in valid_ids:
-            print(f"🗑️  Removendo (destino inválido): {from_id} → {to_id}")
+    # Evitar auto-relações
+    if from_id == to_id:
+        print(f"🗑️  Removendo (auto-relação): {from_id}")
+        return from_id, to_id, updated, False
+    
+    return from_id, to_id, updated, True
+
+
+def fix_rows(rows, valid_ids):
+    """
+    Corrige pares (chave, relação) em ordem; retorna (mantidas, alteradas,
+    descartadas, contagens), com `alteradas` ⊆ `mantidas` e chaves das
+    descartadas (inválidas ou duplicadas)
+    """
+    kept, changed, dropped = [], [], []
+    removed = updated = duplicates = 0
+    seen = set()
+    
+    for key, rel in rows:
+        from_id, to_id, mapped, valid = fix_relation(rel, valid_ids)
+        updated += mapped
+        if not valid:
             removed += 1
+            dropped.append(key)
             continue
         
-        # Evitar auto-relações
-        if from_id == to_id:
-            print(f"🗑️  Removendo (auto-relação): {from_id}")
-            removed += 1
+        # Remover duplicatas
+        if (from_id, to_id) in seen:
+            duplicates += 1
+            dropped.append(key)
             continue
+        seen.add((from_id, to_id))
         
-        rel['from'] = from_id
-        rel['to'] = to_id
-        fixed_relations.append(rel)
+        if mapped:
+            rel['from'] = from_id
+            rel['to'] = to_id
+            changed.append((key, rel))
+        kept.append((key, rel))
     
-    # Remover duplicatas
-    unique_relations = []
-    seen = set()
-    duplicates = 0
+    return kept, changed, dropped, (updated, removed, duplicates)
+
+
+def fix_json():
+    """Corrige assets/relations.json regravando o arquivo"""
+    graph = OntologyGraph.load()
+    concepts, relations = graph.concepts, graph.relations
+    valid_ids = set(c['id'] for c in concepts)
     
-    for rel in fixed_relations:
-        key = (rel['from'], rel['to'])
-        if key not in seen:
-            seen.add(key)
-            unique_relations.append(rel)
-        else:
-            duplicates += 1
+    print(f"\n📚 {len(concepts)} conceitos válidos")
+    print(f"🔗 {len(relations)} relações totais\n")
+    
+    kept, _, _, counts = fix_rows(enumerate(relations), valid_ids)
+    graph.relations = [rel for _, rel in kept]
+    # Via graph.save(): se havia transações no journal, compacta e arquiva
+    graph.save(concepts_file=None)
+    return len(relations), len(kept), counts
+
+
+def fix_store():
+    """
+    Corrige o banco SQLite numa transação, tocando só as linhas alteradas
+    ou removidas, e exporta relations.json a partir dele
+    """
+    try:
+        store = open_store()
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    
+    with store:
+        concepts = store.concepts()
+        valid_ids = set(c['id'] for c in concepts)
+        rows = store.relations_where()
+        
+        print(f"\n📚 {len(concepts)} conceitos válidos")
+        print(f"🔗 {len(rows)} relações totais\n")
+        
+        kept, changed, dropped, counts = fix_rows(rows, valid_ids)
+        with store.transaction():
+            store.update_relations(changed)
+            store.delete_relations(dropped)
+        store.export_json(concepts_file=None, referencias_file=None)
+        print(f"💾 {STORE_FILE.name}: {len(changed)} relações atualizadas, {len(dropped)} removidas")
+    return len(rows), len(kept), counts
+
+
+def main():
+    print("="*60)
+    print("  CORREÇÃO DE RELAÇÕES QUEBRADAS")
+    print("="*60)
     
-    # Salvar
-    save_json(RELATIONS_FILE, unique_relations)
+    if '--db' in sys.argv:
+        total, final, (updated, removed, duplicates) = fix_store()
+    else:
+        total, final, (updated, removed, duplicates) = fix_json()
     
     print(f"\n{'='*60}")
     print(f"✅ CORREÇÃO CONCLUÍDA")
     print(f"{'='*60}")
-    print(f"  Relações originais:     {len(relations)}")
+    print(f"  Relações originais:     {total}")
     print(f"  IDs atualizados:        {updated}")
     print(f"  Relações removidas:     {removed}")
     print(f"  Duplicatas removidas:   {duplicates}")
-    print(f"  Relações finais:        {len(unique_relations)}")
+    print(f"  Relações finais:        {final}")
     print(f"{'='*60}\n")
 
 
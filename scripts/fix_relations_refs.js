@@ -1,5 +1,6 @@
 #!/usr/bin/env node
 
+import { execFileSync } from 'child_process';
 import { readFileSync, writeFileSync } from 'fs';
 
 console.log('🔧 Corrigindo referências em relations.json...\n');
@@ -57,10 +58,8 @@ if (notFoundTo.size > 0) {
   if (notFoundTo.size > 5) console.log(`      ... e mais ${notFoundTo.size - 5}`);
 }
 
-// Salvar backup
-const backupPath = './assets/relations.json.backup_before_fix';
-writeFileSync(backupPath, JSON.stringify(relations, null, 2));
-console.log(`\n💾 Backup salvo em: ${backupPath}`);
+// Registrar versão atual no histórico (substitui o antigo .backup_before_fix)
+execFileSync('python3', ['scripts/ontology_versions.py', 'snapshot', 'antes de fix_relations_refs'], { stdio: 'inherit' });
 
 // Salvar arquivo corrigido
 writeFileSync('./assets/relations.json', JSON.stringify(fixedRelations, null, 2));
@@ -4,53 +4,21 @@ Script de normalização da distribuição de conectividade
 Ajusta conexões para aproximar distribuição gaussiana (normal)
 """
 
-import json
-import statistics
 import random
 from collections import defaultdict
-from pathlib import Path
 
-# Caminhos
-BASE_DIR = Path(__file__).parent.parent
-CONCEPTS_FILE = BASE_DIR / 'assets' / 'concepts.json'
-RELATIONS_FILE = BASE_DIR / 'assets' / 'relations.json'
+from ontology import OntologyGraph
+from ontology.distribution import summary
+from ontology.journal import add_relation_op, update_concept_op
+from ontology.linkpred import candidates_by_id, layer_factor
 
-
-def load_json(filepath):
-    """Carrega arquivo JSON com encoding UTF-8"""
-    with open(filepath, 'r', encoding='utf-8') as f:
-        return json.load(f)
-
-
-def save_json(filepath, data):
-    """Salva arquivo JSON com encoding UTF-8 e formatação"""
-    with open(filepath, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
-
-
-def get_concept_by_id(concept_id, concepts):
-    """Retorna conceito por ID"""
-    for c in concepts:
-        if c['id'] == concept_id:
-            return c
-    return None
+# Alvos a 2 passos considerados por conceito (predição de links)
+LINK_CANDIDATES = 30
 
 
 def analyze_distribution(concepts):
     """Analisa distribuição de conectividade"""
-    degrees = [len(c['connections']) for c in concepts]
-    mean = statistics.mean(degrees)
-    stdev = statistics.stdev(degrees)
-    
-    return {
-        'mean': mean,
-        'median': statistics.median(degrees),
-        'stdev': stdev,
-        'min': min(degrees),
-        'max': max(degrees),
-        'range_1sigma': (mean - stdev, mean + stdev),
-        'range_2sigma': (mean - 2*stdev, mean + 2*stdev)
-    }
+    return summary([len(c['connections']) for c in concepts])
 
 
 def classify_concepts(concepts, stats):
@@ -75,56 +43,51 @@ def classify_concepts(concepts, stats):
     }
 
 
-def find_compatible_connections(concept, concepts, stats, max_suggestions=10):
+def connectivity_score(concept, stats):
+    """Preferência por conceitos sub-conectados"""
+    degree = len(concept['connections'])
+    if degree < stats['range_1sigma'][0]:
+        return 3  # Sub-conectado (prioridade alta)
+    elif degree <= stats['range_1sigma'][1]:
+        return 2  # Normal
+    return 1  # Sobre-conectado (baixa prioridade)
+
+
+def find_compatible_connections(concept, concepts, stats, max_suggestions=10, links=None,
+                                by_id=None):
     """
     Encontra conceitos compatíveis para novas conexões
     Critérios:
-    - Mesma camada ou camadas adjacentes
+    - Vizinhança compartilhada (alocação de recursos × fator de camada, de
+      `ontology/linkpred.py`), só entre os alvos a 2 passos
     - Não já conectados
     - Preferência por conceitos sub-conectados ou normais
+    Sem alvos a 2 passos suficientes, completa pela camada como antes
     """
-    same_layer = concept.get('layer')
     current_connections = set(concept['connections'])
     current_id = concept['id']
-    
-    # Camadas adjacentes lógicas
-    layer_adjacency = {
-        'fundacional': ['ontologica', 'temporal'],
-        'ontologica': ['fundacional', 'epistemica', 'ecologica'],
-        'epistemica': ['ontologica', 'politica', 'etica'],
-        'politica': ['epistemica', 'pratica', 'etica'],
-        'etica': ['epistemica', 'politica', 'pratica'],
-        'temporal': ['fundacional', 'ontologica', 'pratica'],
-        'ecologica': ['ontologica', 'pratica', 'etica'],
-        'pratica': ['politica', 'etica', 'temporal', 'ecologica']
-    }
-    
-    compatible_layers = [same_layer] + layer_adjacency.get(same_layer, [])
+    by_id = {c['id']: c for c in concepts} if by_id is None else by_id
     
     candidates = []
-    for c in concepts:
-        if c['id'] == current_id:
-            continue
-        if c['id'] in current_connections:
+    for link_score, other_id in links or []:
+        other = by_id.get(other_id)
+        if other is None or other_id in current_connections:
             continue
-        
-        # Preferência por mesma camada
-        layer_score = 2 if c.get('layer') == same_layer else 1 if c.get('layer') in compatible_layers else 0.5
-        
-        # Preferência por conceitos sub-conectados
-        degree = len(c['connections'])
-        if degree < stats['range_1sigma'][0]:
-            connectivity_score = 3  # Sub-conectado (prioridade alta)
-        elif degree <= stats['range_1sigma'][1]:
-            connectivity_score = 2  # Normal
-        else:
-            connectivity_score = 1  # Sobre-conectado (baixa prioridade)
-        
-        score = layer_score * connectivity_score
-        candidates.append((c, score))
-    
-    # Ordena por score e retorna top N
+        candidates.append((other, link_score * connectivity_score(other, stats)))
+    # Alvos a 2 passos ordenados antes do complemento (quem chama usa os primeiros)
     candidates.sort(key=lambda x: -x[1])
+    
+    if len(candidates) < max_suggestions:
+        chosen = {c['id'] for c, _ in candidates}
+        fallback = []
+        for c in concepts:
+            if c['id'] == current_id or c['id'] in current_connections or c['id'] in chosen:
+                continue
+            layer_score = layer_factor(concept.get('layer'), c.get('layer'))
+            fallback.append((c, layer_score * connectivity_score(c, stats)))
+        fallback.sort(key=lambda x: -x[1])
+        candidates += fallback[:max_suggestions - len(candidates)]
+    
     return [c for c, score in candidates[:max_suggestions]]
 
 
@@ -171,11 +134,13 @@ def create_new_relation(from_concept, to_concept, relations):
     return relation
 
 
-def normalize_connectivity(concepts, relations, target_additions=100, dry_run=False):
+def normalize_connectivity(graph, target_additions=100, dry_run=False):
     """
     Normaliza distribuição de conectividade
     Adiciona conexões estratégicas para aproximar distribuição normal
     """
+    concepts, relations = graph.concepts, graph.relations
+    
     print("🎯 NORMALIZAÇÃO DA DISTRIBUIÇÃO DE CONECTIVIDADE")
     print("=" * 70)
     
@@ -201,9 +166,16 @@ def normalize_connectivity(concepts, relations, target_additions=100, dry_run=Fa
     if dry_run:
         print(f"\n⚠️  MODO DRY-RUN: Simulando mudanças...")
     
+    # Alvos a 2 passos de todos os conceitos a melhorar, de uma vez
+    from ontology.snapshot import load_snapshot
+    links = candidates_by_id(load_snapshot().csr, [c['id'] for c in concepts_to_enhance],
+                             k=LINK_CANDIDATES)
+    by_id = {c['id']: c for c in concepts}
+    
     # Cria novas conexões
     new_relations = []
     connections_added = defaultdict(int)
+    touched = {}
     
     for concept in concepts_to_enhance:
         # Determina quantas conexões adicionar
@@ -213,7 +185,8 @@ def normalize_connectivity(concepts, relations, target_additions=100, dry_run=Fa
         
         # Encontra candidatos compatíveis
         candidates = find_compatible_connections(concept, concepts, stats_before, 
-                                                 max_suggestions=additions_needed * 2)
+                                                 max_suggestions=additions_needed * 2,
+                                                 links=links.get(concept['id']), by_id=by_id)
         
         added = 0
         for candidate in candidates[:additions_needed]:
@@ -227,8 +200,10 @@ def normalize_connectivity(concepts, relations, target_additions=100, dry_run=Fa
             # Atualiza conexões nos conceitos (em memória)
             if candidate['id'] not in concept['connections']:
                 concept['connections'].append(candidate['id'])
+                touched[concept['id']] = concept
             if concept['id'] not in candidate['connections']:
                 candidate['connections'].append(concept['id'])
+                touched[candidate['id']] = candidate
             
             connections_added[concept['id']] += 1
             connections_added[candidate['id']] += 1
@@ -268,15 +243,14 @@ def normalize_connectivity(concepts, relations, target_additions=100, dry_run=Fa
     
     # Salva ou simula
     if not dry_run:
-        print(f"\n💾 Salvando mudanças...")
-        save_json(CONCEPTS_FILE, concepts)
-        
-        # Adiciona novas relações
-        all_relations = relations + new_relations
-        save_json(RELATIONS_FILE, all_relations)
+        print(f"\n💾 Registrando mudanças no journal...")
+        ops = [add_relation_op(rel) for rel in new_relations]
+        ops += [update_concept_op(cid, {'connections': c['connections']})
+                for cid, c in touched.items()]
+        tx = graph.record('normalize_connectivity', ops)
         
-        print(f"   ✅ Conceitos atualizados: {CONCEPTS_FILE}")
-        print(f"   ✅ Relações atualizadas: {RELATIONS_FILE}")
+        print(f"   ✅ Transação #{tx}: {len(new_relations)} relações, {len(touched)} conceitos")
+        print(f"   💡 'make journal-undo' desfaz; 'make journal-compact' grava nos JSON")
     else:
         print(f"\n⚠️  DRY-RUN: Nenhuma mudança foi salva")
         print(f"   Execute sem --dry-run para aplicar mudanças")
@@ -309,14 +283,13 @@ def main():
     
     # Carrega dados
     print("\n📂 Carregando dados...")
-    concepts = load_json(CONCEPTS_FILE)
-    relations = load_json(RELATIONS_FILE)
+    graph = OntologyGraph.load()
     
-    print(f"   • {len(concepts)} conceitos")
-    print(f"   • {len(relations)} relações")
+    print(f"   • {len(graph.concepts)} conceitos")
+    print(f"   • {len(graph.relations)} relações")
     
     # Normaliza
-    result = normalize_connectivity(concepts, relations, target_additions=target, dry_run=dry_run)
+    result = normalize_connectivity(graph, target_additions=target, dry_run=dry_run)
     
     print("\n" + "=" * 70)
     if not dry_run:
@@ -0,0 +1,32 @@
+"""
+Biblioteca compartilhada da ontologia CRIOS
+Carregamento único e índices em memória para os scripts de manutenção
+"""
+
+from .graph import UNKNOWN_LAYER, OntologyGraph, pair_key
+from .io import (
+    ASSETS_DIR,
+    BASE_DIR,
+    CONCEPTS_FILE,
+    PROPOSALS_FILE,
+    REFERENCIAS_FILE,
+    RELATIONS_FILE,
+    load_json,
+    load_jsonl,
+    save_json,
+)
+
+__all__ = [
+    'ASSETS_DIR',
+    'BASE_DIR',
+    'CONCEPTS_FILE',
+    'OntologyGraph',
+    'PROPOSALS_FILE',
+    'REFERENCIAS_FILE',
+    'RELATIONS_FILE',
+    'UNKNOWN_LAYER',
+    'load_json',
+    'load_jsonl',
+    'pair_key',
+    'save_json',
+]
@@ -0,0 +1,235 @@
+"""
+Verificações da validação da ontologia CRIOS (plugins de `update_ontology.py`)
+Cada função declara as entradas de que precisa e imprime sua seção do
+relatório; verificações retornam (ok, achados), análises retornam None
+
+Entradas disponíveis: concepts, relations, referencias e records (o
+`RecordCache` com os IDs atuais e o cache por registro da rodada anterior)
+"""
+
+from collections import Counter
+
+from .validation import (
+    RECORD_CHECKS,
+    check,
+    duplicate_names,
+    duplicate_pairs,
+)
+
+# Camadas ontológicas canônicas
+CANONICAL_LAYERS = {
+    'fundacional', 'ontologica', 'epistemica', 'politica',
+    'etica', 'temporal', 'ecologica', 'pratica'
+}
+
+
+def print_section(title):
+    """Imprime seção formatada"""
+    print(f"\n{'='*60}")
+    print(f"  {title}")
+    print(f"{'='*60}\n")
+
+
+def record_issues(name, records, data):
+    """Problemas por registro da verificação `name`, via cache"""
+    kind, issues, refs = RECORD_CHECKS[name]
+    return records.check(name, kind, data, issues, refs)
+
+
+@check('duplicates', inputs=('concepts',))
+def check_duplicates(concepts):
+    """Verifica duplicações de ID e nome"""
+    print_section("1. VERIFICAÇÃO DE DUPLICATAS")
+    
+    id_dups, name_dups = duplicate_names(concepts)
+    
+    if id_dups:
+        print(f"❌ {len(id_dups)} IDs duplicados:")
+        for dup_id, count in id_dups.items():
+            print(f"   • {dup_id} ({count}×)")
+    else:
+        print("✅ Nenhum ID duplicado")
+    
+    if name_dups:
+        print(f"❌ {len(name_dups)} nomes duplicados:")
+        for dup_name, count in name_dups.items():
+            print(f"   • {dup_name} ({count}×)")
+    else:
+        print("✅ Nenhum nome duplicado")
+    
+    return len(id_dups) == 0 and len(name_dups) == 0, len(id_dups) + len(name_dups)
+
+
+@check('required_fields', inputs=('records', 'concepts'))
+def check_required_fields(records, concepts):
+    """Verifica campos obrigatórios"""
+    print_section("2. VERIFICAÇÃO DE CAMPOS OBRIGATÓRIOS")
+    
+    entries = record_issues('required_fields', records, concepts)
+    critical_errors = [m for e in entries for m in e['critical']]
+    warnings = [m for e in entries for m in e['warnings']]
+    
+    if critical_errors:
+        print(f"❌ {len(critical_errors)} erros críticos encontrados:")
+        for issue in critical_errors[:20]:
+            print(f"   {issue}")
+        if len(critical_errors) > 20:
+            print(f"   ... e mais {len(critical_errors) - 20} erros")
+    
+    if warnings:
+        print(f"⚠️  {len(warnings)} avisos encontrados:")
+        for issue in warnings[:10]:
+            print(f"   {issue}")
+        if len(warnings) > 10:
+            print(f"   ... e mais {len(warnings) - 10} avisos")
+    
+    if not critical_errors and not warnings:
+        print("✅ Todos os conceitos têm campos obrigatórios")
+    
+    # Only fail on critical errors, not warnings
+    return len(critical_errors) == 0, len(critical_errors) + len(warnings)
+
+
+@check('orphan_references', inputs=('records', 'concepts'))
+def check_orphan_references(records, concepts):
+    """Verifica referências órfãs nas conexões"""
+    print_section("3. VERIFICAÇÃO DE REFERÊNCIAS ÓRFÃS")
+    
+    orphan_refs = {m for e in record_issues('orphan_references', records, concepts) for m in e}
+    
+    if orphan_refs:
+        print(f"❌ {len(orphan_refs)} referências órfãs:")
+        for ref in sorted(list(orphan_refs))[:20]:
+            print(f"   {ref}")
+        if len(orphan_refs) > 20:
+            print(f"   ... e mais {len(orphan_refs) - 20} referências")
+    else:
+        print("✅ Todas as conexões são válidas (0 órfãs)")
+    
+    return len(orphan_refs) == 0, len(orphan_refs)
+
+
+@check('layer_distribution', inputs=('concepts',))
+def analyze_layer_distribution(concepts):
+    """Analisa distribuição por camada"""
+    print_section("4. DISTRIBUIÇÃO POR CAMADA")
+    
+    layer_dist = Counter(c.get('layer') for c in concepts)
+    
+    print(f"Total de conceitos: {len(concepts)}\n")
+    for layer in CANONICAL_LAYERS:
+        count = layer_dist.get(layer, 0)
+        pct = (count / len(concepts) * 100) if concepts else 0
+        print(f"  {layer:12s}: {count:3d} ({pct:5.1f}%)")
+    
+    # Camadas não-canônicas
+    non_canonical = {k: v for k, v in layer_dist.items() if k not in CANONICAL_LAYERS}
+    if non_canonical:
+        print(f"\n⚠️  Camadas não-canônicas encontradas:")
+        for layer, count in non_canonical.items():
+            print(f"  {layer}: {count}")
+
+
+@check('connections', inputs=('concepts',))
+def analyze_connections(concepts):
+    """Analisa estatísticas de conexões"""
+    print_section("5. ESTATÍSTICAS DE CONEXÕES")
+    
+    conn_counts = [len(c.get('connections', [])) for c in concepts]
+    
+    if conn_counts:
+        avg = sum(conn_counts) / len(conn_counts)
+        print(f"  Média:   {avg:.1f} conexões/conceito")
+        print(f"  Mínima:  {min(conn_counts)}")
+        print(f"  Máxima:  {max(conn_counts)}")
+        
+        # Top conceitos mais conectados
+        most_connected = sorted(
+            [(c['id'], c['name'], len(c.get('connections', []))) for c in concepts],
+            key=lambda x: -x[2]
+        )[:10]
+        
+        print(f"\n  Top 10 mais conectados:")
+        for cid, name, count in most_connected:
+            print(f"    • {name} ({count})")
+
+
+@check('relations_integrity', inputs=('records', 'relations'))
+def check_relations_integrity(records, relations):
+    """Verifica integridade das relações"""
+    print_section("6. VERIFICAÇÃO DE RELAÇÕES")
+    
+    issues = [m for e in record_issues('relations_integrity', records, relations) for m in e]
+    
+    if issues:
+        print(f"⚠️  {len(issues)} problemas encontrados:")
+        for issue in issues[:20]:
+            print(f"   {issue}")
+        if len(issues) > 20:
+            print(f"   ... e mais {len(issues) - 20} problemas")
+    else:
+        print(f"✅ Todas as {len(relations)} relações são válidas")
+    
+    # Verificar duplicatas
+    duplicates = sum(n - 1 for n in duplicate_pairs(relations).values())
+    
+    if duplicates > 0:
+        print(f"⚠️  {duplicates} relações duplicadas")
+    else:
+        print(f"✅ Nenhuma relação duplicada")
+    
+    return len(issues) == 0 and duplicates == 0, len(issues) + duplicates
+
+
+@check('relation_verbs', inputs=('relations',))
+def analyze_relation_verbs(relations):
+    """Analisa distribuição de verbos nas relações"""
+    print_section("7. ANÁLISE DE VERBOS SEMÂNTICOS")
+    
+    verb_counts = Counter(rel['name'] for rel in relations)
+    
+    print(f"Total de relações: {len(relations)}")
+    print(f"Verbos únicos: {len(verb_counts)}\n")
+    
+    print("Top 15 verbos mais usados:")
+    for verb, count in verb_counts.most_common(15):
+        pct = (count / len(relations) * 100) if relations else 0
+        print(f"  {verb:25s}: {count:4d} ({pct:5.1f}%)")
+
+
+@check('literature', inputs=('concepts', 'referencias'))
+def compare_with_literature(concepts, referencias):
+    """Compara conceitos do rizoma com literatura"""
+    print_section("8. COMPARAÇÃO COM LITERATURA")
+    
+    # Conceitos na literatura
+    lit_concepts = set()
+    for ref in referencias:
+        for c in ref.get('conceitos', []):
+            lit_concepts.add(c)
+    
+    # Conceitos no rizoma
+    riz_concepts = set(c['name'] for c in concepts)
+    
+    # Conceitos produzidos (não mapeados na literatura)
+    produced = riz_concepts - lit_concepts
+    
+    print(f"📚 Conceitos na literatura: {len(lit_concepts)}")
+    print(f"🌐 Conceitos no rizoma: {len(riz_concepts)}")
+    print(f"✨ Conceitos produzidos: {len(produced)} ({len(produced)/len(riz_concepts)*100:.1f}%)")
+    print(f"🔗 Conceitos mapeados: {len(riz_concepts & lit_concepts)}")
+
+
+@check('final_statistics', inputs=('concepts', 'relations'))
+def print_final_statistics(concepts, relations):
+    """Imprime estatísticas finais"""
+    print_section("ESTATÍSTICAS FINAIS")
+    
+    print(f"📚 Conceitos: {len(concepts)}")
+    print(f"🔗 Relações: {len(relations)}")
+    print(f"🎯 Verbos únicos: {len({rel['name'] for rel in relations})}")
+    print(f"📊 Camadas: {len(CANONICAL_LAYERS)}")
+    
+    conn_counts = [len(c.get('connections', [])) for c in concepts]
+    if conn_counts:
+        print(f"🌐 Média de conexões: {sum(conn_counts)/len(conn_counts):.1f}")
@@ -0,0 +1,315 @@
+"""
+Detecção de comunidades no grafo da ontologia CRIOS
+Agrupa conceitos pela estrutura das relações (não pela camada declarada)
+
+- `louvain()`: otimização gulosa de modularidade em níveis, com refinamento
+  Leiden opcional (comunidades sempre conexas)
+- `label_propagation()`: propagação de rótulos semi-síncrona e vetorizada,
+  para grafos grandes demais para o Louvain
+- `modularity()`: qualidade de uma partição
+- `leiden_fallback()`: confere uma LPA contra o Leiden em grafos pequenos
+
+Tudo é determinístico dado o `seed`. Os rótulos finais são 0..k-1 em ordem
+decrescente de tamanho (empates pelo menor nó)
+
+Requer NumPy (`pip install numpy`)
+"""
+
+import numpy as np
+
+from .csr import build_csr
+
+# Ganho mínimo para mover um nó (evita oscilar por erro de arredondamento)
+MIN_GAIN = 1e-12
+
+MAX_LEVELS = 32
+MAX_PASSES = 64
+LPA_MAX_ROUNDS = 100
+
+# Até este número de nós o Leiden é barato e a LPA é conferida contra ele;
+# abaixo de LPA_MIN_QUALITY × a modularidade do Leiden, a LPA é descartada
+# (em grafos pequenos e densos ela tende a fundir quase tudo numa comunidade)
+LPA_CHECK_LIMIT = 20000
+LPA_MIN_QUALITY = 0.5
+
+
+class WeightedGraph:
+    """
+    Adjacência simétrica com pesos em arrays CSR
+
+    `loops[i]` guarda o peso dos laços (surgem ao agregar comunidades);
+    `strength[i]` = soma dos pesos incidentes, laços contados duas vezes
+    """
+
+    def __init__(self, offsets, indices, weights, loops):
+        self.offsets = offsets
+        self.indices = indices
+        self.weights = weights
+        self.loops = loops
+        self.n = len(offsets) - 1
+        rows = np.repeat(np.arange(self.n), np.diff(offsets))
+        self.strength = np.bincount(rows, weights=weights, minlength=self.n) + 2 * loops
+        self.total = float(self.strength.sum())  # 2m
+
+    @classmethod
+    def from_csr(cls, csr, weights=None):
+        """
+        Grafo não-direcionado do CSRGraph; `weights` (opcional) tem um peso
+        por aresta de `csr.undirected_edges()`, senão todas valem 1
+        """
+        eu, ev = csr.undirected_edges()
+        w = np.ones(len(eu)) if weights is None else np.asarray(weights, dtype=np.float64)
+        return cls.from_edges(csr.n, eu, ev, w)
+
+    @classmethod
+    def from_edges(cls, n, eu, ev, w, loops=None):
+        """Arestas u–v com peso w (u ≠ v, uma entrada por par)"""
+        rows = np.concatenate([eu, ev]).astype(np.int64)
+        cols = np.concatenate([ev, eu]).astype(np.int64)
+        offsets, indices, order = build_csr(rows, cols, n)
+        weights = np.concatenate([w, w])[order]
+        loops = np.zeros(n) if loops is None else loops
+        return cls(offsets.astype(np.int64), indices.astype(np.int64), weights, loops)
+
+    def aggregate(self, membership, count):
+        """Grafo das comunidades: um nó por rótulo, pesos somados"""
+        rows = np.repeat(np.arange(self.n), np.diff(self.offsets))
+        cu = membership[rows]
+        cv = membership[self.indices]
+        inside = cu == cv
+        loops = np.bincount(membership, weights=self.loops, minlength=count)
+        # Cada aresta interna aparece duas vezes na adjacência simétrica
+        loops += np.bincount(cu[inside], weights=self.weights[inside], minlength=count) / 2
+
+        upper = cu < cv
+        keys, inverse = np.unique(cu[upper] * count + cv[upper], return_inverse=True)
+        w = np.bincount(inverse, weights=self.weights[upper])
+        return WeightedGraph.from_edges(count, keys // count, keys % count, w, loops)
+
+    def adjacency_lists(self):
+        """[(vizinhos, pesos)] em listas Python, para os laços por nó"""
+        offsets = self.offsets.tolist()
+        indices = self.indices.tolist()
+        weights = self.weights.tolist()
+        return [(indices[offsets[i]:offsets[i + 1]], weights[offsets[i]:offsets[i + 1]])
+                for i in range(self.n)]
+
+
+def relabel(membership):
+    """Rótulos 0..k-1 por tamanho decrescente (empate: menor nó); devolve (rótulos, k)"""
+    _, first, inverse, sizes = np.unique(membership, return_index=True,
+                                         return_inverse=True, return_counts=True)
+    order = np.lexsort((first, -sizes))
+    rank = np.empty(len(order), dtype=np.int64)
+    rank[order] = np.arange(len(order))
+    return rank[inverse.reshape(-1)], len(order)
+
+
+def modularity(graph, membership, resolution=1.0):
+    """Modularidade Q de uma partição (membership[i] = comunidade do nó i)"""
+    if graph.total == 0:
+        return 0.0
+    membership = np.asarray(membership, dtype=np.int64)
+    count = int(membership.max()) + 1 if len(membership) else 0
+    rows = np.repeat(np.arange(graph.n), np.diff(graph.offsets))
+    inside = membership[rows] == membership[graph.indices]
+    internal = np.bincount(membership[rows][inside], weights=graph.weights[inside], minlength=count)
+    internal += 2 * np.bincount(membership, weights=graph.loops, minlength=count)
+    totals = np.bincount(membership, weights=graph.strength, minlength=count)
+    m2 = graph.total
+    return float(np.sum(internal / m2 - resolution * (totals / m2) ** 2))
+
+
+def _move_nodes(graph, adjacency, membership, order, resolution):
+    """
+    Fase local do Louvain: cada nó vai para a comunidade vizinha de maior
+    ganho de modularidade, até nenhum nó mudar (altera `membership`)
+    """
+    strength = graph.strength.tolist()
+    totals = np.bincount(membership, weights=graph.strength, minlength=graph.n).tolist()
+    scale = resolution / graph.total
+
+    for _ in range(MAX_PASSES):
+        moved = 0
+        for node in order:
+            current = membership[node]
+            k = strength[node]
+            links = {}
+            neighbors, weights = adjacency[node]
+            for neighbor, weight in zip(neighbors, weights):
+                label = membership[neighbor]
+                links[label] = links.get(label, 0.0) + weight
+
+            totals[current] -= k
+            best = current
+            best_gain = links.get(current, 0.0) - totals[current] * k * scale
+            for label, weight in links.items():
+                gain = weight - totals[label] * k * scale
+                if gain > best_gain + MIN_GAIN:
+                    best, best_gain = label, gain
+            totals[best] += k
+            if best != current:
+                membership[node] = best
+                moved += 1
+        if not moved:
+            break
+
+
+def _refine(graph, adjacency, membership, order, resolution):
+    """
+    Refinamento Leiden: dentro de cada comunidade, parte de nós isolados e
+    funde só nós bem conectados ao restante da comunidade, escolhendo a
+    subcomunidade de maior ganho (variante gulosa, θ → 0). Garante que as
+    comunidades agregadas sejam conexas
+    """
+    labels = np.asarray(membership, dtype=np.int64)
+    membership = labels.tolist()
+    strength = graph.strength.tolist()
+    community_totals = np.bincount(labels, weights=graph.strength, minlength=graph.n).tolist()
+    refined = list(range(graph.n))
+    refined_totals = list(strength)
+    singleton = [True] * graph.n
+    scale = resolution / graph.total
+
+    # Peso de cada nó para dentro da própria comunidade
+    rows = np.repeat(np.arange(graph.n), np.diff(graph.offsets))
+    inside = labels[rows] == labels[graph.indices]
+    to_community = np.bincount(rows[inside], weights=graph.weights[inside],
+                               minlength=graph.n).tolist()
+
+    for node in order:
+        if not singleton[node]:
+            continue
+        k = strength[node]
+        label = membership[node]
+        total = community_totals[label]
+        if to_community[node] < k * (total - k) * scale:
+            continue
+
+        links = {}
+        neighbors, weights = adjacency[node]
+        for neighbor, weight in zip(neighbors, weights):
+            if membership[neighbor] == label and neighbor != node:
+                target = refined[neighbor]
+                links[target] = links.get(target, 0.0) + weight
+
+        best, best_gain = refined[node], 0.0
+        for target, weight in links.items():
+            gain = weight - refined_totals[target] * k * scale
+            if gain > best_gain + MIN_GAIN:
+                best, best_gain = target, gain
+        if best != refined[node]:
+            refined_totals[refined[node]] -= k
+            refined_totals[best] += k
+            refined[node] = best
+            # Rótulo refinado = nó fundador, que também deixa de ser isolado
+            singleton[node] = False
+            singleton[best] = False
+    return np.asarray(refined, dtype=np.int64)
+
+
+def louvain(graph, seed=0, resolution=1.0, refine=True):
+    """
+    Comunidades por Louvain (refine=True: Leiden guloso)
+
+    `graph` é um WeightedGraph ou um CSRGraph. Retorna (membership, Q):
+    um rótulo por nó e a modularidade da partição
+    """
+    if not isinstance(graph, WeightedGraph):
+        graph = WeightedGraph.from_csr(graph)
+    original = graph
+    rng = np.random.default_rng(seed)
+    membership = np.arange(graph.n, dtype=np.int64)  # nó original → nó do nível
+    start = np.arange(graph.n, dtype=np.int64)        # partição inicial do nível
+
+    for _ in range(MAX_LEVELS):
+        adjacency = graph.adjacency_lists()
+        order = rng.permutation(graph.n).tolist()
+        communities = start.tolist()
+        _move_nodes(graph, adjacency, communities, order, resolution)
+        communities = np.asarray(communities, dtype=np.int64)
+
+        groups = _refine(graph, adjacency, communities, order, resolution) if refine else communities
+        groups, count = relabel(groups)
+        if count == graph.n:
+            # Refinamento não fundiu nada: agrega pela partição do Louvain
+            groups, count = relabel(communities)
+            if count == graph.n:
+                break
+
+        # Próximo nível começa da partição não-refinada (um rótulo por grupo)
+        start = np.zeros(count, dtype=np.int64)
+        start[groups] = communities
+        start, _ = relabel(start)
+        membership = groups[membership]
+        graph = graph.aggregate(groups, count)
+        communities = start
+
+    final, _ = relabel(communities[membership])
+    return final, modularity(original, final, resolution)
+
+
+def label_propagation(graph, seed=0, max_rounds=LPA_MAX_ROUNDS):
+    """
+    Propagação de rótulos semi-síncrona: a cada rodada metade dos nós
+    (sorteada) adota o rótulo de maior peso entre os vizinhos, mantendo o
+    atual em caso de empate. Toda a rodada é feita em operações de array.
+    Retorna (membership, Q)
+    """
+    if not isinstance(graph, WeightedGraph):
+        graph = WeightedGraph.from_csr(graph)
+    rng = np.random.default_rng(seed)
+    n = graph.n
+    labels = np.arange(n, dtype=np.int64)
+    rows = np.repeat(np.arange(n, dtype=np.int64), np.diff(graph.offsets))
+    if len(rows) == 0:
+        return labels, 0.0
+    eps = 1e-6 * float(graph.weights.min())
+
+    for _ in range(max_rounds):
+        keys, inverse = np.unique(rows * n + labels[graph.indices], return_inverse=True)
+        weights = np.bincount(inverse, weights=graph.weights)
+        nodes, candidates = keys // n, keys % n
+        # Desempate: rótulo atual primeiro, depois sorteio
+        score = weights + eps * (candidates == labels[nodes]) + eps / 2 * rng.random(len(keys))
+        order = np.lexsort((score, nodes))
+        last = np.r_[nodes[order][1:] != nodes[order][:-1], True]
+        best = labels.copy()
+        best[nodes[order][last]] = candidates[order][last]
+
+        changed = best != labels
+        if not changed.any():
+            break
+        update = changed & (rng.random(n) < 0.5)
+        labels[update] = best[update]
+
+    labels, _ = relabel(labels)
+    return labels, modularity(graph, labels)
+
+
+METHODS = {
+    'leiden': lambda graph, seed: louvain(graph, seed, refine=True),
+    'louvain': lambda graph, seed: louvain(graph, seed, refine=False),
+    'lpa': label_propagation,
+}
+
+
+def detect_communities(csr, method='leiden', seed=0, weights=None):
+    """Roda um dos métodos ('leiden', 'louvain', 'lpa') sobre o CSRGraph"""
+    if method not in METHODS:
+        raise ValueError(f"Método desconhecido: {method} (use {', '.join(METHODS)})")
+    return METHODS[method](WeightedGraph.from_csr(csr, weights), seed)
+
+
+def leiden_fallback(csr, quality, seed=0, weights=None):
+    """
+    (membership, Q) do Leiden se a modularidade `quality` de uma LPA ficar
+    abaixo de LPA_MIN_QUALITY × a dele; None se a LPA passar ou se o grafo
+    tiver mais de LPA_CHECK_LIMIT nós (grande demais para conferir)
+    """
+    if csr.n > LPA_CHECK_LIMIT:
+        return None
+    labels, reference = detect_communities(csr, 'leiden', seed, weights)
+    if quality >= LPA_MIN_QUALITY * reference:
+        return None
+    return labels, reference
@@ -0,0 +1,251 @@
+"""
+Representação CSR/CSC do grafo da ontologia CRIOS
+IDs de conceitos são internados como inteiros densos uma única vez; a
+adjacência vive em arrays NumPy int32 (offsets + índices + código do verbo),
+de modo que grau, vizinhança e triângulos viram operações vetorizadas
+
+Requer NumPy (`pip install numpy`)
+"""
+
+import numpy as np
+
+INDEX_DTYPE = np.int32
+
+# Código de camada para nós que aparecem só nas relações (sem conceito)
+NO_LAYER = -1
+
+# Arrays que definem um CSRGraph (ordem usada também pelo snapshot binário)
+ARRAY_FIELDS = (
+    'layer_codes', 'src', 'dst', 'verb_codes',
+    'out_offsets', 'out_targets', 'out_edges',
+    'in_offsets', 'in_sources', 'in_edges',
+    'und_offsets', 'und_indices', 'edge_keys',
+)
+
+
+def intern(values, table=None, index=None):
+    """Interna strings em códigos inteiros densos (ordem de 1ª aparição)"""
+    table = [] if table is None else table
+    index = {} if index is None else index
+    codes = []
+    for value in values:
+        code = index.get(value)
+        if code is None:
+            code = index[value] = len(table)
+            table.append(value)
+        codes.append(code)
+    return np.array(codes, dtype=INDEX_DTYPE), table, index
+
+
+def build_csr(rows, cols, n):
+    """
+    Agrupa arestas (rows[k], cols[k]) por linha
+    Retorna (offsets, cols ordenadas, permutação aplicada)
+    """
+    order = np.lexsort((cols, rows)).astype(INDEX_DTYPE)
+    counts = np.bincount(rows, minlength=n)
+    offsets = np.zeros(n + 1, dtype=INDEX_DTYPE)
+    np.cumsum(counts, out=offsets[1:])
+    return offsets, cols[order].astype(INDEX_DTYPE), order
+
+
+def expand(offsets, indices, nodes):
+    """
+    Vizinhos de cada nó em `nodes`, concatenados, e quantos cada um tem:
+    (contagens, vizinhos), com os vizinhos de nodes[i] no i-ésimo trecho
+    """
+    starts = offsets[nodes]
+    counts = offsets[nodes + 1] - starts
+    shift = np.repeat(starts - (np.cumsum(counts) - counts), counts)
+    positions = np.arange(int(counts.sum()), dtype=shift.dtype) + shift
+    return counts, indices[positions]
+
+
+class CSRGraph:
+    """
+    Grafo em arrays: CSR (saída), CSC (entrada) e adjacência não-direcionada
+
+    - `ids[i]` / `index[id]`: internação id ↔ inteiro
+    - `layer_codes[i]` → `layers[code]` (NO_LAYER para nós sem conceito)
+    - `src`, `dst`, `verb_codes`: uma entrada por relação, na ordem do arquivo
+    - `out_offsets`/`out_targets`/`out_edges`: CSR direcionado; `out_edges`
+      aponta para a posição da relação original
+    - `in_offsets`/`in_sources`/`in_edges`: CSC (transposta)
+    - `und_offsets`/`und_indices`: vizinhos distintos, ordenados, sem laços
+    """
+
+    def __init__(self, ids, layer_codes, layers, src, dst, verb_codes, verbs,
+                 n_concepts=None):
+        self.ids = list(ids)
+        self.index = {cid: i for i, cid in enumerate(self.ids)}
+        self.n = len(self.ids)
+        self.n_concepts = self.n if n_concepts is None else n_concepts
+        self.layers = list(layers)
+        self.layer_codes = np.asarray(layer_codes, dtype=INDEX_DTYPE)
+        self.verbs = list(verbs)
+        self.src = np.asarray(src, dtype=INDEX_DTYPE)
+        self.dst = np.asarray(dst, dtype=INDEX_DTYPE)
+        self.verb_codes = np.asarray(verb_codes, dtype=INDEX_DTYPE)
+        self._build()
+
+    @classmethod
+    def from_lists(cls, concepts, relations):
+        """Constrói a partir das listas de conceitos e relações"""
+        ids, index = [], {}
+        layer_names = []
+        for concept in concepts:
+            if concept['id'] not in index:
+                index[concept['id']] = len(ids)
+                ids.append(concept['id'])
+                layer_names.append(concept.get('layer'))
+        n_concepts = len(ids)
+
+        # Relações podem citar IDs sem conceito: viram nós extras no final
+        src, ids, index = intern([r['from'] for r in relations], ids, index)
+        dst, ids, index = intern([r['to'] for r in relations], ids, index)
+        layer_names.extend([None] * (len(ids) - n_concepts))
+
+        layers = sorted({l for l in layer_names if l is not None})
+        layer_lookup = {l: i for i, l in enumerate(layers)}
+        layer_codes = [layer_lookup.get(l, NO_LAYER) for l in layer_names]
+
+        verb_codes, verbs, _ = intern([r['name'] for r in relations])
+        return cls(ids, layer_codes, layers, src, dst, verb_codes, verbs,
+                   n_concepts=n_concepts)
+
+    @classmethod
+    def from_graph(cls, graph):
+        """Constrói a partir de um OntologyGraph"""
+        return cls.from_lists(graph.concepts, graph.relations)
+
+    @classmethod
+    def from_arrays(cls, ids, layers, verbs, arrays, n_concepts=None):
+        """Remonta um grafo já construído (ex.: arrays mapeados do snapshot)"""
+        self = cls.__new__(cls)
+        self.ids = list(ids)
+        self.index = {cid: i for i, cid in enumerate(self.ids)}
+        self.n = len(self.ids)
+        self.n_concepts = self.n if n_concepts is None else n_concepts
+        self.layers = list(layers)
+        self.verbs = list(verbs)
+        for field in ARRAY_FIELDS:
+            setattr(self, field, arrays[field])
+        return self
+
+    def _build(self):
+        n = self.n
+        self.out_offsets, self.out_targets, self.out_edges = build_csr(self.src, self.dst, n)
+        self.in_offsets, self.in_sources, self.in_edges = build_csr(self.dst, self.src, n)
+
+        # Não-direcionado: chave única por par (u < v), laços descartados
+        mask = self.src != self.dst
+        u = np.minimum(self.src[mask], self.dst[mask]).astype(np.int64)
+        v = np.maximum(self.src[mask], self.dst[mask]).astype(np.int64)
+        keys = np.unique(u * n + v)
+        self.edge_keys = keys
+        eu = (keys // n).astype(INDEX_DTYPE)
+        ev = (keys % n).astype(INDEX_DTYPE)
+        rows = np.concatenate([eu, ev])
+        cols = np.concatenate([ev, eu])
+        self.und_offsets, self.und_indices, _ = build_csr(rows, cols, n)
+
+    # ------------------------------------------------------------------
+    # Consultas
+    # ------------------------------------------------------------------
+
+    def node(self, concept_id):
+        """Índice inteiro de um conceito"""
+        return self.index[concept_id]
+
+    def degree(self):
+        """Grau não-direcionado (vizinhos distintos) de todos os nós"""
+        return np.diff(self.und_offsets)
+
+    def out_degree(self):
+        return np.diff(self.out_offsets)
+
+    def in_degree(self):
+        return np.diff(self.in_offsets)
+
+    def neighbors(self, i):
+        """Vizinhos distintos do nó i (array ordenado)"""
+        return self.und_indices[self.und_offsets[i]:self.und_offsets[i + 1]]
+
+    def successors(self, i):
+        return self.out_targets[self.out_offsets[i]:self.out_offsets[i + 1]]
+
+    def predecessors(self, i):
+        return self.in_sources[self.in_offsets[i]:self.in_offsets[i + 1]]
+
+    def out_verbs(self, i):
+        """Códigos de verbo das relações de saída do nó i"""
+        return self.verb_codes[self.out_edges[self.out_offsets[i]:self.out_offsets[i + 1]]]
+
+    def has_edge(self, i, j):
+        """Existe relação (qualquer direção) entre i e j?"""
+        row = self.neighbors(i)
+        k = np.searchsorted(row, j)
+        return bool(k < len(row) and row[k] == j)
+
+    def undirected_edges(self):
+        """Pares (u, v) com u < v, um por aresta não-direcionada"""
+        return (self.edge_keys // self.n).astype(INDEX_DTYPE), (self.edge_keys % self.n).astype(INDEX_DTYPE)
+
+    def verb_counts(self):
+        """Contagem de uso por código de verbo"""
+        return np.bincount(self.verb_codes, minlength=len(self.verbs))
+
+    def layer_of(self, i):
+        code = self.layer_codes[i]
+        return self.layers[code] if code != NO_LAYER else None
+
+    def triangles(self):
+        """
+        Número de triângulos por nó
+
+        Orienta cada aresta do nó de menor para o de maior (grau, índice),
+        gera todas as cunhas (u; v, w) sobre a adjacência orientada e confere
+        a aresta v–w por busca binária nas chaves ordenadas. Cada triângulo
+        aparece uma única vez; a contagem é O(E^1.5) no pior caso e toda em
+        operações de array.
+        """
+        n = self.n
+        deg = self.degree().astype(np.int64)
+        rank = np.empty(n, dtype=np.int64)
+        rank[np.lexsort((np.arange(n), deg))] = np.arange(n)
+
+        eu, ev = self.undirected_edges()
+        forward = rank[eu] < rank[ev]
+        rows = np.where(forward, eu, ev)
+        cols = np.where(forward, ev, eu)
+        f_offsets, f_cols, _ = build_csr(rows, cols, n)
+
+        # Cunhas: pares de posições (p, q), p < q, na mesma linha orientada
+        row_of = np.repeat(np.arange(n, dtype=np.int64), np.diff(f_offsets))
+        pos = np.arange(len(f_cols), dtype=np.int64)
+        tail = f_offsets[row_of + 1].astype(np.int64) - pos - 1
+        total = int(tail.sum())
+        counts = np.zeros(n, dtype=np.int64)
+        if total == 0:
+            return counts
+
+        first = np.repeat(pos, tail)
+        starts = np.cumsum(tail) - tail
+        second = first + 1 + (np.arange(total, dtype=np.int64) - np.repeat(starts, tail))
+
+        v = f_cols[first].astype(np.int64)
+        w = f_cols[second].astype(np.int64)
+        keys = np.minimum(v, w) * n + np.maximum(v, w)
+        hit = np.searchsorted(self.edge_keys, keys)
+        hit[hit >= len(self.edge_keys)] = 0
+        closed = self.edge_keys[hit] == keys
+
+        counts += np.bincount(row_of[first][closed], minlength=n)
+        counts += np.bincount(v[closed], minlength=n)
+        counts += np.bincount(w[closed], minlength=n)
+        return counts
+
+    @property
+    def nbytes(self):
+        """Memória ocupada pelos arrays"""
+        return sum(getattr(self, field).nbytes for field in ARRAY_FIELDS)
@@ -0,0 +1,191 @@
+"""
+Daemon local de consultas da ontologia CRIOS
+Mantém dados derivados do grafo em memória e responde por um socket Unix
+(uma linha JSON por pedido, uma linha JSON por resposta). Uma thread observa
+os arquivos de origem e recarrega quando eles mudam
+
+Com `update`, o daemon mantém um OntologyGraph residente: a cada mudança só
+os arquivos alterados são relidos, só os registros que diferem entram ou saem
+do grafo (`OntologyGraph.sync`) e `update(estado, grafo)` recalcula o estado
+a partir dele, sem refazer o snapshot. Sem `update`, `load()` roda de novo
+
+Os clientes usam `request()`; se não houver daemon no ar, recebem None e
+calculam localmente
+"""
+
+import json
+import os
+import socket
+import socketserver
+import threading
+import time
+
+from .io import ASSETS_DIR, CONCEPTS_FILE, RELATIONS_FILE, file_key, load_json
+from .journal import JOURNAL_FILE, Journal
+
+# Mesmo diretório do snapshot (ignorado pelo git); sem importar NumPy no cliente
+SOCKET_FILE = ASSETS_DIR / '.snapshot' / 'daemon.sock'
+WATCHED_FILES = (CONCEPTS_FILE, RELATIONS_FILE, JOURNAL_FILE)
+
+POLL_INTERVAL = 0.5
+CLIENT_TIMEOUT = 2.0
+
+
+def _state(paths):
+    return tuple((key['size'], key['mtime_ns']) for key in map(file_key, paths))
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            try:
+                response = self.server.daemon.dispatch(json.loads(line))
+            except Exception as exc:  # erro do pedido não derruba o daemon
+                response = {'error': f'{type(exc).__name__}: {exc}'}
+            self.wfile.write((json.dumps(response, ensure_ascii=False) + '\n').encode('utf-8'))
+            self.wfile.flush()
+
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class QueryDaemon:
+    """
+    Servidor de consultas
+
+    - `load()` → estado derivado do grafo (chamado no início)
+    - `update(state, graph)` → novo estado a partir do grafo residente, já
+      com as mudanças aplicadas (opcional; sem ele `load()` roda a cada mudança)
+    - `handle(state, command, args)` → lista de linhas de saída
+
+    `watched` são os arquivos de conceitos, relações e journal, nessa ordem
+    """
+
+    def __init__(self, load, handle, update=None, socket_path=SOCKET_FILE,
+                 watched=WATCHED_FILES):
+        self.load = load
+        self.handle = handle
+        self.update = update
+        self.socket_path = socket_path
+        self.watched = watched
+        self.state = None
+        self.graph = None
+        self.reloads = 0
+        self._parsed = {}
+        self._stop = threading.Event()
+
+    def _records(self, stamp):
+        """
+        Conceitos e relações efetivos: JSON relidos só se mudaram, com as
+        transações pendentes do journal reaplicadas por cima
+        """
+        from .graph import OntologyGraph
+        concepts_file, relations_file, journal_file = self.watched
+        if Journal(journal_file).pending():
+            # O replay altera os registros: parte de uma leitura nova
+            graph = OntologyGraph.load(concepts_file, relations_file, journal_file)
+            return graph.concepts, graph.relations
+        records = []
+        for path, key in zip((concepts_file, relations_file), stamp):
+            cached = self._parsed.get(path)
+            if cached is None or cached[0] != key:
+                cached = self._parsed[path] = (key, load_json(path))
+            records.append(cached[1])
+        return records
+
+    def reload(self):
+        """
+        Recarga após uma mudança: com `update` e grafo residente, aplica só os
+        registros alterados; senão (ou na primeira carga) chama load()
+        """
+        stamp = _state(self.watched)
+        if self.update is None:
+            state = self.load()
+        elif self.graph is None:
+            from .graph import OntologyGraph
+            state = self.load()
+            self.graph = OntologyGraph.load(*self.watched)
+        else:
+            self.graph.sync(*self._records(stamp))
+            state = self.update(self.state, self.graph)
+        self.state = state  # troca atômica da referência
+        self.stamp = stamp
+        self.reloads += 1
+
+    def dispatch(self, request):
+        command = request.get('command')
+        if command == 'ping':
+            return {'lines': ['pong'], 'reloads': self.reloads}
+        if command == 'shutdown':
+            threading.Thread(target=self.server.shutdown, daemon=True).start()
+            return {'lines': ['bye']}
+        return {'lines': self.handle(self.state, command, request.get('args', []))}
+
+    def _watch(self):
+        failed = None
+        while not self._stop.wait(POLL_INTERVAL):
+            stamp = _state(self.watched)
+            if stamp == self.stamp:
+                continue
+            try:
+                self.reload()
+            except Exception as exc:  # nenhuma falha pode matar a thread
+                if not isinstance(exc, (OSError, ValueError)):
+                    # Grafo residente pode ter ficado pela metade: recarga completa
+                    self.graph = None
+                if stamp != failed:
+                    # Uma vez por versão dos arquivos; tenta de novo no próximo
+                    # ciclo (um JSON sendo gravado se resolve sozinho)
+                    print(f"⚠️  Recarga falhou: {type(exc).__name__}: {exc}", flush=True)
+                    failed = stamp
+
+    def serve_forever(self):
+        if request({'command': 'ping'}, self.socket_path) is not None:
+            raise RuntimeError(f"Daemon já está rodando em {self.socket_path}")
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)  # socket órfão de uma execução anterior
+        self.socket_path.parent.mkdir(parents=True, exist_ok=True)
+
+        self.reload()
+        self.server = _Server(str(self.socket_path), _Handler)
+        self.server.daemon = self
+        watcher = threading.Thread(target=self._watch, daemon=True)
+        watcher.start()
+        try:
+            self.server.serve_forever()
+        finally:
+            self._stop.set()
+            self.server.server_close()
+            if os.path.exists(self.socket_path):
+                os.remove(self.socket_path)
+
+
+def request(payload, socket_path=SOCKET_FILE, timeout=CLIENT_TIMEOUT):
+    """Envia um pedido ao daemon; retorna a resposta ou None se não houver daemon"""
+    if not os.path.exists(socket_path):
+        return None
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(str(socket_path))
+            sock.sendall((json.dumps(payload, ensure_ascii=False) + '\n').encode('utf-8'))
+            buffer = b''
+            while not buffer.endswith(b'\n'):
+                chunk = sock.recv(65536)
+                if not chunk:
+                    return None
+                buffer += chunk
+    except OSError:
+        return None
+    return json.loads(buffer)
+
+
+def wait_until_ready(socket_path=SOCKET_FILE, timeout=10.0):
+    """Espera o daemon responder (usado por quem o inicia em segundo plano)"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if request({'command': 'ping'}, socket_path) is not None:
+            return True
+        time.sleep(0.05)
+    return False
@@ -0,0 +1,224 @@
+"""
+Detecção de quase-duplicatas na ontologia CRIOS (MinHash + LSH)
+Textos parecidos (descrições de conceitos ou de relações) são achados sem
+comparar todos os pares: só os que caem no mesmo balde em alguma banda das
+assinaturas MinHash são verificados
+
+- `shingle_sets()`: k-gramas de caracteres do texto normalizado (sem acento,
+  espaços colapsados), com hash de 64 bits calculado em arrays
+- `minhash()`: NUM_PERM funções de hash (multiplica-desloca); assinatura =
+  mínimo de cada função sobre os shingles do texto
+- `lsh_pairs()`: BANDS bandas de ROWS linhas; pares no mesmo balde viram
+  candidatos (baldes enormes ligam cada membro só ao primeiro)
+- `common_shingles()`: descarta shingles de trechos-modelo repetidos em
+  muitos textos, que fariam qualquer par de textos-modelo parecer duplicata
+- `near_duplicates()`: candidatos verificados pelo Jaccard exato dos
+  shingles, em ordem decrescente; `duplicate_groups()` junta os pares em grupos
+
+Com BANDS × ROWS = 32 × 4, pares com Jaccard ≥ ~0.5 viram candidatos com
+probabilidade > 0.85 e pares com Jaccard ≤ 0.2 quase nunca
+
+Requer NumPy (`pip install numpy`)
+"""
+
+import numpy as np
+
+from .text import fold
+
+SHINGLE_SIZE = 5
+NUM_PERM = 128
+BANDS = 32
+ROWS = NUM_PERM // BANDS
+THRESHOLD = 0.5
+
+# Shingles presentes em mais que essa fração dos textos (trechos-modelo como
+# "[Descrição a ser expandida]") são ignorados
+MAX_SHARE = 0.02
+
+# Baldes maiores que isso ligam cada membro só ao primeiro (evita pares²)
+MAX_BUCKET = 64
+
+# Entradas (shingles × funções) por bloco ao calcular as assinaturas
+MAX_ENTRIES = 4_000_000
+
+_MIX_1 = np.uint64(0xBF58476D1CE4E5B9)
+_MIX_2 = np.uint64(0x94D049BB133111EB)
+_BASE = np.uint64(0x100000001B3)
+
+
+def _mix(values):
+    """Finalizador do splitmix64 (espalha os bits de cada valor)"""
+    values = values ^ (values >> np.uint64(30))
+    values = values * _MIX_1
+    values = values ^ (values >> np.uint64(27))
+    values = values * _MIX_2
+    return values ^ (values >> np.uint64(31))
+
+
+def normalize(text):
+    """Texto sem acentos, minúsculo, com espaços colapsados"""
+    return ' '.join(fold(text or '').split())
+
+
+def shingle_sets(texts, size=SHINGLE_SIZE):
+    """
+    (offsets, hashes): hashes ordenados e únicos dos k-gramas de cada texto,
+    concatenados (texto i em hashes[offsets[i]:offsets[i+1]]). Textos mais
+    curtos que `size` viram um único shingle; textos vazios, nenhum
+    """
+    encoded = [normalize(t).encode('utf-8') for t in texts]
+    lengths = np.array([len(e) for e in encoded], dtype=np.int64)
+    padded = [e.ljust(size) if e else e for e in encoded]
+    data = np.frombuffer(b''.join(padded), dtype=np.uint8).astype(np.uint64)
+    sizes = np.array([len(e) for e in padded], dtype=np.int64)
+    starts = np.cumsum(sizes) - sizes
+
+    # Hash polinomial de cada janela de `size` bytes (aritmética mod 2^64)
+    windows = np.maximum(sizes - size + 1, 0) * (lengths > 0)
+    owners = np.repeat(np.arange(len(texts)), windows)
+    positions = np.arange(windows.sum()) - np.repeat(np.cumsum(windows) - windows, windows)
+    positions += starts[owners]
+    hashes = np.zeros(len(positions), dtype=np.uint64)
+    for offset in range(size):
+        hashes = hashes * _BASE + data[positions + offset]
+    hashes = _mix(hashes)
+
+    order = np.lexsort((hashes, owners))
+    owners, hashes = owners[order], hashes[order]
+    keep = np.ones(len(hashes), dtype=bool)
+    keep[1:] = (owners[1:] != owners[:-1]) | (hashes[1:] != hashes[:-1])
+    owners, hashes = owners[keep], hashes[keep]
+    offsets = np.zeros(len(texts) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(owners, minlength=len(texts)), out=offsets[1:])
+    return offsets, hashes
+
+
+def common_shingles(offsets, hashes, max_share=MAX_SHARE):
+    """(offsets, hashes) sem os shingles presentes em mais de max_share dos textos (mínimo 2)"""
+    n = len(offsets) - 1
+    values, inverse, counts = np.unique(hashes, return_inverse=True, return_counts=True)
+    keep = counts[inverse.reshape(-1)] <= max(2, max_share * n)
+    owners = np.repeat(np.arange(n), np.diff(offsets))[keep]
+    offsets = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(owners, minlength=n), out=offsets[1:])
+    return offsets, hashes[keep]
+
+
+def minhash(offsets, hashes, num_perm=NUM_PERM, seed=0):
+    """
+    Assinaturas textos × num_perm: h_i(x) = (a_i·x + b_i) >> 32, mínimo por
+    texto. Textos sem shingles ficam com o valor máximo em todas as posições
+    """
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, 2 ** 63, size=num_perm, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+    b = rng.integers(0, 2 ** 63, size=num_perm, dtype=np.uint64)
+    n = len(offsets) - 1
+    signatures = np.full((n, num_perm), np.iinfo(np.uint64).max, dtype=np.uint64)
+    present = np.flatnonzero(np.diff(offsets) > 0)
+    if not len(present):
+        return signatures
+
+    columns = max(1, MAX_ENTRIES // max(len(hashes), 1))
+    for start in range(0, num_perm, columns):
+        stop = min(start + columns, num_perm)
+        values = (hashes[:, None] * a[start:stop] + b[start:stop]) >> np.uint64(32)
+        signatures[present, start:stop] = np.minimum.reduceat(values, offsets[present], axis=0)
+    return signatures
+
+
+def lsh_pairs(signatures, bands=BANDS, rows=None):
+    """
+    Pares candidatos (i, j), i < j, únicos e ordenados: textos com as mesmas
+    `rows` linhas em pelo menos uma banda. Assinaturas vazias não entram
+    """
+    n, num_perm = signatures.shape
+    rows = rows or num_perm // bands
+    empty = (signatures == np.iinfo(np.uint64).max).all(axis=1)
+    found = []
+    for band in range(bands):
+        block = signatures[:, band * rows:(band + 1) * rows]
+        keys = np.zeros(n, dtype=np.uint64)
+        for column in range(block.shape[1]):
+            keys = _mix(keys * _BASE + block[:, column])
+        members = np.flatnonzero(~empty)
+        members = members[np.argsort(keys[members], kind='stable')]
+        sorted_keys = keys[members]
+        cuts = np.flatnonzero(np.diff(sorted_keys)) + 1
+        starts = np.concatenate([[0], cuts])
+        sizes = np.diff(np.concatenate([starts, [len(members)]]))
+        for start, size in zip(starts[sizes > 1].tolist(), sizes[sizes > 1].tolist()):
+            bucket = members[start:start + size]
+            if size > MAX_BUCKET:
+                found.append((np.full(size - 1, bucket[0]), bucket[1:]))
+            else:
+                left, right = np.triu_indices(size, 1)
+                found.append((bucket[left], bucket[right]))
+    if not found:
+        return np.zeros((0, 2), dtype=np.int64)
+    left = np.concatenate([f[0] for f in found])
+    right = np.concatenate([f[1] for f in found])
+    keys = np.unique(np.minimum(left, right) * n + np.maximum(left, right))
+    return np.stack([keys // n, keys % n], axis=1)
+
+
+def jaccard(offsets, hashes, i, j):
+    """Jaccard exato entre os shingles dos textos i e j"""
+    first = hashes[offsets[i]:offsets[i + 1]]
+    second = hashes[offsets[j]:offsets[j + 1]]
+    if not len(first) and not len(second):
+        return 0.0
+    common = len(np.intersect1d(first, second, assume_unique=True))
+    return common / (len(first) + len(second) - common)
+
+
+def near_duplicates(texts, threshold=THRESHOLD, size=SHINGLE_SIZE, max_share=MAX_SHARE, seed=0):
+    """
+    [(jaccard, i, j), ...] dos pares de textos com Jaccard ≥ threshold
+    (sem os shingles comuns; `max_share=None` mantém todos), em ordem
+    decrescente (empate: menores índices)
+
+    Textos idênticos (após normalizar) são comparados uma vez só: cada
+    cópia aparece como par (primeira ocorrência, cópia) com Jaccard 1
+    """
+    first = {}
+    copies = []
+    for index, text in enumerate(texts):
+        key = normalize(text)
+        if key in first:
+            copies.append((1.0, first[key], index))
+        elif key:
+            first[key] = index
+    unique = list(first.values())
+
+    offsets, hashes = shingle_sets([texts[i] for i in unique], size)
+    if max_share is not None:
+        offsets, hashes = common_shingles(offsets, hashes, max_share)
+    signatures = minhash(offsets, hashes, seed=seed)
+    pairs = copies
+    for i, j in lsh_pairs(signatures).tolist():
+        similarity = jaccard(offsets, hashes, i, j)
+        if similarity >= threshold:
+            pairs.append((similarity, unique[i], unique[j]))
+    pairs.sort(key=lambda p: (-p[0], p[1], p[2]))
+    return pairs
+
+
+def duplicate_groups(pairs, n):
+    """Grupos (listas de índices, ordenadas) ligados pelos pares, maiores primeiro"""
+    parent = list(range(n))
+
+    def find(x):
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for _, i, j in pairs:
+        ri, rj = find(i), find(j)
+        if ri != rj:
+            parent[max(ri, rj)] = min(ri, rj)
+    groups = {}
+    for _, i, j in pairs:
+        for x in (i, j):
+            groups.setdefault(find(x), set()).add(x)
+    return sorted((sorted(g) for g in groups.values()), key=lambda g: (-len(g), g[0]))
@@ -0,0 +1,168 @@
+"""
+Métricas da distribuição de conectividade (graus) da ontologia CRIOS
+Média, desvio, assimetria, curtose, cobertura das faixas ±kσ e o score de
+normalidade usado pelos scripts de suavização
+
+- Funções sobre arrays NumPy para calcular do zero
+- `DegreeAccumulator`: somas de potências atualizadas em O(1) quando o grau
+  de um nó muda, para avaliar milhares de edições candidatas sem reescanear
+
+Requer NumPy (`pip install numpy`)
+"""
+
+import math
+
+import numpy as np
+
+
+def normality_score(within_1sigma, within_2sigma, skewness, kurtosis):
+    """Score 0–100 de proximidade da normal (coberturas em %)"""
+    score = 100
+    score -= min(abs(within_1sigma - 68) * 2, 30)
+    score -= min(abs(within_2sigma - 95) * 1, 20)
+    score -= min(abs(skewness) * 20, 20)
+    score -= min(abs(kurtosis) * 10, 15)
+    return score
+
+
+def moments(degrees):
+    """(média, desvio populacional, assimetria, curtose em excesso)"""
+    x = np.asarray(degrees, dtype=np.float64)
+    mean = x.mean()
+    dev = x - mean
+    std = math.sqrt(np.mean(dev * dev))
+    if std == 0:
+        return float(mean), std, 0, 0
+    skewness = np.mean(dev ** 3) / std ** 3
+    kurtosis = np.mean(dev ** 4) / std ** 4 - 3
+    return float(mean), std, float(skewness), float(kurtosis)
+
+
+def sigma_coverage(degrees, mean, std, k=1):
+    """% de nós com |grau - média| ≤ kσ"""
+    x = np.asarray(degrees, dtype=np.float64)
+    return float(np.count_nonzero(np.abs(x - mean) <= k * std)) / len(x) * 100
+
+
+def normality(degrees):
+    """Todas as métricas de normalidade de uma lista/array de graus"""
+    mean, std, skewness, kurtosis = moments(degrees)
+    within_1sigma = sigma_coverage(degrees, mean, std, 1)
+    within_2sigma = sigma_coverage(degrees, mean, std, 2)
+    return {
+        'score': normality_score(within_1sigma, within_2sigma, skewness, kurtosis),
+        'mean': mean,
+        'std': std,
+        'skewness': skewness,
+        'kurtosis': kurtosis,
+        'within_1sigma': within_1sigma,
+        'within_2sigma': within_2sigma,
+    }
+
+
+def summary(degrees):
+    """Média, mediana, desvio amostral, extremos e faixas ±1σ/±2σ"""
+    x = np.asarray(degrees, dtype=np.float64)
+    mean = float(x.mean())
+    stdev = float(x.std(ddof=1)) if len(x) > 1 else 0.0
+    return {
+        'mean': mean,
+        'median': float(np.median(x)),
+        'stdev': stdev,
+        'min': int(x.min()),
+        'max': int(x.max()),
+        'range_1sigma': (mean - stdev, mean + stdev),
+        'range_2sigma': (mean - 2 * stdev, mean + 2 * stdev),
+    }
+
+
+class DegreeAccumulator:
+    """
+    Distribuição de graus mantida por somas de potências inteiras (Σx⁰…Σx⁴)
+    e histograma. `change()` custa O(1); momentos saem das somas em O(1) e a
+    cobertura ±kσ percorre só os graus distintos
+    """
+
+    def __init__(self, degrees=()):
+        self.sums = [0, 0, 0, 0, 0]
+        self.histogram = []
+        for degree in degrees:
+            self.add(degree)
+
+    def _shift(self, degree, sign):
+        if degree >= len(self.histogram):
+            self.histogram.extend([0] * (degree + 1 - len(self.histogram)))
+        self.histogram[degree] += sign
+        power = 1
+        for i in range(5):
+            self.sums[i] += sign * power
+            power *= degree
+
+    def add(self, degree):
+        self._shift(degree, 1)
+
+    def remove(self, degree):
+        self._shift(degree, -1)
+
+    def change(self, old, new):
+        """Um nó passou de grau `old` para `new`"""
+        if old != new:
+            self._shift(old, -1)
+            self._shift(new, 1)
+
+    def apply(self, changes):
+        for old, new in changes:
+            self.change(old, new)
+
+    def revert(self, changes):
+        for old, new in reversed(changes):
+            self.change(new, old)
+
+    @property
+    def n(self):
+        return self.sums[0]
+
+    def moments(self):
+        """(média, desvio populacional, assimetria, curtose em excesso)"""
+        n, s1, s2, s3, s4 = self.sums
+        mean = s1 / n
+        # Momentos centrais com numeradores inteiros exatos
+        m2 = (n * s2 - s1 * s1) / n ** 2
+        if m2 <= 0:
+            return mean, 0.0, 0, 0
+        m3 = (n * n * s3 - 3 * n * s1 * s2 + 2 * s1 ** 3) / n ** 3
+        m4 = (n ** 3 * s4 - 4 * n * n * s1 * s3 + 6 * n * s1 * s1 * s2 - 3 * s1 ** 4) / n ** 4
+        std = math.sqrt(m2)
+        return mean, std, m3 / std ** 3, m4 / m2 ** 2 - 3
+
+    def coverage(self, mean, std, k=1):
+        """% de nós com |grau - média| ≤ kσ"""
+        limit = k * std
+        inside = sum(count for degree, count in enumerate(self.histogram)
+                     if count and abs(degree - mean) <= limit)
+        return inside / self.n * 100
+
+    def normality(self):
+        mean, std, skewness, kurtosis = self.moments()
+        within_1sigma = self.coverage(mean, std, 1)
+        within_2sigma = self.coverage(mean, std, 2)
+        return {
+            'score': normality_score(within_1sigma, within_2sigma, skewness, kurtosis),
+            'mean': mean,
+            'std': std,
+            'skewness': skewness,
+            'kurtosis': kurtosis,
+            'within_1sigma': within_1sigma,
+            'within_2sigma': within_2sigma,
+        }
+
+    def score(self):
+        return self.normality()['score']
+
+    def trial(self, changes):
+        """Score se as mudanças de grau [(antigo, novo), ...] fossem aplicadas"""
+        self.apply(changes)
+        try:
+            return self.score()
+        finally:
+            self.revert(changes)
@@ -0,0 +1,291 @@
+"""
+Embedding espectral do grafo da ontologia CRIOS
+Coordenadas globais de baixa dimensão (autovetores do Laplaciano
+normalizado) em que conceitos estruturalmente próximos ficam próximos
+
+- `spectral_embedding()`: autovetores por Lanczos esparso (SciPy `eigsh`);
+  sem SciPy, `eigh` denso do NumPy até DENSE_LIMIT nós
+- `load_embedding(snapshot)` guarda o resultado ao lado do snapshot binário,
+  então só é recalculado quando os JSON mudam
+- `NeighborIndex`: vizinhos mais próximos por KD-tree (SciPy `cKDTree`), ou
+  por força bruta em blocos sem SciPy
+- `ProjectionForest`: vizinhos aproximados por árvores de projeção aleatória
+  (O(log n) por consulta, para vetores de dimensão alta)
+
+Pesos das arestas vêm da classe do verbo (`ranking.py`). Nós isolados ficam
+na origem
+
+Requer NumPy (`pip install numpy`); SciPy é opcional (`pip install scipy`)
+"""
+
+import numpy as np
+
+from .ranking import undirected_weights
+
+try:
+    from scipy import sparse
+    from scipy.sparse.linalg import eigsh
+    from scipy.spatial import cKDTree
+except ImportError:  # SciPy é opcional
+    sparse = eigsh = cKDTree = None
+
+EMBEDDING_VERSION = 1
+DEFAULT_DIM = 8
+
+# Sem SciPy, acima disso a matriz densa n × n não compensa
+DENSE_LIMIT = 4000
+
+# Linhas por bloco na busca por força bruta
+BRUTE_BLOCK = 1024
+
+# Floresta de projeções aleatórias (vizinhos aproximados)
+FOREST_TREES = 16
+FOREST_LEAF = 32
+
+
+def normalized_adjacency(csr, weights=None):
+    """
+    (D^-1/2 A D^-1/2, grau ponderado) da adjacência não-direcionada; a
+    matriz é esparsa (SciPy) ou densa (NumPy)
+    """
+    n = csr.n
+    eu, ev = csr.undirected_edges()
+    eu, ev = eu.astype(np.int64), ev.astype(np.int64)
+    w = undirected_weights(csr) if weights is None else np.asarray(weights, dtype=np.float64)
+    strength = np.bincount(eu, weights=w, minlength=n) + np.bincount(ev, weights=w, minlength=n)
+    scale = np.zeros(n)
+    np.divide(1.0, np.sqrt(strength), out=scale, where=strength > 0)
+    values = w * scale[eu] * scale[ev]
+
+    if sparse is not None:
+        rows = np.concatenate([eu, ev])
+        cols = np.concatenate([ev, eu])
+        matrix = sparse.csr_matrix((np.concatenate([values, values]), (rows, cols)), shape=(n, n))
+    else:
+        matrix = np.zeros((n, n))
+        matrix[eu, ev] = values
+        matrix[ev, eu] = values
+    return matrix, strength
+
+
+def spectral_embedding(csr, dim=DEFAULT_DIM, weights=None, seed=0):
+    """
+    Autovetores 2..dim+1 do Laplaciano normalizado, reescalados por D^-1/2
+    (mapa de Laplace). Retorna (vetores n × dim, autovalores do Laplaciano)
+
+    Os menores autovalores de L = I - D^-1/2 A D^-1/2 são os maiores da
+    adjacência normalizada, achados por Lanczos sobre A + I (positiva
+    semidefinida). O sinal de cada eixo é fixado pela maior componente
+    """
+    n = csr.n
+    k = min(dim + 1, n - 1)
+    if k < 2:
+        return np.zeros((n, dim)), np.zeros(dim)
+    matrix, strength = normalized_adjacency(csr, weights)
+
+    if sparse is not None and n > k + 1:
+        shifted = matrix + sparse.identity(n, format='csr')
+        start = np.random.default_rng(seed).random(n)
+        values, vectors = eigsh(shifted, k=k, which='LA', v0=start)
+        values = values - 1.0
+    else:
+        if n > DENSE_LIMIT:
+            raise ImportError(f"Embedding espectral de {n} nós requer SciPy (pip install scipy)")
+        dense = matrix.toarray() if sparse is not None else matrix
+        values, vectors = np.linalg.eigh(dense)
+        values, vectors = values[-k:], vectors[:, -k:]
+
+    # Maior autovalor primeiro; o primeiro (trivial, ∝ D^1/2 1) sai
+    order = np.argsort(-values)[1:]
+    values, vectors = 1.0 - values[order], vectors[:, order]
+    scale = np.zeros(n)
+    np.divide(1.0, np.sqrt(strength), out=scale, where=strength > 0)
+    vectors = vectors * scale[:, None]
+    signs = np.sign(vectors[np.abs(vectors).argmax(axis=0), np.arange(vectors.shape[1])])
+    vectors = vectors * np.where(signs == 0, 1.0, signs)
+
+    if vectors.shape[1] < dim:
+        pad = dim - vectors.shape[1]
+        vectors = np.hstack([vectors, np.zeros((n, pad))])
+        values = np.concatenate([values, np.zeros(pad)])
+    return vectors, values
+
+
+def load_embedding(snapshot=None, dim=DEFAULT_DIM):
+    """
+    Embedding do snapshot atual, calculado uma vez por versão dos JSON
+    (arquivo `<token>-spectral-v<N>-d<dim>.npz` em assets/.snapshot/)
+    """
+    if snapshot is None:
+        from .snapshot import load_snapshot
+        snapshot = load_snapshot()
+
+    def compute():
+        vectors, values = spectral_embedding(snapshot.csr, dim)
+        return {'vectors': vectors, 'values': values}
+
+    saved = snapshot.cached_arrays(f'spectral-v{EMBEDDING_VERSION}-d{dim}', compute)
+    return saved['vectors'], saved['values']
+
+
+def unit_rows(vectors):
+    """Linhas com norma 1 (linhas nulas continuam nulas)"""
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+
+
+class NeighborIndex:
+    """
+    Vizinhos mais próximos (distância euclidiana) entre as linhas de `points`
+
+    Com SciPy usa uma KD-tree (O(log n) por consulta); sem SciPy compara
+    bloco a bloco com todos os pontos
+    """
+
+    def __init__(self, points):
+        self.points = np.ascontiguousarray(points, dtype=np.float64)
+        self.tree = cKDTree(self.points) if cKDTree is not None else None
+
+    def query(self, queries, k=10):
+        """(distâncias, índices) dos k pontos mais próximos de cada consulta"""
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float64))
+        k = min(k, len(self.points))
+        if self.tree is not None:
+            distances, indices = self.tree.query(queries, k=k)
+            return distances.reshape(len(queries), k), indices.reshape(len(queries), k)
+
+        squared = np.einsum('ij,ij->i', self.points, self.points)
+        distances = np.empty((len(queries), k))
+        indices = np.empty((len(queries), k), dtype=np.int64)
+        for start in range(0, len(queries), BRUTE_BLOCK):
+            block = queries[start:start + BRUTE_BLOCK]
+            d2 = (np.einsum('ij,ij->i', block, block)[:, None] + squared[None, :]
+                  - 2 * block @ self.points.T)
+            top = np.argpartition(d2, k - 1, axis=1)[:, :k]
+            top_d2 = np.take_along_axis(d2, top, axis=1)
+            order = np.lexsort((top, top_d2), axis=1)
+            indices[start:start + len(block)] = np.take_along_axis(top, order, axis=1)
+            distances[start:start + len(block)] = np.sqrt(np.maximum(
+                np.take_along_axis(top_d2, order, axis=1), 0))
+        return distances, indices
+
+    def neighbors(self, nodes, k=10):
+        """k vizinhos de cada nó dado, sem o próprio nó: (distâncias, índices)"""
+        nodes = np.atleast_1d(np.asarray(nodes, dtype=np.int64))
+        distances, indices = self.query(self.points[nodes], k + 1)
+        keep = indices != nodes[:, None]
+        # Se o nó não apareceu (pontos repetidos), descarta o último
+        keep[keep.all(axis=1), -1] = False
+        shape = (len(nodes), indices.shape[1] - 1)
+        return distances[keep].reshape(shape), indices[keep].reshape(shape)
+
+
+class ProjectionForest(NeighborIndex):
+    """
+    Vizinhos aproximados por floresta de árvores de projeção aleatória
+
+    Cada árvore divide os pontos ao meio por hiperplanos aleatórios (corte
+    na mediana da projeção), nível a nível, até folhas de ~`leaf_size`
+    pontos. A consulta desce cada árvore em O(log n), junta as folhas
+    alcançadas e ordena só esses candidatos pela distância exata. Mais
+    árvores = mais candidatos = melhor revocação. Útil em dimensões altas,
+    onde a KD-tree degenera
+    """
+
+    def __init__(self, points, trees=FOREST_TREES, leaf_size=FOREST_LEAF, seed=0, arrays=None):
+        self.points = np.ascontiguousarray(points, dtype=np.float64)
+        self.tree = None
+        if arrays is not None:
+            self.planes, self.thresholds, self.order, self.offsets = arrays
+            return
+
+        n, dim = self.points.shape
+        depth = max(0, int(np.ceil(np.log2(max(n, 1) / leaf_size))))
+        rng = np.random.default_rng(seed)
+        self.planes = np.zeros((trees, 2 ** depth - 1, dim))
+        self.thresholds = np.zeros((trees, 2 ** depth - 1))
+        self.order = np.zeros((trees, n), dtype=np.int64)
+        self.offsets = np.zeros((trees, 2 ** depth + 1), dtype=np.int64)
+
+        for t in range(trees):
+            group = np.zeros(n, dtype=np.int64)
+            for level in range(depth):
+                width = 2 ** level
+                planes = rng.normal(size=(width, dim))
+                projection = np.einsum('ij,ij->i', self.points, planes[group])
+                # Mediana de cada grupo: ponto médio entre os dois centrais
+                order = np.lexsort((projection, group))
+                counts = np.bincount(group, minlength=width)
+                starts = np.cumsum(counts) - counts
+                ranked = projection[order]
+                upper = np.minimum(starts + counts // 2, n - 1)
+                lower = np.maximum(upper - 1, starts)
+                thresholds = np.where(counts > 0, (ranked[lower] + ranked[upper]) / 2, 0.0)
+                self.planes[t, width - 1:2 * width - 1] = planes
+                self.thresholds[t, width - 1:2 * width - 1] = thresholds
+                group = 2 * group + (projection >= thresholds[group])
+            self.order[t] = np.argsort(group, kind='stable')
+            np.cumsum(np.bincount(group, minlength=2 ** depth), out=self.offsets[t, 1:])
+
+    def arrays(self):
+        """Arrays da floresta (para gravar junto com os vetores)"""
+        return self.planes, self.thresholds, self.order, self.offsets
+
+    def leaves(self, queries):
+        """Folha alcançada por cada consulta em cada árvore (consultas × árvores)"""
+        trees, nodes = self.thresholds.shape
+        depth = int(np.log2(nodes + 1))
+        result = np.zeros((len(queries), trees), dtype=np.int64)
+        for t in range(trees):
+            group = np.zeros(len(queries), dtype=np.int64)
+            for level in range(depth):
+                slot = 2 ** level - 1 + group
+                projection = np.einsum('ij,ij->i', queries, self.planes[t, slot])
+                group = 2 * group + (projection >= self.thresholds[t, slot])
+            result[:, t] = group
+        return result
+
+    def query(self, queries, k=10):
+        """(distâncias, índices) aproximados dos k mais próximos; -1/inf se faltarem candidatos"""
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float64))
+        n = len(self.points)
+        k = min(k, n)
+        trees = len(self.order)
+        leaves = self.leaves(queries)
+
+        # Pares (consulta, candidato) de todas as folhas alcançadas
+        owners = np.repeat(np.arange(len(queries)), trees)
+        tree_ids = np.tile(np.arange(trees), len(queries))
+        starts = self.offsets[tree_ids, leaves.ravel()]
+        counts = self.offsets[tree_ids, leaves.ravel() + 1] - starts
+        slots = np.repeat(starts - (np.cumsum(counts) - counts), counts) + np.arange(counts.sum())
+        candidates = self.order[np.repeat(tree_ids, counts), slots]
+        keys = np.unique(np.repeat(owners, counts) * n + candidates)
+        owners, candidates = keys // n, keys % n
+
+        delta = self.points[candidates] - queries[owners]
+        d2 = np.einsum('ij,ij->i', delta, delta)
+        order = np.lexsort((candidates, d2, owners))
+        owners, candidates, d2 = owners[order], candidates[order], d2[order]
+        first = np.searchsorted(owners, np.arange(len(queries)))
+        rank = np.arange(len(owners)) - first[owners]
+        keep = rank < k
+
+        distances = np.full((len(queries), k), np.inf)
+        indices = np.full((len(queries), k), -1, dtype=np.int64)
+        distances[owners[keep], rank[keep]] = np.sqrt(d2[keep])
+        indices[owners[keep], rank[keep]] = candidates[keep]
+        return distances, indices
+
+
+def structural_neighbors(vectors, k=10, nodes=None):
+    """
+    {nó: [(vizinho, similaridade)]} pelos cossenos no embedding; similaridade
+    = 1 - d²/2 entre vetores unitários (em [-1, 1])
+    """
+    unit = unit_rows(vectors)
+    nodes = np.arange(len(unit)) if nodes is None else np.asarray(nodes, dtype=np.int64)
+    distances, indices = NeighborIndex(unit).neighbors(nodes, k)
+    similarity = 1.0 - distances ** 2 / 2
+    return {int(node): list(zip(indices[row].tolist(), similarity[row].tolist()))
+            for row, node in enumerate(nodes)}
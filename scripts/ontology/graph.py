@@ -0,0 +1,300 @@
+"""
+Grafo indexado da ontologia CRIOS
+Carrega conceitos e relações uma única vez e mantém índices O(1) para
+consultas por ID, camada, vizinhança, pares e verbos
+"""
+
+import sys
+from collections import Counter, defaultdict
+from pathlib import Path
+
+from .io import CONCEPTS_FILE, RELATIONS_FILE, load_json, save_json
+from .journal import JOURNAL_FILE, Journal
+
+UNKNOWN_LAYER = 'desconhecida'
+
+_EMPTY = frozenset()
+
+
+def pair_key(a, b):
+    """Chave não-ordenada de um par de conceitos"""
+    return (a, b) if a <= b else (b, a)
+
+
+class OntologyGraph:
+    """
+    Conceitos + relações com índices mantidos em memória
+
+    As listas `concepts` e `relations` continuam sendo a fonte de verdade
+    (são elas que vão para o disco); os índices são derivados delas e
+    atualizados incrementalmente pelos métodos de mutação.
+    """
+
+    def __init__(self, concepts, relations):
+        self.concepts = concepts
+        self.relations = relations
+        self.journal = None
+        self.reindex()
+
+    @classmethod
+    def load(cls, concepts_file=CONCEPTS_FILE, relations_file=RELATIONS_FILE,
+             journal_file=JOURNAL_FILE):
+        """
+        Carrega o grafo a partir dos arquivos JSON
+
+        Transações pendentes do journal são reaplicadas por cima (passe
+        journal_file=None para ler só os JSON). IDs repetidos são avisados
+        aqui: `by_id` fica com o último conceito de cada um
+        """
+        graph = cls(load_json(concepts_file), load_json(relations_file))
+        graph.files = (concepts_file, relations_file)
+        if graph.duplicate_ids:
+            listed = ', '.join(f"{cid} ({n}×)" for cid, n in sorted(graph.duplicate_ids.items()))
+            # stderr: não mistura com saídas --json
+            print(f"⚠️  IDs duplicados em {Path(concepts_file).name} (vale o último): {listed}",
+                  file=sys.stderr)
+        if journal_file is not None:
+            graph.journal = Journal(journal_file)
+            graph.journal.replay(graph)
+        return graph
+
+    def save(self, concepts_file=CONCEPTS_FILE, relations_file=RELATIONS_FILE):
+        """
+        Salva conceitos e relações (passe None para pular um arquivo)
+
+        Se o grafo veio com transações do journal, salvar é uma compactação:
+        os dois arquivos são gravados e o journal é arquivado
+        """
+        pending = self.journal is not None and self.journal.pending()
+        if pending:
+            concepts_file = concepts_file or self.files[0]
+            relations_file = relations_file or self.files[1]
+        if concepts_file is not None:
+            save_json(concepts_file, self.concepts)
+        if relations_file is not None:
+            save_json(relations_file, self.relations)
+        if pending:
+            self.journal.archive()
+
+    def record(self, label, ops):
+        """Registra operações no journal em vez de regravar os JSON"""
+        journal = self.journal or Journal()
+        return journal.append(label, ops)
+
+    # ------------------------------------------------------------------
+    # Índices
+    # ------------------------------------------------------------------
+
+    def reindex(self):
+        """Reconstrói todos os índices a partir das listas"""
+        self._index_concepts()
+
+        self.out_edges = defaultdict(list)
+        self.in_edges = defaultdict(list)
+        self.adjacency = defaultdict(set)
+        self.pair_counts = Counter()
+        self.verb_index = defaultdict(list)
+
+        for rel in self.relations:
+            self._index_relation(rel)
+
+    def _index_concepts(self):
+        # Último conceito com o ID vence, como os {c['id']: c for c in ...}
+        # que o índice substituiu
+        self.by_id = {concept['id']: concept for concept in self.concepts}
+        counts = Counter(concept['id'] for concept in self.concepts)
+        self.duplicate_ids = {cid: n for cid, n in counts.items() if n > 1}
+
+    def _index_relation(self, rel):
+        from_id, to_id = rel['from'], rel['to']
+        self.out_edges[from_id].append(rel)
+        self.in_edges[to_id].append(rel)
+        self.verb_index[rel['name']].append(rel)
+
+        key = pair_key(from_id, to_id)
+        self.pair_counts[key] += 1
+        self.adjacency[from_id].add(to_id)
+        self.adjacency[to_id].add(from_id)
+
+    def _unindex_relation(self, rel):
+        from_id, to_id = rel['from'], rel['to']
+        _remove_identity(self.out_edges[from_id], rel)
+        _remove_identity(self.in_edges[to_id], rel)
+        _remove_identity(self.verb_index[rel['name']], rel)
+        if not self.verb_index[rel['name']]:
+            del self.verb_index[rel['name']]
+
+        key = pair_key(from_id, to_id)
+        self.pair_counts[key] -= 1
+        if self.pair_counts[key] <= 0:
+            del self.pair_counts[key]
+            self.adjacency[from_id].discard(to_id)
+            self.adjacency[to_id].discard(from_id)
+
+    # ------------------------------------------------------------------
+    # Consultas
+    # ------------------------------------------------------------------
+
+    def concept(self, concept_id):
+        """Retorna conceito por ID (ou None)"""
+        return self.by_id.get(concept_id)
+
+    def __contains__(self, concept_id):
+        return concept_id in self.by_id
+
+    def __len__(self):
+        return len(self.concepts)
+
+    def ids(self):
+        """IDs dos conceitos na ordem do arquivo"""
+        return [c['id'] for c in self.concepts]
+
+    def layer(self, concept_id, default=UNKNOWN_LAYER):
+        """Retorna a camada de um conceito"""
+        concept = self.by_id.get(concept_id)
+        if concept is None:
+            return default
+        return concept.get('layer', default)
+
+    def name(self, concept_id):
+        """Retorna o nome de um conceito (ou o próprio ID)"""
+        concept = self.by_id.get(concept_id)
+        return concept['name'] if concept else concept_id
+
+    def neighbors(self, concept_id):
+        """Vizinhos não-direcionados de um conceito"""
+        return self.adjacency.get(concept_id, _EMPTY)
+
+    def degree(self, concept_id):
+        """Número de vizinhos distintos (conexões bidirecionais)"""
+        return len(self.adjacency.get(concept_id, _EMPTY))
+
+    def degrees(self):
+        """Mapa id → grau para todos os conceitos"""
+        return {c['id']: self.degree(c['id']) for c in self.concepts}
+
+    def has_pair(self, a, b):
+        """Verifica se existe relação (em qualquer direção) entre a e b"""
+        return pair_key(a, b) in self.pair_counts
+
+    @property
+    def pairs(self):
+        """Pares não-ordenados com ao menos uma relação"""
+        return self.pair_counts.keys()
+
+    def relations_from(self, concept_id):
+        return self.out_edges.get(concept_id, [])
+
+    def relations_to(self, concept_id):
+        return self.in_edges.get(concept_id, [])
+
+    def relations_by_verb(self, verb):
+        return self.verb_index.get(verb, [])
+
+    def verb_counts(self):
+        """Contagem de uso de cada verbo"""
+        return Counter({verb: len(rels) for verb, rels in self.verb_index.items()})
+
+    def to_csr(self):
+        """Versão em arrays (CSR/CSC) do grafo atual; requer NumPy"""
+        from .csr import CSRGraph
+        return CSRGraph.from_graph(self)
+
+    def concepts_by_layer(self):
+        """Agrupa conceitos por camada"""
+        groups = defaultdict(list)
+        for concept in self.concepts:
+            groups[concept.get('layer', UNKNOWN_LAYER)].append(concept)
+        return groups
+
+    # ------------------------------------------------------------------
+    # Mutações
+    # ------------------------------------------------------------------
+
+    def add_concept(self, concept):
+        """Adiciona conceito (com ID repetido, passa a ser o de `by_id`)"""
+        concept_id = concept['id']
+        if concept_id in self.by_id:
+            self.duplicate_ids[concept_id] = self.duplicate_ids.get(concept_id, 1) + 1
+        self.concepts.append(concept)
+        self.by_id[concept_id] = concept
+        return concept
+
+    def add_relation(self, rel):
+        """Adiciona relação e atualiza índices"""
+        self.relations.append(rel)
+        self._index_relation(rel)
+        return rel
+
+    def remove_relation(self, rel):
+        """Remove uma relação específica (por identidade)"""
+        _remove_identity(self.relations, rel)
+        self._unindex_relation(rel)
+
+    def remove_relations_between(self, a, b):
+        """Remove todas as relações entre a e b (nas duas direções)"""
+        doomed = [r for r in self.out_edges.get(a, []) if r['to'] == b]
+        if a != b:
+            doomed += [r for r in self.out_edges.get(b, []) if r['to'] == a]
+        if not doomed:
+            return []
+        doomed_ids = {id(r) for r in doomed}
+        self.relations[:] = [r for r in self.relations if id(r) not in doomed_ids]
+        for rel in doomed:
+            self._unindex_relation(rel)
+        return doomed
+
+    def retarget_relation(self, rel, from_id=None, to_id=None):
+        """Altera origem/destino de uma relação mantendo os índices"""
+        self._unindex_relation(rel)
+        if from_id is not None:
+            rel['from'] = from_id
+        if to_id is not None:
+            rel['to'] = to_id
+        self._index_relation(rel)
+
+    def rename_verb(self, rel, verb):
+        """Troca o verbo de uma relação mantendo o índice de verbos"""
+        if rel['name'] == verb:
+            return
+        _remove_identity(self.verb_index[rel['name']], rel)
+        if not self.verb_index[rel['name']]:
+            del self.verb_index[rel['name']]
+        rel['name'] = verb
+        self.verb_index[verb].append(rel)
+
+    def sync(self, concepts, relations):
+        """
+        Aplica ao grafo só os registros que diferem de `concepts`/`relations`
+        (multiconjunto por conteúdo): relações entram e saem pelos métodos
+        de mutação, conceitos alterados trocam a lista e o índice por ID
+
+        Retorna (conceitos alterados, relações incluídas, relações removidas)
+        """
+        from .validation import changed_records
+        stale = changed_records(relations, self.relations)  # objetos do grafo
+        fresh = changed_records(self.relations, relations)
+        for rel in stale:
+            self.remove_relation(rel)
+        for rel in fresh:
+            self.add_relation(rel)
+
+        changed = len(changed_records(self.concepts, concepts))
+        if changed or len(concepts) != len(self.concepts):
+            self.concepts[:] = concepts
+            self._index_concepts()
+        return changed, len(fresh), len(stale)
+
+    def remove_concept(self, concept_id):
+        """Remove conceito(s) com o ID dado; relações não são tocadas"""
+        self.concepts[:] = [c for c in self.concepts if c['id'] != concept_id]
+        self.by_id.pop(concept_id, None)
+        self.duplicate_ids.pop(concept_id, None)
+
+
+def _remove_identity(items, obj):
+    """Remove obj de uma lista comparando por identidade"""
+    for i, item in enumerate(items):
+        if item is obj:
+            del items[i]
+            return
@@ -0,0 +1,67 @@
+"""
+Leitura e escrita dos arquivos da ontologia CRIOS
+Caminhos canônicos e helpers JSON compartilhados por todos os scripts
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+# Caminhos
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+ASSETS_DIR = BASE_DIR / 'assets'
+CONCEPTS_FILE = ASSETS_DIR / 'concepts.json'
+RELATIONS_FILE = ASSETS_DIR / 'relations.json'
+REFERENCIAS_FILE = ASSETS_DIR / 'referencias.json'
+PROPOSALS_FILE = ASSETS_DIR / 'new_relations_proposals.json'
+
+
+def load_json(filepath):
+    """Carrega arquivo JSON com encoding UTF-8"""
+    with open(filepath, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_json(filepath, data):
+    """Salva arquivo JSON com encoding UTF-8 e formatação"""
+    with open(filepath, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+
+
+def load_jsonl(filepath):
+    """Carrega arquivo JSONL (uma última linha truncada é ignorada)"""
+    if filepath is None or not os.path.exists(filepath):
+        return []
+    entries = []
+    with open(filepath, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                # Escrita interrompida: só pode ser a última linha
+                break
+    return entries
+
+
+def file_key(path):
+    """Chave barata de um arquivo: tamanho e mtime (ns); -1 se não existe"""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return {'size': -1, 'mtime_ns': 0}
+    return {'size': st.st_size, 'mtime_ns': st.st_mtime_ns}
+
+
+def file_hash(path):
+    """SHA-1 do conteúdo do arquivo"""
+    digest = hashlib.sha1()
+    if not os.path.exists(path):
+        return digest.hexdigest()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
@@ -0,0 +1,219 @@
+"""
+Journal de mudanças da ontologia CRIOS
+Mutações são acrescentadas como linhas JSONL compactas em
+`assets/ontology.journal.jsonl` em vez de regravar os JSON inteiros; a
+compactação (`make journal-compact`) aplica as pendentes nos arquivos
+canônicos e move o histórico para `assets/ontology.journal.archive.jsonl`
+
+Cada linha é uma transação (uma execução de script) ou um marcador:
+    {"tx": 3, "label": "...", "time": "...", "ops": [...]}
+    {"undo": 3, "time": "..."}
+    {"redo": 3, "time": "..."}
+
+Operações:
+    {"op": "add_relation", "rel": {...}}
+    {"op": "remove_relation", "rel": {...}}
+    {"op": "update_relation", "old": {...}, "new": {...}}
+    {"op": "move_concept", "id": "...", "layer": "...", "prev": "..."}
+    {"op": "update_concept", "id": "...", "set": {...}}
+"""
+
+import json
+import os
+from datetime import datetime
+
+from .io import ASSETS_DIR, load_jsonl
+
+JOURNAL_FILE = ASSETS_DIR / 'ontology.journal.jsonl'
+ARCHIVE_FILE = ASSETS_DIR / 'ontology.journal.archive.jsonl'
+
+
+# ----------------------------------------------------------------------
+# Construtores de operações
+# ----------------------------------------------------------------------
+
+def add_relation_op(rel):
+    return {'op': 'add_relation', 'rel': dict(rel)}
+
+
+def remove_relation_op(rel):
+    return {'op': 'remove_relation', 'rel': dict(rel)}
+
+
+def update_relation_op(old, new):
+    return {'op': 'update_relation', 'old': dict(old), 'new': dict(new)}
+
+
+def move_concept_op(concept_id, layer, prev=None):
+    return {'op': 'move_concept', 'id': concept_id, 'layer': layer, 'prev': prev}
+
+
+def update_concept_op(concept_id, fields):
+    return {'op': 'update_concept', 'id': concept_id, 'set': dict(fields)}
+
+
+def _now():
+    return datetime.now().isoformat(timespec='seconds')
+
+
+def _find_relation(graph, rel):
+    """Primeira relação do grafo igual (por valor) a rel"""
+    for candidate in graph.relations_from(rel['from']):
+        if candidate == rel:
+            return candidate
+    return None
+
+
+def apply_op(graph, op):
+    """Aplica uma operação ao grafo; retorna False se o alvo não existir"""
+    kind = op['op']
+    if kind == 'add_relation':
+        graph.add_relation(dict(op['rel']))
+        return True
+
+    if kind == 'remove_relation':
+        target = _find_relation(graph, op['rel'])
+        if target is None:
+            return False
+        graph.remove_relation(target)
+        return True
+
+    if kind == 'update_relation':
+        target = _find_relation(graph, op['old'])
+        if target is None:
+            return False
+        new = op['new']
+        graph.retarget_relation(target, new['from'], new['to'])
+        graph.rename_verb(target, new['name'])
+        target.clear()
+        target.update(new)
+        return True
+
+    concept = graph.concept(op['id'])
+    if concept is None:
+        return False
+    if kind == 'move_concept':
+        concept['layer'] = op['layer']
+    elif kind == 'update_concept':
+        concept.update(op['set'])
+    else:
+        raise ValueError(f"Operação desconhecida no journal: {kind}")
+    return True
+
+
+class Journal:
+    """Journal append-only com desfazer/refazer por transação"""
+
+    def __init__(self, path=JOURNAL_FILE, archive_path=ARCHIVE_FILE):
+        self.path = path
+        self.archive_path = archive_path
+
+    # ------------------------------------------------------------------
+    # Leitura
+    # ------------------------------------------------------------------
+
+    def entries(self):
+        """Linhas do journal pendente"""
+        return load_jsonl(self.path)
+
+    def history(self):
+        """Transações já compactadas (arquivo de histórico)"""
+        return load_jsonl(self.archive_path)
+
+    def state(self):
+        """
+        Resolve marcadores de desfazer/refazer
+
+        Retorna (transações ativas em ordem, pilha de refazer)
+        """
+        transactions = {}
+        active = []
+        redo_stack = []
+        for entry in self.entries():
+            if 'tx' in entry:
+                transactions[entry['tx']] = entry
+                active.append(entry['tx'])
+                redo_stack = []  # nova mudança descarta o que foi desfeito
+            elif 'undo' in entry and entry['undo'] in active:
+                active.remove(entry['undo'])
+                redo_stack.append(entry['undo'])
+            elif 'redo' in entry and redo_stack and redo_stack[-1] == entry['redo']:
+                active.append(redo_stack.pop())
+        return [transactions[tx] for tx in active], [transactions[tx] for tx in redo_stack]
+
+    def pending(self):
+        """Transações ativas ainda não compactadas"""
+        return self.state()[0]
+
+    def replay(self, graph):
+        """Aplica as transações ativas ao grafo; retorna operações sem alvo"""
+        missed = 0
+        for tx in self.pending():
+            for op in tx['ops']:
+                if not apply_op(graph, op):
+                    missed += 1
+        return missed
+
+    # ------------------------------------------------------------------
+    # Escrita
+    # ------------------------------------------------------------------
+
+    def _append(self, entry):
+        line = json.dumps(entry, ensure_ascii=False, separators=(',', ':'))
+        if os.path.exists(self.path):
+            # Descarta resto de uma escrita interrompida antes de continuar
+            with open(self.path, 'rb+') as f:
+                data = f.read()
+                if data and not data.endswith(b'\n'):
+                    f.truncate(data.rfind(b'\n') + 1)
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(line + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _next_tx(self):
+        last = 0
+        for entry in self.history() + self.entries():
+            last = max(last, entry.get('tx', 0))
+        return last + 1
+
+    def append(self, label, ops):
+        """Registra uma transação; retorna seu número (ou None se vazia)"""
+        ops = list(ops)
+        if not ops:
+            return None
+        tx = self._next_tx()
+        self._append({'tx': tx, 'label': label, 'time': _now(), 'ops': ops})
+        return tx
+
+    def undo(self):
+        """Desfaz a última transação ativa (retorna-a, ou None)"""
+        active, _ = self.state()
+        if not active:
+            return None
+        self._append({'undo': active[-1]['tx'], 'time': _now()})
+        return active[-1]
+
+    def redo(self):
+        """Refaz a última transação desfeita (retorna-a, ou None)"""
+        _, redo_stack = self.state()
+        if not redo_stack:
+            return None
+        self._append({'redo': redo_stack[-1]['tx'], 'time': _now()})
+        return redo_stack[-1]
+
+    def archive(self):
+        """
+        Esvazia o journal após a compactação
+
+        As transações ativas vão para o arquivo de histórico; as desfeitas
+        são descartadas
+        """
+        active = self.pending()
+        if self.archive_path is not None and active:
+            with open(self.archive_path, 'a', encoding='utf-8') as f:
+                for tx in active:
+                    f.write(json.dumps(tx, ensure_ascii=False, separators=(',', ':')) + '\n')
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        return active
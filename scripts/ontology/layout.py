@@ -0,0 +1,317 @@
+"""
+Layout 3D pré-calculado do rizoma (riz∅ma.html)
+Simulação de forças feita offline, no build, para que o navegador só leia as
+posições em vez de rodar o relaxamento O(n²) a cada carregamento
+
+- Posição inicial pelo embedding espectral (`embedding.py`), ou igual à do
+  frontend: camadas (ou comunidades estruturais) em clusters centrados numa
+  esfera de Fibonacci, raio do cluster ∝ ³√(proporção) / (0.5 + densidade)
+- Repulsão de Coulomb entre todos os nós por Barnes-Hut numa octree
+  (carga 1 + grau normalizado, como `normalizeConnectionWeight`)
+- Molas nas arestas, com o peso da classe do verbo (`ranking.py`)
+- Atrator esférico: cada nó volta ao seu raio (300 ± 15%) a cada passo
+
+A octree é montada por códigos de Morton ordenados (um nível por vez) e
+percorrida para todos os nós ao mesmo tempo, em pares (nó, célula) que só
+descem um nível quando a célula está perto demais (tamanho/distância ≥ θ).
+Tudo é determinístico dado o `seed`
+
+Requer NumPy (`pip install numpy`)
+"""
+
+import json
+import os
+
+import numpy as np
+
+from .metrics import same_layer_degree
+from .ranking import undirected_weights
+
+LAYOUT_VERSION = 1
+
+RADIUS = 300.0           # Raio da esfera do rizoma (igual ao frontend)
+RADIAL_SPREAD = 0.3      # Variação radial total (±15%)
+SPHERE_BLEND = 0.6       # Aderência à esfera na posição inicial
+
+THETA = 0.8              # Critério de abertura do Barnes-Hut
+MAX_DEPTH = 16           # Níveis da octree (células de lado/65536)
+SOFTENING = 5.0          # Evita força infinita entre nós coincidentes
+
+ITERATIONS = 300
+REPULSION = 2000.0
+SPRING = 0.02
+REST_LENGTH = 45.0
+MAX_STEP = 30.0          # Deslocamento máximo por passo (cai como e^(-1.5t))
+
+
+def _morton(cells, depth):
+    """Intercala os bits de (x, y, z) num código de Morton por nó"""
+    codes = np.zeros(len(cells), dtype=np.int64)
+    for bit in range(depth):
+        for axis in range(3):
+            codes |= ((cells[:, axis] >> bit) & 1) << (3 * bit + (2 - axis))
+    return codes
+
+
+class Octree:
+    """
+    Octree em arrays, um nível por vez
+
+    Em cada nível: `keys` (prefixo de Morton da célula, ordenado), `counts`,
+    `mass` (soma das cargas), `center` (centro de carga) e `first`/`last`,
+    o intervalo dos filhos no nível seguinte. `codes[i]` é o código do nó i
+    """
+
+    def __init__(self, positions, charges, depth=MAX_DEPTH):
+        lo = positions.min(axis=0)
+        span = float((positions.max(axis=0) - lo).max()) or 1.0
+        scale = (1 << depth) / (span * (1 + 1e-9))
+        cells = np.clip(((positions - lo) * scale).astype(np.int64), 0, (1 << depth) - 1)
+        self.codes = _morton(cells, depth)
+        self.depth = depth
+        self.levels = []
+
+        order = np.argsort(self.codes, kind='stable')
+        codes = self.codes[order]
+        weighted = positions[order] * charges[order, None]
+        q = charges[order]
+        for level in range(depth + 1):
+            prefix = codes >> (3 * (depth - level))
+            starts = np.flatnonzero(np.r_[True, prefix[1:] != prefix[:-1]])
+            counts = np.diff(np.r_[starts, len(prefix)])
+            mass = np.add.reduceat(q, starts)
+            center = np.add.reduceat(weighted, starts, axis=0) / mass[:, None]
+            self.levels.append({
+                'keys': prefix[starts], 'counts': counts, 'mass': mass,
+                'center': center, 'size': span / (1 << level),
+            })
+            if counts.max() == 1:
+                break
+
+        for upper, lower in zip(self.levels, self.levels[1:]):
+            parents = lower['keys'] >> 3
+            upper['first'] = np.searchsorted(parents, upper['keys'], side='left')
+            upper['last'] = np.searchsorted(parents, upper['keys'], side='right')
+
+    def forces(self, positions, charges, theta=THETA, softening=SOFTENING):
+        """
+        Soma de q_i q_j (x_i - x_j) / (d² + s²)^(3/2) sobre os outros nós j,
+        aproximada pelas células distantes (tamanho < θ × distância)
+        """
+        n = len(positions)
+        total = np.zeros((n, 3))
+        bodies = np.arange(n)
+        cells = np.zeros(n, dtype=np.int64)
+        last_level = len(self.levels) - 1
+
+        for level, cell in enumerate(self.levels):
+            if not len(bodies):
+                break
+            shift = 3 * (self.depth - level)
+            contains = (self.codes[bodies] >> shift) == cell['keys'][cells]
+            leaf = (cell['counts'][cells] == 1) | (level == last_level)
+            mass = cell['mass'][cells]
+            center = cell['center'][cells]
+
+            # Nós coincidentes no último nível: tira a própria carga da célula
+            shared = leaf & contains & (cell['counts'][cells] > 1)
+            if shared.any():
+                own = charges[bodies[shared]]
+                rest = mass[shared] - own
+                center[shared] = (center[shared] * mass[shared, None]
+                                  - positions[bodies[shared]] * own[:, None]) / rest[:, None]
+                mass[shared] = rest
+
+            delta = positions[bodies] - center
+            d2 = np.einsum('ij,ij->i', delta, delta) + softening ** 2
+            far = ~contains & (cell['size'] ** 2 < theta ** 2 * d2)
+            accept = far | (leaf & ~contains) | shared
+            if accept.any():
+                b = bodies[accept]
+                scale = charges[b] * mass[accept] / d2[accept] ** 1.5
+                for axis in range(3):
+                    total[:, axis] += np.bincount(b, weights=delta[accept, axis] * scale, minlength=n)
+
+            # Células próximas (ou que contêm o nó) descem para os filhos
+            descend = ~accept & ~leaf
+            if level == last_level or not descend.any():
+                break
+            first = cell['first'][cells[descend]]
+            counts = cell['last'][cells[descend]] - first
+            bodies = np.repeat(bodies[descend], counts)
+            offsets = np.repeat(first - (np.cumsum(counts) - counts), counts)
+            cells = np.arange(len(bodies)) + offsets
+        return total
+
+
+def repulsion(positions, charges, theta=THETA):
+    """Forças de repulsão de todos os nós por Barnes-Hut"""
+    return Octree(positions, charges).forces(positions, charges, theta)
+
+
+def spring_forces(positions, eu, ev, weights, rest=REST_LENGTH):
+    """Molas de Hooke nas arestas u–v: w × (d - repouso), puxando os dois lados"""
+    delta = positions[ev] - positions[eu]
+    length = np.sqrt(np.einsum('ij,ij->i', delta, delta))
+    pull = weights * (length - rest) / np.maximum(length, 1e-9)
+    total = np.zeros_like(positions)
+    n = len(positions)
+    for axis in range(3):
+        f = delta[:, axis] * pull
+        total[:, axis] += np.bincount(eu, weights=f, minlength=n) - np.bincount(ev, weights=f, minlength=n)
+    return total
+
+
+def same_group_degree(csr, groups):
+    """Vizinhos (conceitos) no mesmo grupo de cada conceito"""
+    n = csr.n_concepts
+    rows = np.repeat(np.arange(csr.n, dtype=np.int64), csr.degree())
+    cols = csr.und_indices.astype(np.int64)
+    inside = (rows < n) & (cols < n)
+    rows, cols = rows[inside], cols[inside]
+    return np.bincount(rows[groups[rows] == groups[cols]], minlength=n)
+
+
+def initial_positions(csr, rng, radius=RADIUS, groups=None):
+    """
+    Clusters por camada como em `createNodes()` do frontend: centros na
+    esfera de Fibonacci, nós numa esfera menor ao redor de cada centro.
+    `groups` (código por conceito, ex. comunidade) substitui as camadas
+    """
+    n = csr.n_concepts
+    if groups is None:
+        codes = csr.layer_codes[:n].astype(np.int64)
+        grouped = same_layer_degree(csr)[:n]
+    else:
+        codes = np.asarray(groups, dtype=np.int64)
+        grouped = same_group_degree(csr, codes)
+    layers = np.unique(codes)  # Ordem de 1ª aparição = ordem dos códigos
+    golden = (1 + np.sqrt(5)) / 2
+    golden_angle = 2 * np.pi / golden ** 2
+    internal = np.bincount(codes - codes.min(), weights=grouped,
+                           minlength=len(layers)) if n else np.zeros(0)
+
+    positions = np.zeros((n, 3))
+    for idx, code in enumerate(layers):
+        members = np.flatnonzero(codes == code)
+        size = len(members)
+        i = idx + 0.5
+        phi = np.arccos(1 - 2 * i / len(layers))
+        theta = 2 * np.pi * i / golden
+        center = np.array([np.sin(phi) * np.cos(theta), np.sin(phi) * np.sin(theta), np.cos(phi)])
+
+        slot = code - codes.min()
+        density = internal[slot] / (size * (size - 1)) if size > 1 else 0.0
+        factor = 1.0 / (0.5 + density) if density > 0 else 1.0
+        cluster_radius = max(0.3, np.cbrt(size / n) * 0.85 * factor)
+
+        t = np.arange(size) / max(1, size - 1)
+        jitter = (rng.random(size) - 0.5) * 0.05
+        local_phi = np.arccos(np.clip(1 - 2 * (t + jitter), -1, 1))
+        local_theta = golden_angle * np.arange(size)
+        r = cluster_radius * (0.7 + rng.random(size) * 0.3)
+        local = np.stack([r * np.sin(local_phi) * np.cos(local_theta),
+                          r * np.sin(local_phi) * np.sin(local_theta),
+                          r * np.cos(local_phi)], axis=1)
+        positions[members] = (center + local) * radius
+
+    # 60% de aderência à esfera, 40% de profundidade livre
+    length = np.linalg.norm(positions, axis=1, keepdims=True)
+    length[length < 1e-3] = 1.0
+    return positions / length * radius * SPHERE_BLEND + positions * (1 - SPHERE_BLEND)
+
+
+def spectral_positions(csr, vectors, rng, radius=RADIUS):
+    """
+    Posição inicial pelo embedding espectral: direção dos 3 primeiros eixos
+    na esfera, com um leve ruído para separar nós coincidentes. Nós sem
+    direção (isolados) ficam na posição por camada
+    """
+    n = csr.n_concepts
+    positions = initial_positions(csr, rng, radius)
+    direction = np.asarray(vectors, dtype=np.float64)[:n, :3]
+    norms = np.linalg.norm(direction, axis=1)
+    known = norms > 0
+    positions[known] = direction[known] / norms[known, None] * radius
+    positions[known] += rng.normal(scale=1.0, size=(int(known.sum()), 3))
+    return positions
+
+
+def compute_layout(csr, iterations=ITERATIONS, seed=0, theta=THETA, radius=RADIUS,
+                   vectors=None, groups=None):
+    """
+    Posições (n_conceitos × 3) dos conceitos do CSR, na ordem de `csr.ids`
+
+    Parte do embedding espectral se `vectors` (n × ≥3, de `embedding.py`)
+    for dado, senão dos clusters por `groups` (código por conceito, como
+    as comunidades de `community_groups()`) ou por camada. Cada passo soma repulsão
+    (Barnes-Hut), molas e move os nós no máximo MAX_STEP × e^(-1.5t); depois
+    reprojeta cada nó no seu raio fixo
+    """
+    rng = np.random.default_rng(seed)
+    n = csr.n_concepts
+    if vectors is None:
+        positions = initial_positions(csr, rng, radius, groups)
+    else:
+        positions = spectral_positions(csr, vectors, rng, radius)
+    if n < 2:
+        return positions
+
+    degree = csr.degree()[:n].astype(np.float64)
+    spread = degree.max() - degree.min()
+    charges = 1.0 + ((degree - degree.min()) / spread if spread else np.full(n, 0.5))
+
+    eu, ev = csr.undirected_edges()
+    weights = undirected_weights(csr)
+    inside = (eu < n) & (ev < n)
+    eu, ev = eu[inside].astype(np.int64), ev[inside].astype(np.int64)
+    weights = weights[inside] * SPRING
+
+    targets = radius * (1 + (rng.random(n) - 0.5) * RADIAL_SPREAD)
+    for step in range(iterations):
+        t = step / max(1, iterations - 1)
+        limit = MAX_STEP * np.exp(-1.5 * t)
+        force = REPULSION * repulsion(positions, charges, theta) + spring_forces(positions, eu, ev, weights)
+        size = np.linalg.norm(force, axis=1, keepdims=True)
+        positions += force * np.minimum(1.0, limit / np.maximum(size, 1e-9))
+
+        length = np.linalg.norm(positions, axis=1)
+        length[length < 1e-9] = 1.0
+        positions *= (targets / length)[:, None]
+    return positions
+
+
+def community_groups(csr, membership):
+    """
+    Código de grupo por conceito a partir de `communities.membership` do
+    cluster_metadata.json ({id: comunidade}); conceitos sem comunidade
+    ficam num grupo próprio, depois das demais
+    """
+    missing = max(membership.values(), default=-1) + 1
+    return np.array([membership.get(cid, missing) for cid in csr.ids[:csr.n_concepts]],
+                    dtype=np.int64)
+
+
+def save_layout(path, ids, positions, info):
+    """
+    Grava o layout compacto: {version, ..., ids, positions} com as posições
+    num único vetor [x0, y0, z0, x1, ...] arredondado a 0.1
+    """
+    data = {'version': LAYOUT_VERSION, **info, 'ids': list(ids),
+            'positions': [round(float(v), 1) for v in np.asarray(positions).ravel()]}
+    tmp = path.with_name(f'{path.name}.{os.getpid()}.tmp')
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+    tmp.replace(path)
+
+
+def read_layout_info(path):
+    """Cabeçalho de um layout salvo (sem versão, ids e posições) ou None"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if data.get('version') != LAYOUT_VERSION:
+        return None
+    return {k: v for k, v in data.items() if k not in ('version', 'ids', 'positions')}
@@ -0,0 +1,186 @@
+"""
+Predição de links do grafo da ontologia CRIOS
+Scores clássicos de vizinhança para todos os pares a 2 passos de uma vez,
+combinados com a compatibilidade entre camadas, no lugar de comparar cada
+conceito com todos os outros
+
+- Vizinhos comuns, Jaccard, Adamic-Adar, alocação de recursos e ligação
+  preferencial, de A·W·A (W diagonal pelo grau do intermediário), calculado
+  expandindo os caminhos u–w–v em arrays, em blocos de fontes
+- `layer_compatibility()`: fator por par de camadas a partir de
+  LAYER_ADJACENCY (subcamadas como 'politica-0' usam a camada base)
+- `top_candidates()`: k melhores alvos de cada fonte; `candidate_stream()`
+  junta as listas num único fluxo decrescente por heap
+
+Requer NumPy (`pip install numpy`)
+"""
+
+import heapq
+import re
+
+import numpy as np
+
+from .csr import NO_LAYER, expand
+
+# Camadas adjacentes lógicas
+LAYER_ADJACENCY = {
+    'fundacional': ['ontologica', 'temporal'],
+    'ontologica': ['fundacional', 'epistemica', 'ecologica'],
+    'epistemica': ['ontologica', 'politica', 'etica'],
+    'politica': ['epistemica', 'pratica', 'etica'],
+    'etica': ['epistemica', 'politica', 'pratica'],
+    'temporal': ['fundacional', 'ontologica', 'pratica'],
+    'ecologica': ['ontologica', 'pratica', 'etica'],
+    'pratica': ['politica', 'etica', 'temporal', 'ecologica'],
+}
+
+# Fator de camada: mesma (sub)camada, mesma base ou adjacente, outras
+SAME_LAYER = 2.0
+ADJACENT_LAYER = 1.0
+OTHER_LAYER = 0.5
+
+SCORES = ('common_neighbors', 'jaccard', 'adamic_adar', 'resource_allocation',
+          'preferential_attachment')
+DEFAULT_SCORE = 'resource_allocation'
+
+# Caminhos u–w–v expandidos por bloco de fontes (memória ~ 40 bytes cada)
+MAX_PATHS = 2_000_000
+
+_SUBLAYER = re.compile(r'-\d+$')
+
+
+def base_layer(layer):
+    """Camada base de uma subcamada ('politica-0' → 'politica')"""
+    return _SUBLAYER.sub('', layer or '')
+
+
+def layer_factor(layer, other):
+    """Fator de compatibilidade entre duas camadas"""
+    if layer == other:
+        return SAME_LAYER
+    base, other_base = base_layer(layer), base_layer(other)
+    if base == other_base or other_base in LAYER_ADJACENCY.get(base, []):
+        return ADJACENT_LAYER
+    return OTHER_LAYER
+
+
+def layer_compatibility(csr):
+    """Matriz camadas × camadas de fatores, indexada por csr.layer_codes"""
+    layers = csr.layers
+    return np.array([[layer_factor(a, b) for b in layers] for a in layers]).reshape(
+        len(layers), len(layers))
+
+
+def _blocks(offsets, indices, sources):
+    """Divide as fontes em blocos de no máximo MAX_PATHS caminhos de 2 passos"""
+    degree = np.diff(offsets)
+    rows = np.repeat(np.arange(len(degree)), degree)
+    paths = np.bincount(rows, weights=degree[indices], minlength=len(degree))[sources]
+    cuts = np.searchsorted(np.cumsum(paths), np.arange(MAX_PATHS, paths.sum() + MAX_PATHS, MAX_PATHS),
+                           side='right')
+    start = 0
+    for cut in cuts:
+        cut = max(cut, start + 1)
+        if start >= len(sources):
+            break
+        yield sources[start:cut]
+        start = cut
+
+
+def two_hop_scores(csr, sources=None):
+    """
+    Scores de todos os pares (u, v) a exatamente 2 passos, com u nas fontes
+    e v um conceito ainda não ligado a u; gera um dict de arrays por bloco:
+    source, target, os SCORES e `layer` (fator de camada)
+    """
+    n = csr.n
+    offsets = np.asarray(csr.und_offsets, dtype=np.int64)
+    indices = np.asarray(csr.und_indices, dtype=np.int64)
+    edge_keys = np.asarray(csr.edge_keys, dtype=np.int64)
+    degree = np.diff(offsets)
+    compatibility = layer_compatibility(csr)
+    codes = csr.layer_codes.astype(np.int64)
+    if sources is None:
+        sources = np.arange(csr.n_concepts)
+    sources = np.asarray(sources, dtype=np.int64)
+    if not len(edge_keys):
+        return
+
+    for block in _blocks(offsets, indices, sources):
+        counts, middle = expand(offsets, indices, block)
+        owner = np.repeat(np.arange(len(block)), counts)
+        counts, target = expand(offsets, indices, middle)
+        hop = np.repeat(np.arange(len(middle)), counts)
+        source = block[owner[hop]]
+        middle = middle[hop]
+        keep = (target != source) & (target < csr.n_concepts)
+        source, middle, target = source[keep], middle[keep], target[keep]
+
+        keys, inverse = np.unique(source * n + target, return_inverse=True)
+        u, v = keys // n, keys % n
+        linked = np.isin(np.minimum(u, v) * n + np.maximum(u, v), edge_keys)
+        inverse = inverse.reshape(-1)
+        inside = np.bincount(inverse, minlength=len(keys)).astype(np.float64)
+        adamic = np.bincount(inverse, weights=1.0 / np.log(degree[middle]), minlength=len(keys))
+        resource = np.bincount(inverse, weights=1.0 / degree[middle], minlength=len(keys))
+
+        new = ~linked
+        u, v = u[new], v[new]
+        common = inside[new]
+        factor = np.full(len(u), OTHER_LAYER)
+        known = (codes[u] != NO_LAYER) & (codes[v] != NO_LAYER)
+        factor[known] = compatibility[codes[u][known], codes[v][known]]
+        yield {
+            'source': u,
+            'target': v,
+            'common_neighbors': common,
+            'jaccard': common / (degree[u] + degree[v] - common),
+            'adamic_adar': adamic[new],
+            'resource_allocation': resource[new],
+            'preferential_attachment': (degree[u] * degree[v]).astype(np.float64),
+            'layer': factor,
+        }
+
+
+def top_candidates(csr, k=10, by=DEFAULT_SCORE, sources=None):
+    """
+    {fonte: [(score, alvo), ...]} com os k melhores alvos de cada fonte,
+    score = SCORES[by] × fator de camada, em ordem decrescente (empate: menor alvo)
+    """
+    if by not in SCORES:
+        raise ValueError(f"Score desconhecido: {by} (use {', '.join(SCORES)})")
+    result = {}
+    for block in two_hop_scores(csr, sources):
+        u, v = block['source'], block['target']
+        combined = block[by] * block['layer']
+        order = np.lexsort((v, -combined, u))
+        u, v, combined = u[order], v[order], combined[order]
+        first = np.searchsorted(u, u, side='left')
+        keep = np.arange(len(u)) - first < k
+        for source, target, score in zip(u[keep].tolist(), v[keep].tolist(), combined[keep].tolist()):
+            result.setdefault(source, []).append((score, target))
+    return result
+
+
+def candidate_stream(candidates):
+    """
+    Fluxo único de (score, u, v) em ordem decrescente de score, juntando as
+    listas de `top_candidates()` por heap; cada par não-ordenado sai uma vez
+    """
+    lists = [[(-score, source, target) for score, target in ranked]
+             for source, ranked in candidates.items()]
+    seen = set()
+    for negative, source, target in heapq.merge(*lists):
+        pair = (min(source, target), max(source, target))
+        if pair in seen:
+            continue
+        seen.add(pair)
+        yield -negative, source, target
+
+
+def candidates_by_id(csr, ids, k=10, by=DEFAULT_SCORE):
+    """top_candidates() para conceitos dados por ID: {id: [(score, id alvo), ...]}"""
+    sources = [csr.index[cid] for cid in ids if cid in csr.index]
+    top = top_candidates(csr, k, by, np.asarray(sources, dtype=np.int64))
+    return {csr.ids[source]: [(score, csr.ids[target]) for score, target in ranked]
+            for source, ranked in top.items()}
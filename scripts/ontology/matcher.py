@@ -0,0 +1,162 @@
+"""
+Busca de muitos nomes de uma vez num texto (autômato de Aho-Corasick)
+Todos os padrões (nomes de conceitos, autores, ...) são compilados num único
+autômato, que percorre o texto uma vez só: o custo cresce com o tamanho do
+texto, não com tamanho × número de padrões
+
+- padrões e texto comparados depois de `text.fold()` (sem acentos, minúsculas)
+- só valem ocorrências com fronteira de palavra dos dois lados (como `\\b`)
+- entre ocorrências sobrepostas do mesmo tipo vale a mais à esquerda e, nela,
+  a mais longa ('memória coletiva' não conta também como 'memória')
+- `load_matcher(patterns)` guarda o autômato em
+  `assets/.snapshot/matcher-v<N>-<hash>.json`, indexado pelo hash da lista de
+  padrões
+"""
+
+import hashlib
+import json
+import os
+from collections import Counter, deque
+
+from .io import ASSETS_DIR
+from .text import fold
+
+MATCHER_VERSION = 1
+
+CACHE_DIR = ASSETS_DIR / '.snapshot'
+
+
+def _is_word(ch):
+    return ch.isalnum() or ch == '_'
+
+
+class Matcher:
+    """
+    Autômato de Aho-Corasick sobre padrões {texto: [rótulo, ...]}
+
+    Um rótulo é um par (tipo, valor), p.ex. ('concept', 'vazio') ou
+    ('author', 'Karen Barad'); a regra da mais longa vale dentro de cada tipo
+    """
+
+    def __init__(self, patterns=None, arrays=None):
+        if arrays is not None:
+            self.goto, self.fail, self.outputs, self.labels = arrays
+            self.goto = [dict(edges) for edges in self.goto]
+            return
+
+        self.goto = [{}]
+        self.labels = []      # por padrão: (tamanho, [rótulos])
+        terminal = [None]
+        for pattern, labels in sorted(patterns.items()):
+            key = fold(pattern)
+            if not key:
+                continue
+            state = 0
+            for ch in key:
+                nxt = self.goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto[state][ch] = nxt
+                    self.goto.append({})
+                    terminal.append(None)
+                state = nxt
+            if terminal[state] is None:
+                terminal[state] = len(self.labels)
+                self.labels.append((len(key), []))
+            self.labels[terminal[state]][1].extend(list(label) for label in labels)
+
+        # Links de falha em largura; `outputs` junta os padrões da cadeia
+        self.fail = [0] * len(self.goto)
+        self.outputs = [[] if t is None else [t] for t in terminal]
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self.goto[state].items():
+                queue.append(nxt)
+                if state:
+                    back = self.fail[state]
+                    while back and ch not in self.goto[back]:
+                        back = self.fail[back]
+                    self.fail[nxt] = self.goto[back].get(ch, 0)
+                self.outputs[nxt] = self.outputs[nxt] + self.outputs[self.fail[nxt]]
+
+    def arrays(self):
+        """Estrutura serializável (para o cache em JSON)"""
+        return [list(edges.items()) for edges in self.goto], self.fail, self.outputs, self.labels
+
+    def matches(self, text):
+        """
+        [(início, fim, rótulo), ...] das ocorrências com fronteira de palavra,
+        sem sobreposição dentro de cada tipo (mais à esquerda, depois mais longa)
+        """
+        text = fold(text)
+        goto, fail, outputs, labels = self.goto, self.fail, self.outputs, self.labels
+        found = []
+        state = 0
+        for end, ch in enumerate(text, 1):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if not outputs[state]:
+                continue
+            if end < len(text) and _is_word(text[end]):
+                continue
+            for pattern in outputs[state]:
+                size, pattern_labels = labels[pattern]
+                start = end - size
+                if start > 0 and _is_word(text[start - 1]):
+                    continue
+                for kind, value in pattern_labels:
+                    found.append((start, end, kind, value))
+
+        found.sort(key=lambda m: (m[2], m[0], -m[1]))
+        result = []
+        last_kind, last_end = None, 0
+        for start, end, kind, value in found:
+            if kind != last_kind:
+                last_kind, last_end = kind, 0
+            elif start < last_end:
+                # Mesmo trecho com vários rótulos do mesmo tamanho: todos contam
+                if result[-1][:2] == (start, end):
+                    result.append((start, end, (kind, value)))
+                continue
+            result.append((start, end, (kind, value)))
+            last_end = end
+        result.sort(key=lambda m: (m[0], m[1]))
+        return result
+
+    def count(self, text):
+        """Counter {(tipo, valor): ocorrências}"""
+        return Counter(label for _, _, label in self.matches(text))
+
+
+def patterns_hash(patterns):
+    """Hash estável da lista de padrões e rótulos"""
+    canonical = json.dumps(sorted((p, sorted(map(list, labels))) for p, labels in patterns.items()),
+                           ensure_ascii=False)
+    return hashlib.sha1(canonical.encode('utf-8')).hexdigest()[:16]
+
+
+def load_matcher(patterns, cache_dir=CACHE_DIR):
+    """Matcher dos padrões, lido do cache se a lista de padrões for a mesma"""
+    path = cache_dir / f'matcher-v{MATCHER_VERSION}-{patterns_hash(patterns)}.json'
+    try:
+        with open(path, encoding='utf-8') as f:
+            goto, fail, outputs, labels = json.load(f)
+        return Matcher(arrays=(goto, fail, outputs, labels))
+    except (OSError, ValueError):
+        pass
+
+    matcher = Matcher(patterns)
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        # Só o autômato da lista atual fica em disco
+        for old in cache_dir.glob('matcher-v*.json'):
+            old.unlink()
+        tmp = path.with_name(f'{path.stem}.{os.getpid()}.tmp')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(matcher.arrays(), f, ensure_ascii=False, separators=(',', ':'))
+        tmp.replace(path)
+    except OSError:
+        pass
+    return matcher
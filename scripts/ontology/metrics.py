@@ -0,0 +1,86 @@
+"""
+Métricas estruturais locais do grafo da ontologia CRIOS
+Triângulos, coeficiente de agrupamento e grau por camada de todos os nós
+numa única passada vetorizada sobre o CSRGraph (sem laços por par de vizinhos)
+
+Laços (relação de um conceito consigo mesmo) não contam, como na adjacência
+não-direcionada do CSR
+
+Requer NumPy (`pip install numpy`)
+"""
+
+import numpy as np
+
+from .csr import NO_LAYER
+
+
+def layer_degrees(csr):
+    """
+    Matriz n × camadas: quantos vizinhos de cada nó estão em cada camada
+    (vizinhos sem conceito/camada não entram)
+    """
+    n_layers = len(csr.layers)
+    rows = np.repeat(np.arange(csr.n, dtype=np.int64), csr.degree())
+    codes = csr.layer_codes[csr.und_indices].astype(np.int64)
+    known = codes != NO_LAYER
+    flat = np.bincount(rows[known] * n_layers + codes[known], minlength=csr.n * n_layers)
+    return flat.reshape(csr.n, n_layers)
+
+
+def same_layer_degree(csr, by_layer=None):
+    """Vizinhos na mesma camada do próprio nó (0 para nós sem camada)"""
+    if by_layer is None:
+        by_layer = layer_degrees(csr)
+    codes = csr.layer_codes.astype(np.int64)
+    result = np.zeros(csr.n, dtype=np.int64)
+    known = codes != NO_LAYER
+    result[known] = by_layer[np.flatnonzero(known), codes[known]]
+    return result
+
+
+def concept_degree(csr):
+    """Vizinhos que são conceitos (exclui IDs citados só nas relações)"""
+    rows = np.repeat(np.arange(csr.n, dtype=np.int64), csr.degree())
+    is_concept = csr.und_indices < csr.n_concepts
+    return np.bincount(rows[is_concept], minlength=csr.n)
+
+
+def local_clustering(csr, triangles=None):
+    """Coeficiente de agrupamento local 2T / k(k-1) (0 para grau < 2)"""
+    if triangles is None:
+        triangles = csr.triangles()
+    degree = csr.degree().astype(np.int64)
+    pairs = degree * (degree - 1)
+    coefficients = np.zeros(csr.n, dtype=np.float64)
+    np.divide(2 * triangles, pairs, out=coefficients, where=pairs > 0)
+    return coefficients
+
+
+def average_clustering(csr, coefficients=None):
+    """Média dos coeficientes locais sobre todos os nós"""
+    if coefficients is None:
+        coefficients = local_clustering(csr)
+    return float(coefficients.mean()) if len(coefficients) else 0.0
+
+
+def node_metrics(csr):
+    """
+    Todas as métricas locais de uma vez (arrays indexados pelo nó do CSR)
+
+    - `degree`: vizinhos distintos
+    - `triangles`: triângulos que passam pelo nó
+    - `clustering`: coeficiente de agrupamento local
+    - `by_layer`: matriz n × camadas de vizinhos por camada
+    - `same_layer_degree`: vizinhos na camada do próprio nó
+    - `concept_degree`: vizinhos que são conceitos
+    """
+    triangles = csr.triangles()
+    by_layer = layer_degrees(csr)
+    return {
+        'degree': csr.degree().astype(np.int64),
+        'triangles': triangles,
+        'clustering': local_clustering(csr, triangles),
+        'by_layer': by_layer,
+        'same_layer_degree': same_layer_degree(csr, by_layer),
+        'concept_degree': concept_degree(csr),
+    }
@@ -0,0 +1,222 @@
+"""
+Embeddings por passeios aleatórios (DeepWalk / node2vec) do grafo CRIOS
+Conceitos que aparecem perto uns dos outros em passeios pelo grafo ganham
+vetores próximos; a proximidade vale como afinidade estrutural além dos
+"amigos de amigos"
+
+- `random_walks()`: passeios enviesados do node2vec (retorno 1/p, afastamento
+  1/q) por amostragem com rejeição, todos os passeios de um bloco avançando
+  juntos em arrays. Os blocos têm tamanho fixo e semente própria derivada do
+  `seed`, então o resultado não depende de quantos processos rodam
+- `train_skipgram()`: skip-gram com amostragem negativa em lotes, NumPy puro
+  (negativos compartilhados no lote viram produtos de matrizes)
+- `load_node2vec(snapshot)` guarda vetores + floresta de vizinhos aproximados
+  (`embedding.ProjectionForest`) ao lado do snapshot binário
+
+Requer NumPy (`pip install numpy`)
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .embedding import ProjectionForest, unit_rows
+
+NODE2VEC_VERSION = 1
+
+DIMENSIONS = 32
+WALKS_PER_NODE = 10
+WALK_LENGTH = 40
+RETURN_P = 1.0
+INOUT_Q = 0.5
+WINDOW = 5
+NEGATIVES = 5
+EPOCHS = 2
+LEARNING_RATE = 0.025
+BATCH_SIZE = 4096
+SHARED_NEGATIVES = 64     # Negativos sorteados por lote (comuns a todos os pares)
+
+# Passeios por bloco (unidade de semente e de trabalho dos processos)
+WALK_CHUNK = 2048
+
+
+def walk_chunk(offsets, indices, edge_keys, starts, length, p, q, seed):
+    """
+    Passeios de um bloco (len(starts) × length), começando em `starts`
+
+    A partir do 2º passo, um vizinho x do nó atual é sorteado uniformemente
+    e aceito com peso relativo 1/p (x é o nó anterior), 1 (x é vizinho do
+    anterior) ou 1/q (x se afasta); os recusados sorteiam de novo
+    """
+    rng = np.random.default_rng(seed)
+    n = len(offsets) - 1
+    walks = np.empty((len(starts), length), dtype=np.int64)
+    walks[:, 0] = starts
+    if length == 1:
+        return walks
+    degree = offsets[1:] - offsets[:-1]
+
+    def sample(nodes):
+        return indices[offsets[nodes] + (rng.random(len(nodes)) * degree[nodes]).astype(np.int64)]
+
+    walks[:, 1] = sample(starts)
+    top = max(1.0 / p, 1.0, 1.0 / q)
+    for step in range(2, length):
+        current, previous = walks[:, step - 1], walks[:, step - 2]
+        pending = np.arange(len(starts))
+        while len(pending):
+            here, back = current[pending], previous[pending]
+            proposal = sample(here)
+            keys = np.minimum(proposal, back) * n + np.maximum(proposal, back)
+            slot = np.minimum(np.searchsorted(edge_keys, keys), len(edge_keys) - 1)
+            linked = edge_keys[slot] == keys
+            weight = np.where(proposal == back, 1.0 / p, np.where(linked, 1.0, 1.0 / q))
+            accepted = rng.random(len(pending)) * top < weight
+            walks[pending[accepted], step] = proposal[accepted]
+            pending = pending[~accepted]
+    return walks
+
+
+_worker_graph = None
+
+
+def _init_worker(offsets, indices, edge_keys):
+    global _worker_graph
+    _worker_graph = (offsets, indices, edge_keys)
+
+
+def _walk_chunk(task):
+    starts, length, p, q, seed = task
+    return walk_chunk(*_worker_graph, starts, length, p, q, seed)
+
+
+def random_walks(csr, walks_per_node=WALKS_PER_NODE, length=WALK_LENGTH, p=RETURN_P,
+                 q=INOUT_Q, seed=0, jobs=None):
+    """
+    `walks_per_node` passeios de cada nó com vizinhos (ordem embaralhada por
+    rodada), como matriz passeios × length. `jobs=None` usa um processo por
+    núcleo quando há mais de um bloco
+    """
+    offsets = np.asarray(csr.und_offsets, dtype=np.int64)
+    indices = np.asarray(csr.und_indices, dtype=np.int64)
+    edge_keys = np.asarray(csr.edge_keys, dtype=np.int64)
+    nodes = np.flatnonzero(np.diff(offsets) > 0)
+    if not len(nodes) or not len(edge_keys):
+        return np.zeros((0, length), dtype=np.int64)
+
+    sequence = np.random.SeedSequence(seed)
+    rng = np.random.default_rng(sequence)
+    starts = np.concatenate([rng.permutation(nodes) for _ in range(walks_per_node)])
+    chunks = [starts[i:i + WALK_CHUNK] for i in range(0, len(starts), WALK_CHUNK)]
+    seeds = sequence.spawn(len(chunks))
+    tasks = [(chunk, length, p, q, child) for chunk, child in zip(chunks, seeds)]
+    if jobs is None:
+        jobs = os.cpu_count() or 1
+
+    if jobs <= 1 or len(tasks) <= 1:
+        return np.concatenate([walk_chunk(offsets, indices, edge_keys, *task) for task in tasks])
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                             initargs=(offsets, indices, edge_keys)) as pool:
+        return np.concatenate(list(pool.map(_walk_chunk, tasks)))
+
+
+def context_pairs(walks, window=WINDOW):
+    """Pares (centro, contexto) a até `window` passos, nos dois sentidos"""
+    centers, contexts = [], []
+    for offset in range(1, min(window, walks.shape[1] - 1) + 1):
+        left, right = walks[:, :-offset].ravel(), walks[:, offset:].ravel()
+        centers += [left, right]
+        contexts += [right, left]
+    if not centers:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    return np.concatenate(centers), np.concatenate(contexts)
+
+
+def _sigmoid(x):
+    return 1.0 / (1.0 + np.exp(-np.clip(x, -30, 30)))
+
+
+def _scatter_add(matrix, rows, values):
+    """matrix[rows] += values somando linhas repetidas (bincount plano)"""
+    n, dim = matrix.shape
+    flat = (rows[:, None] * dim + np.arange(dim)).ravel()
+    matrix += np.bincount(flat, weights=values.ravel(), minlength=n * dim).reshape(n, dim)
+
+
+def train_skipgram(walks, n, dimensions=DIMENSIONS, window=WINDOW, negatives=NEGATIVES,
+                   epochs=EPOCHS, learning_rate=LEARNING_RATE, batch_size=BATCH_SIZE, seed=0):
+    """
+    Vetores (n × dimensions) do skip-gram com amostragem negativa
+
+    Os negativos de cada lote são compartilhados: SHARED_NEGATIVES nós
+    sorteados ∝ frequência^0.75, contra os quais todos os centros do lote
+    são comparados num único produto de matrizes (peso negatives/amostras,
+    o mesmo gradiente esperado de `negatives` sorteios por par). A taxa de
+    aprendizado cai linearmente até ~0. Nós fora dos passeios ficam com o
+    vetor inicial
+    """
+    rng = np.random.default_rng(seed)
+    vectors = (rng.random((n, dimensions)) - 0.5) / dimensions
+    contexts_out = np.zeros((n, dimensions))
+    centers, contexts = context_pairs(walks, window)
+    if not len(centers):
+        return vectors
+
+    frequency = np.bincount(walks.ravel(), minlength=n) ** 0.75
+    noise_weights = frequency / frequency.sum()
+    shared = min(SHARED_NEGATIVES, n)
+    scale = negatives / shared
+    total = epochs * len(centers)
+    seen = 0
+    for _ in range(epochs):
+        order = rng.permutation(len(centers))
+        for start in range(0, len(order), batch_size):
+            batch = order[start:start + batch_size]
+            c, o = centers[batch], contexts[batch]
+            noise = rng.choice(n, size=shared, p=noise_weights)
+            rate = learning_rate * max(1e-4, 1.0 - seen / total)
+            seen += len(batch)
+
+            v = vectors[c]
+            u_pos = contexts_out[o]
+            u_neg = contexts_out[noise]
+            g_pos = 1.0 - _sigmoid(np.einsum('ij,ij->i', v, u_pos))
+            g_neg = -scale * _sigmoid(v @ u_neg.T)
+
+            grad_v = g_pos[:, None] * u_pos + g_neg @ u_neg
+            _scatter_add(contexts_out, np.concatenate([o, noise]),
+                         rate * np.concatenate([g_pos[:, None] * v, g_neg.T @ v]))
+            _scatter_add(vectors, c, rate * grad_v)
+    return vectors
+
+
+def node2vec(csr, dimensions=DIMENSIONS, seed=0, jobs=None, **options):
+    """Passeios + skip-gram; `options` repassa p, q, length, window, ..."""
+    walk_options = {k: options.pop(k) for k in ('walks_per_node', 'length', 'p', 'q') if k in options}
+    walks = random_walks(csr, seed=seed, jobs=jobs, **walk_options)
+    return train_skipgram(walks, csr.n, dimensions, seed=seed, **options)
+
+
+def load_node2vec(snapshot=None, dimensions=DIMENSIONS, seed=0):
+    """
+    (vetores, ProjectionForest) do snapshot atual, calculados uma vez por
+    versão dos JSON (`<token>-node2vec-v<N>-d<dim>-s<seed>.npz`). A floresta
+    indexa os vetores normalizados: distância euclidiana ~ cosseno
+    """
+    if snapshot is None:
+        from .snapshot import load_snapshot
+        snapshot = load_snapshot()
+
+    def compute():
+        vectors = node2vec(snapshot.csr, dimensions, seed)
+        forest = ProjectionForest(unit_rows(vectors), seed=seed)
+        planes, thresholds, order, offsets = forest.arrays()
+        return {'vectors': vectors, 'planes': planes, 'thresholds': thresholds,
+                'order': order, 'offsets': offsets}
+
+    saved = snapshot.cached_arrays(
+        f'node2vec-v{NODE2VEC_VERSION}-d{dimensions}-s{seed}', compute)
+    vectors = saved['vectors']
+    arrays = tuple(saved[name] for name in ('planes', 'thresholds', 'order', 'offsets'))
+    return vectors, ProjectionForest(unit_rows(vectors), arrays=arrays)
@@ -0,0 +1,182 @@
+"""
+Rankings estruturais dos conceitos da ontologia CRIOS
+PageRank ponderado, centralidade de autovetor e k-core sobre o CSR, usados
+para escolher hubs e dimensionar os nós do rizoma
+
+- Pesos das arestas vêm da classe do verbo (fundação pesa mais que
+  "relaciona-se com"); relações repetidas entre o mesmo par somam
+- PageRank e autovetor por iteração de potência em arrays; k-core por
+  remoção em baldes (Batagelj–Zaversnik), O(n + E)
+- `load_rankings(snapshot)` guarda o resultado ao lado do snapshot binário,
+  então só é recalculado quando os JSON mudam
+
+Requer NumPy (`pip install numpy`)
+"""
+
+import re
+
+import numpy as np
+
+RANKINGS_VERSION = 1
+
+# (classe, peso, padrão no nome do verbo); vence a primeira que casar
+VERB_CLASSES = [
+    ('generica', 0.5, r'^(relaciona-se|conecta-se|vincula-se|liga-se|associa-se)'),
+    ('fundacao', 2.0, r'fundament|funda-se|constitu|sustent|ancora|apoia-se|origina|condiciona'
+                      r'|possibilita|torna possível|viabiliza|faculta|propicia|estrutura|compõe'),
+    ('tensao', 1.5, r'resist|question|problematiza|disputa|tensiona|critica|emancip|transforma'
+                    r'|liberta|mobiliza|radicaliza'),
+    ('articulacao', 1.0, r'articula|entrelaça|dialoga|converge|ressoa|tece|co-|compartilha|simbiosa'),
+]
+DEFAULT_CLASS = ('expressao', 1.0)
+
+RANKINGS = ('degree', 'pagerank', 'eigenvector', 'kcore')
+
+DAMPING = 0.85
+TOLERANCE = 1e-10
+MAX_ITERATIONS = 1000
+
+_PATTERNS = [(name, weight, re.compile(pattern)) for name, weight, pattern in VERB_CLASSES]
+
+
+def verb_class(verb):
+    """(classe, peso) de um verbo"""
+    for name, weight, pattern in _PATTERNS:
+        if pattern.search(verb):
+            return name, weight
+    return DEFAULT_CLASS
+
+
+def relation_weights(csr):
+    """Peso de cada relação (na ordem de csr.src/dst) pela classe do verbo"""
+    by_verb = np.array([verb_class(verb)[1] for verb in csr.verbs], dtype=np.float64)
+    return by_verb[csr.verb_codes] if len(by_verb) else np.zeros(0)
+
+
+def pagerank(csr, weights=None, damping=DAMPING):
+    """
+    PageRank ponderado sobre as relações dirigidas (from → to)
+    Nós sem saída distribuem seu valor uniformemente; soma 1
+    """
+    n = csr.n
+    src, dst = csr.src.astype(np.int64), csr.dst.astype(np.int64)
+    w = relation_weights(csr) if weights is None else np.asarray(weights, dtype=np.float64)
+    keep = src != dst
+    src, dst, w = src[keep], dst[keep], w[keep]
+    out_strength = np.bincount(src, weights=w, minlength=n)
+    dangling = out_strength == 0
+    share = w / out_strength[src]
+
+    x = np.full(n, 1.0 / n)
+    for _ in range(MAX_ITERATIONS):
+        spread = np.bincount(dst, weights=x[src] * share, minlength=n)
+        following = (1 - damping) / n + damping * (spread + x[dangling].sum() / n)
+        delta = np.abs(following - x).sum()
+        x = following
+        if delta < n * TOLERANCE:
+            break
+    return x
+
+
+def undirected_weights(csr, weights=None):
+    """Peso de cada aresta de csr.undirected_edges() (soma das relações do par)"""
+    w = relation_weights(csr) if weights is None else np.asarray(weights, dtype=np.float64)
+    src, dst = csr.src.astype(np.int64), csr.dst.astype(np.int64)
+    keep = src != dst
+    keys = np.minimum(src, dst)[keep] * csr.n + np.maximum(src, dst)[keep]
+    slots = np.searchsorted(csr.edge_keys, keys)
+    return np.bincount(slots, weights=w[keep], minlength=len(csr.edge_keys))
+
+
+def eigenvector(csr, weights=None):
+    """
+    Centralidade de autovetor da adjacência não-direcionada ponderada
+    Itera sobre A + I (mesmo autovetor, sem oscilar em grafos bipartidos);
+    norma euclidiana 1
+    """
+    n = csr.n
+    eu, ev = csr.undirected_edges()
+    eu, ev = eu.astype(np.int64), ev.astype(np.int64)
+    w = undirected_weights(csr, weights)
+    x = np.full(n, 1.0 / np.sqrt(n)) if n else np.zeros(0)
+    for _ in range(MAX_ITERATIONS):
+        following = x + np.bincount(eu, weights=w * x[ev], minlength=n) \
+                      + np.bincount(ev, weights=w * x[eu], minlength=n)
+        norm = np.linalg.norm(following)
+        if norm == 0:
+            break
+        following /= norm
+        delta = np.abs(following - x).sum()
+        x = following
+        if delta < n * TOLERANCE:
+            break
+    return x
+
+
+def core_numbers(csr):
+    """
+    Número de core de cada nó (maior k tal que o nó está no k-core)
+    Remoção em baldes por grau, sempre o de menor grau primeiro
+    """
+    n = csr.n
+    degree = csr.degree().astype(np.int64)
+    # Nós ordenados por grau, com o início de cada balde
+    order = np.argsort(degree, kind='stable')
+    starts = np.zeros(int(degree.max()) + 2 if n else 1, dtype=np.int64)
+    np.cumsum(np.bincount(degree, minlength=len(starts) - 1), out=starts[1:])
+
+    degree = degree.tolist()
+    order = order.tolist()
+    position = [0] * n
+    for i, node in enumerate(order):
+        position[node] = i
+    bucket = starts.tolist()
+    offsets = csr.und_offsets.tolist()
+    indices = csr.und_indices.tolist()
+
+    for i in range(n):
+        node = order[i]
+        for neighbor in indices[offsets[node]:offsets[node + 1]]:
+            k = degree[neighbor]
+            if k > degree[node]:
+                # Troca o vizinho com o primeiro do seu balde e encolhe o balde
+                first = bucket[k]
+                other = order[first]
+                if other != neighbor:
+                    spot = position[neighbor]
+                    order[first], order[spot] = neighbor, other
+                    position[neighbor], position[other] = first, spot
+                bucket[k] += 1
+                degree[neighbor] = k - 1
+    return np.asarray(degree, dtype=np.int64)
+
+
+def compute_rankings(csr):
+    """Todos os rankings (arrays indexados pelo nó do CSR)"""
+    return {
+        'degree': csr.degree().astype(np.int64),
+        'pagerank': pagerank(csr),
+        'eigenvector': eigenvector(csr),
+        'kcore': core_numbers(csr),
+    }
+
+
+def load_rankings(snapshot=None):
+    """
+    Rankings do snapshot atual, calculados uma vez por versão dos JSON
+    (arquivo `<token>-rankings-v<N>.npz` em assets/.snapshot/)
+    """
+    if snapshot is None:
+        from .snapshot import load_snapshot
+        snapshot = load_snapshot()
+    saved = snapshot.cached_arrays(f'rankings-v{RANKINGS_VERSION}',
+                                   lambda: compute_rankings(snapshot.csr))
+    return {name: saved[name] for name in RANKINGS}
+
+
+def ranked_nodes(rankings, by='pagerank'):
+    """Nós em ordem decrescente do ranking (empates por grau, depois índice)"""
+    if by not in RANKINGS:
+        raise ValueError(f"Ranking desconhecido: {by} (use {', '.join(RANKINGS)})")
+    n = len(rankings[by])
+    return np.lexsort((np.arange(n), -rankings['degree'], -rankings[by]))
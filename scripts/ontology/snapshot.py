@@ -0,0 +1,197 @@
+"""
+Snapshot binário do grafo da ontologia CRIOS
+Guarda a versão CSR do grafo (IDs internados, arrays, tabela de verbos e
+códigos de camada) em `assets/.snapshot/`, ao lado dos JSON. Os arrays são
+arquivos .npy abertos com memory-map, então a inicialização não depende mais
+do tamanho de relations.json
+
+O snapshot é indexado por tamanho/mtime/hash dos JSON de origem (e do
+journal de mudanças pendentes) e reconstruído automaticamente quando fica
+desatualizado
+
+Requer NumPy (`pip install numpy`)
+"""
+
+import json
+import os
+import uuid
+
+import numpy as np
+
+from .csr import ARRAY_FIELDS, CSRGraph
+from .graph import OntologyGraph
+from .io import ASSETS_DIR, CONCEPTS_FILE, RELATIONS_FILE, file_hash, file_key
+from .journal import JOURNAL_FILE
+
+SNAPSHOT_DIR = ASSETS_DIR / '.snapshot'
+SNAPSHOT_VERSION = 2
+
+META_FILE = 'meta.json'
+
+
+class Snapshot:
+    """
+    Grafo carregado do snapshot
+
+    - `csr`: CSRGraph com arrays somente-leitura (memory-map)
+    - `concepts`: linhas leves {id, name, layer} na ordem de concepts.json
+    - `token`: identifica esta versão; dados derivados guardados em
+      `directory` com o prefixo `<token>-` são apagados junto com ela
+    """
+
+    def __init__(self, csr, concepts, token=None, directory=SNAPSHOT_DIR):
+        self.csr = csr
+        self.concepts = concepts
+        self.token = token
+        self.directory = directory
+
+    def cached_arrays(self, name, compute):
+        """
+        Arrays derivados deste snapshot, calculados uma vez por versão dos
+        JSON: `compute()` retorna {nome: array}, guardado em
+        `<token>-<name>.npz` (o nome inclui versão e parâmetros do cálculo).
+        Sem token, só calcula
+        """
+        if self.token is None:
+            return compute()
+        path = self.directory / f'{self.token}-{name}.npz'
+        try:
+            with np.load(path) as saved:
+                return {key: saved[key] for key in saved.files}
+        except (OSError, KeyError, ValueError):
+            pass
+
+        arrays = compute()
+        tmp = path.with_name(f'{path.stem}.{os.getpid()}.tmp.npz')
+        np.savez(tmp, **arrays)
+        tmp.replace(path)
+        return arrays
+
+
+def _read_meta(snapshot_dir):
+    try:
+        with open(snapshot_dir / META_FILE, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if meta.get('version') != SNAPSHOT_VERSION:
+        return None
+    return meta
+
+
+def _write_meta(snapshot_dir, meta):
+    # Escrita atômica: leitores nunca veem meta.json pela metade
+    tmp = snapshot_dir / f'{META_FILE}.{os.getpid()}.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(meta, f, ensure_ascii=False)
+    os.replace(tmp, snapshot_dir / META_FILE)
+
+
+def _sources(concepts_file, relations_file, journal_file):
+    sources = {'concepts': concepts_file, 'relations': relations_file}
+    if journal_file is not None:
+        sources['journal'] = journal_file
+    return sources
+
+
+def is_fresh(meta, sources):
+    """
+    Verifica se o snapshot corresponde aos arquivos de origem
+
+    Tamanho + mtime iguais bastam; se só o mtime mudou (checkout, touch),
+    compara o hash do conteúdo. Retorna (fresco, precisa_regravar_meta).
+    """
+    if meta is None:
+        return False, False
+    if set(meta['sources']) != set(sources):
+        return False, False
+    touched = False
+    for name, path in sources.items():
+        saved = meta['sources'].get(name)
+        if saved is None:
+            return False, False
+        key = file_key(path)
+        if key['size'] != saved['size']:
+            return False, False
+        if key['mtime_ns'] != saved['mtime_ns']:
+            if file_hash(path) != saved['sha1']:
+                return False, False
+            saved['mtime_ns'] = key['mtime_ns']
+            touched = True
+    return True, touched
+
+
+def build_snapshot(concepts_file=CONCEPTS_FILE, relations_file=RELATIONS_FILE,
+                   snapshot_dir=SNAPSHOT_DIR, graph=None, journal_file=JOURNAL_FILE):
+    """Gera o snapshot a partir dos JSON (ou de um grafo já carregado)"""
+    sources = _sources(concepts_file, relations_file, journal_file)
+    # Chaves lidas antes do JSON: se o arquivo mudar durante a leitura, o
+    # snapshot nasce desatualizado e é refeito na próxima carga
+    keys = {name: dict(file_key(path), sha1=file_hash(path))
+            for name, path in sources.items()}
+
+    if graph is None:
+        graph = OntologyGraph.load(concepts_file, relations_file, journal_file)
+    csr = graph.to_csr()
+
+    snapshot_dir.mkdir(parents=True, exist_ok=True)
+    token = uuid.uuid4().hex[:12]
+    for field in ARRAY_FIELDS:
+        np.save(snapshot_dir / f'{token}-{field}.npy', getattr(csr, field))
+
+    concepts = []
+    for concept in graph.concepts:
+        row = {'id': concept['id'], 'name': concept['name']}
+        if 'layer' in concept:
+            row['layer'] = concept['layer']
+        concepts.append(row)
+
+    previous = _read_meta(snapshot_dir)
+    _write_meta(snapshot_dir, {
+        'version': SNAPSHOT_VERSION,
+        'token': token,
+        'sources': keys,
+        'n_concepts': csr.n_concepts,
+        'ids': csr.ids,
+        'layers': csr.layers,
+        'verbs': csr.verbs,
+        'concepts': concepts,
+    })
+
+    # Arquivos da versão anterior podem ser removidos (mmaps abertos continuam válidos)
+    if previous and previous.get('token') != token:
+        for path in snapshot_dir.glob(f"{previous['token']}-*"):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    return Snapshot(csr, concepts, token, snapshot_dir)
+
+
+def load_snapshot(concepts_file=CONCEPTS_FILE, relations_file=RELATIONS_FILE,
+                  snapshot_dir=SNAPSHOT_DIR, journal_file=JOURNAL_FILE):
+    """Carrega o snapshot, reconstruindo-o se estiver desatualizado"""
+    sources = _sources(concepts_file, relations_file, journal_file)
+    meta = _read_meta(snapshot_dir)
+    fresh, touched = is_fresh(meta, sources)
+    if not fresh:
+        return build_snapshot(concepts_file, relations_file, snapshot_dir,
+                              journal_file=journal_file)
+
+    try:
+        arrays = {
+            field: np.load(snapshot_dir / f"{meta['token']}-{field}.npy", mmap_mode='r')
+            for field in ARRAY_FIELDS
+        }
+    except (OSError, ValueError):
+        # Arrays ausentes ou corrompidos: refaz
+        return build_snapshot(concepts_file, relations_file, snapshot_dir,
+                              journal_file=journal_file)
+
+    if touched:
+        _write_meta(snapshot_dir, meta)
+
+    csr = CSRGraph.from_arrays(meta['ids'], meta['layers'], meta['verbs'],
+                               arrays, n_concepts=meta['n_concepts'])
+    return Snapshot(csr, meta['concepts'], meta['token'], snapshot_dir)
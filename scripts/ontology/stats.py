@@ -0,0 +1,153 @@
+"""
+Motor de estatísticas da ontologia CRIOS
+Calcula em uma única passada tudo o que `make stats` / `make stats-full`
+mostram: volumetria, camadas, conectividade, verbos, referências, densidade,
+diversidade cultural e cobertura bibliográfica
+
+Parte do snapshot binário (graus e verbos vetorizados), então o custo não
+depende de reler relations.json
+"""
+
+import re
+from collections import Counter
+
+from .io import REFERENCIAS_FILE, load_json
+from .ranking import load_rankings
+from .snapshot import load_snapshot
+
+# Padrões aplicados ao ID dos conceitos (busca, não casamento inteiro)
+CULTURAL_PATTERNS = [
+    ('budistas', 'anatman|sunyata|pratityasamutpada'),
+    ('taoistas', 'dao|wu-wei|yin-yang'),
+    ('confucianos', 'ren|li-confuciano'),
+    ('africanos', 'ubuntu|sankofa|ujamaa'),
+    ('indígenas', 'indigena|mana|groundednormativity'),
+]
+
+MISSING_LAYER = 'null'
+MISSING_CATEGORY = 'sem-categoria'
+
+_YEAR = re.compile(r'-?\d+')
+
+
+def year_of(ano):
+    """Ano numérico de uma referência ('c. 600 EC' → 600, '1988/2005' → 1988)"""
+    if isinstance(ano, int):
+        return ano
+    match = _YEAR.search(str(ano)) if ano is not None else None
+    return int(match.group()) if match else None
+
+
+def ranked(counter):
+    """Itens por contagem decrescente; empates por nome decrescente"""
+    return sorted(counter.items(), key=lambda item: (item[1], item[0]), reverse=True)
+
+
+def compute_stats(snapshot=None, references=None):
+    """Retorna todas as métricas do relatório como um dicionário"""
+    if snapshot is None:
+        snapshot = load_snapshot()
+    if references is None:
+        references = load_json(REFERENCIAS_FILE)
+
+    csr = snapshot.csr
+    rows = snapshot.concepts
+    n_concepts = len(rows)
+    n_relations = len(csr.src)
+
+    # Conectividade por ID (mesma semântica de calculate_connections)
+    degrees = csr.degree()
+    rankings = load_rankings(snapshot)
+    connections = {}
+    for row in rows:
+        connections[row['id']] = {
+            'id': row['id'],
+            'name': row['name'],
+            'layer': row.get('layer', 'undefined'),
+            'connection_count': int(degrees[csr.index[row['id']]]),
+            'pagerank': float(rankings['pagerank'][csr.index[row['id']]]),
+            'kcore': int(rankings['kcore'][csr.index[row['id']]]),
+        }
+    items = list(connections.values())
+    counts = [item['connection_count'] for item in items]
+
+    if items:
+        max_item = max(items, key=lambda x: x['connection_count'])
+        min_item = min(items, key=lambda x: x['connection_count'])
+        connectivity = {
+            'avg': int(sum(counts) / len(counts)),
+            'max': {'name': max_item['name'], 'count': max_item['connection_count']},
+            'min': {'name': min_item['name'], 'count': min_item['connection_count']},
+        }
+    else:
+        connectivity = {'avg': 0, 'max': {'name': 'N/A', 'count': 0},
+                        'min': {'name': 'N/A', 'count': 0}}
+
+    # Hubs pelo PageRank ponderado (empates pelo grau)
+    hubs = sorted(items, key=lambda x: (x['pagerank'], x['connection_count']), reverse=True)[:10]
+
+    # Camadas
+    layers = Counter(row.get('layer') or MISSING_LAYER for row in rows)
+    layer_sizes = list(layers.values())
+
+    # Verbos (contagem vetorizada por código)
+    verb_counts = Counter(dict(zip(csr.verbs, (int(c) for c in csr.verb_counts()))))
+
+    # Referências
+    categories = Counter(ref.get('categoria') or MISSING_CATEGORY for ref in references)
+    dated = [(year_of(ref.get('ano')), i) for i, ref in enumerate(references)]
+    dated = [(year, i) for year, i in dated if year is not None]
+    timeline = {}
+    if dated:
+        oldest = min(dated)                                    # primeiro entre empates
+        newest = max(dated, key=lambda item: (item[0], item[1]))  # último entre empates
+        for key, (_, i) in (('oldest', oldest), ('newest', newest)):
+            ref = references[i]
+            timeline[key] = {
+                'autor': ref.get('autor'),
+                'ano': ref.get('ano'),
+                'titulo': (ref.get('titulo') or '')[:50],
+            }
+
+    cited = [ref['conceitos'] for ref in references if ref.get('conceitos') is not None]
+    referenced = {concept for concepts in cited for concept in concepts}
+
+    cultural = {}
+    for label, pattern in CULTURAL_PATTERNS:
+        regex = re.compile(pattern)
+        cultural[label] = sum(1 for row in rows if regex.search(row['id']))
+
+    return {
+        'volumes': {
+            'concepts': n_concepts,
+            'relations': n_relations,
+            'references': len(references),
+            'relation_types': len(verb_counts),
+        },
+        'layers': dict(ranked(layers)),
+        'connectivity': connectivity,
+        'hubs': [{'name': h['name'], 'count': h['connection_count'],
+                  'pagerank': h['pagerank'], 'kcore': h['kcore']} for h in hubs],
+        'underconnected': sum(1 for c in counts if c <= 3),
+        'top_verbs': dict(ranked(verb_counts)[:10]),
+        'reference_categories': dict(ranked(categories)),
+        'timeline': timeline,
+        'density': {
+            'percent': (n_relations * 100) // (n_concepts * (n_concepts - 1)) if n_concepts > 1 else 0,
+            'relations_per_concept': n_relations // n_concepts if n_concepts else 0,
+        },
+        'distribution': dict(sorted(Counter(counts).items())),
+        'cultural': cultural,
+        'quality': {
+            'isolated': sum(1 for c in counts if c == 0),
+            'fragile': sum(1 for c in counts if c <= 2),
+            'well_connected': sum(1 for c in counts if c >= 5),
+            'super_hubs': sum(1 for c in counts if c >= 10),
+        },
+        'coverage': {
+            'with_references': len(referenced),
+            'without_references': sum(1 for row in rows if row['id'] not in referenced),
+            'avg_refs_per_concept': sum(len(c) for c in cited) // len(cited) if cited else 0,
+        },
+        'balance_ratio': max(layer_sizes) / min(layer_sizes) if layer_sizes else 0,
+    }
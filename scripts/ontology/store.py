@@ -0,0 +1,384 @@
+"""
+Armazenamento SQLite opcional da ontologia CRIOS
+Conceitos, relações, verbos e referências em tabelas indexadas, com escrita
+transacional em lote. Os JSON em `assets/` continuam sendo o formato
+versionado: o banco é importado deles e os exporta de volta de forma
+determinística (mesma ordem, mesmas chaves, mesma formatação)
+
+Cada linha guarda o registro original em `data` (JSON compacto, ordem das
+chaves preservada) e repete em colunas os campos consultáveis
+
+Scripts que editam em memória usam `graph()` + `save_graph()`: o grafo vem
+do banco e só as linhas alteradas, removidas ou novas são gravadas de volta
+"""
+
+import json
+import sqlite3
+from contextlib import contextmanager
+
+from .graph import OntologyGraph
+from .io import (
+    ASSETS_DIR,
+    CONCEPTS_FILE,
+    REFERENCIAS_FILE,
+    RELATIONS_FILE,
+    load_json,
+    save_json,
+)
+from .journal import Journal
+
+STORE_FILE = ASSETS_DIR / 'ontology.sqlite'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS concepts (
+    rowid    INTEGER PRIMARY KEY,
+    position INTEGER NOT NULL,
+    id       TEXT NOT NULL,
+    name     TEXT,
+    layer    TEXT,
+    data     TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_concepts_id ON concepts(id);
+CREATE INDEX IF NOT EXISTS idx_concepts_name ON concepts(name);
+CREATE INDEX IF NOT EXISTS idx_concepts_layer ON concepts(layer);
+CREATE INDEX IF NOT EXISTS idx_concepts_position ON concepts(position);
+
+CREATE TABLE IF NOT EXISTS verbs (
+    id   INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+
+CREATE TABLE IF NOT EXISTS relations (
+    rowid    INTEGER PRIMARY KEY,
+    position INTEGER NOT NULL,
+    from_id  TEXT NOT NULL,
+    to_id    TEXT NOT NULL,
+    verb_id  INTEGER NOT NULL REFERENCES verbs(id),
+    data     TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_relations_from ON relations(from_id);
+CREATE INDEX IF NOT EXISTS idx_relations_to ON relations(to_id);
+CREATE INDEX IF NOT EXISTS idx_relations_pair ON relations(from_id, to_id);
+CREATE INDEX IF NOT EXISTS idx_relations_verb ON relations(verb_id);
+CREATE INDEX IF NOT EXISTS idx_relations_position ON relations(position);
+
+CREATE TABLE IF NOT EXISTS refs (
+    rowid     INTEGER PRIMARY KEY,
+    position  INTEGER NOT NULL,
+    id        TEXT NOT NULL,
+    autor     TEXT,
+    ano       INTEGER,
+    categoria TEXT,
+    data      TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_refs_id ON refs(id);
+CREATE INDEX IF NOT EXISTS idx_refs_categoria ON refs(categoria);
+CREATE INDEX IF NOT EXISTS idx_refs_position ON refs(position);
+"""
+
+
+def _dump(record):
+    return json.dumps(record, ensure_ascii=False, separators=(',', ':'))
+
+
+def _load(data):
+    return json.loads(data)
+
+
+def open_store(path=STORE_FILE):
+    """
+    Abre um banco já importado (para os scripts com `--db`)
+
+    ValueError se o arquivo não existe (abri-lo criaria um banco vazio), se
+    não tem conceitos, ou se o journal tem transações pendentes, que o banco
+    não contém e seriam reaplicadas sobre os JSON exportados
+    """
+    if not path.exists():
+        raise ValueError(f"{path.name} não existe: rode 'make db-import' antes")
+    if Journal().pending():
+        raise ValueError("Journal com transações pendentes: rode 'make journal-compact' "
+                         "e 'make db-import' antes")
+    store = OntologyStore(path)
+    if store.empty():
+        store.close()
+        raise ValueError(f"{path.name} sem conceitos: rode 'make db-import' antes")
+    return store
+
+
+class OntologyStore:
+    """
+    Banco SQLite da ontologia
+
+    Métodos de escrita não fazem commit sozinhos: agrupe-os em
+    `with store.transaction():` (commit no fim, rollback em exceção).
+    """
+
+    def __init__(self, path=STORE_FILE):
+        self.path = path
+        self.conn = sqlite3.connect(str(path))
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA foreign_keys=ON')
+        self.conn.executescript(SCHEMA)
+        self._verb_ids = dict(
+            (name, vid) for vid, name in self.conn.execute('SELECT id, name FROM verbs')
+        )
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @contextmanager
+    def transaction(self):
+        """Agrupa escritas numa única transação"""
+        try:
+            yield self
+        except BaseException:
+            self.conn.rollback()
+            raise
+        else:
+            self.conn.commit()
+
+    # ------------------------------------------------------------------
+    # Importação / exportação
+    # ------------------------------------------------------------------
+
+    def import_json(self, concepts_file=CONCEPTS_FILE, relations_file=RELATIONS_FILE,
+                    referencias_file=REFERENCIAS_FILE):
+        """Substitui todo o conteúdo do banco pelos arquivos JSON"""
+        concepts = load_json(concepts_file)
+        relations = load_json(relations_file)
+        references = load_json(referencias_file) if referencias_file else []
+        with self.transaction():
+            for table in ('relations', 'verbs', 'concepts', 'refs'):
+                self.conn.execute(f'DELETE FROM {table}')
+            self._verb_ids = {}
+            self.add_concepts(concepts)
+            self.add_relations(relations)
+            self.add_references(references)
+        return len(concepts), len(relations), len(references)
+
+    def export_json(self, concepts_file=CONCEPTS_FILE, relations_file=RELATIONS_FILE,
+                    referencias_file=REFERENCIAS_FILE):
+        """
+        Exporta o banco para JSON (passe None para pular um arquivo)
+
+        Recusa exportar um banco sem conceitos (nunca importado ou esvaziado),
+        que sobrescreveria os JSON com listas vazias
+        """
+        if self.empty():
+            raise ValueError(f"Banco sem conceitos: {self.path} (rode `make db-import` antes)")
+        if concepts_file is not None:
+            save_json(concepts_file, self.concepts())
+        if relations_file is not None:
+            save_json(relations_file, self.relations())
+        if referencias_file is not None:
+            save_json(referencias_file, self.references())
+
+    def to_graph(self):
+        """Carrega o conteúdo do banco num OntologyGraph"""
+        return OntologyGraph(self.concepts(), self.relations())
+
+    def graph(self):
+        """
+        OntologyGraph do banco que lembra o rowid e o conteúdo original de
+        cada registro, para `save_graph()` gravar só o que mudar
+        """
+        concepts = self.concepts_where()
+        relations = self.relations_where()
+        graph = OntologyGraph([c for _, c in concepts], [r for _, r in relations])
+        graph.rows = {
+            'concepts': [(rowid, c, _dump(c)) for rowid, c in concepts],
+            'relations': [(rowid, r, _dump(r)) for rowid, r in relations],
+        }
+        return graph
+
+    def save_graph(self, graph):
+        """
+        Grava as mudanças de um grafo vindo de `graph()`, numa transação:
+        registros alterados no lugar viram UPDATE (mesma posição), os que
+        saíram do grafo DELETE e os novos INSERT no fim
+
+        Retorna {tabela: (alterados, removidos, incluídos)}
+        """
+        counts = {}
+        with self.transaction():
+            for table, records, update, add in (
+                ('concepts', graph.concepts, self.update_concepts, self.add_concepts),
+                ('relations', graph.relations, self.update_relations, self.add_relations),
+            ):
+                original = graph.rows[table]
+                # Por identidade: os originais seguem vivos em graph.rows
+                current = {id(record) for record in records}
+                known = {id(record) for _, record, _ in original}
+                changed = [(rowid, record) for rowid, record, dumped in original
+                           if id(record) in current and _dump(record) != dumped]
+                dropped = [rowid for rowid, record, _ in original if id(record) not in current]
+                added = [record for record in records if id(record) not in known]
+                update(changed)
+                self.conn.executemany(f'DELETE FROM {table} WHERE rowid = ?',
+                                      ((rowid,) for rowid in dropped))
+                add(added)
+                counts[table] = (len(changed), len(dropped), len(added))
+        return counts
+
+    # ------------------------------------------------------------------
+    # Leitura
+    # ------------------------------------------------------------------
+
+    def _records(self, table):
+        rows = self.conn.execute(f'SELECT data FROM {table} ORDER BY position, rowid')
+        return [_load(data) for data, in rows]
+
+    def concepts(self):
+        return self._records('concepts')
+
+    def empty(self):
+        """True se o banco não tem conceitos"""
+        return self.conn.execute('SELECT 1 FROM concepts LIMIT 1').fetchone() is None
+
+    def relations(self):
+        return self._records('relations')
+
+    def references(self):
+        return self._records('refs')
+
+    def concept(self, concept_id):
+        """Primeiro conceito com o ID dado (ou None)"""
+        row = self.conn.execute(
+            'SELECT data FROM concepts WHERE id = ? ORDER BY position, rowid LIMIT 1',
+            (concept_id,)
+        ).fetchone()
+        return _load(row[0]) if row else None
+
+    def concepts_where(self, layer=None, name_like=None):
+        """Conceitos filtrados por camada e/ou nome (LIKE), com rowid"""
+        clauses, params = [], []
+        if layer is not None:
+            clauses.append('layer = ?')
+            params.append(layer)
+        if name_like is not None:
+            clauses.append('name LIKE ?')
+            params.append(name_like)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+        rows = self.conn.execute(
+            f'SELECT rowid, data FROM concepts {where} ORDER BY position, rowid', params
+        )
+        return [(rowid, _load(data)) for rowid, data in rows]
+
+    def relations_where(self, from_id=None, to_id=None, verb=None, verb_like=None):
+        """
+        Relações filtradas por origem, destino e verbo, com rowid
+
+        Ex.: relations_where(to_id='vazio', verb_like='fundament%')
+        """
+        clauses, params = [], []
+        if from_id is not None:
+            clauses.append('r.from_id = ?')
+            params.append(from_id)
+        if to_id is not None:
+            clauses.append('r.to_id = ?')
+            params.append(to_id)
+        if verb is not None:
+            clauses.append('v.name = ?')
+            params.append(verb)
+        if verb_like is not None:
+            clauses.append('v.name LIKE ?')
+            params.append(verb_like)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+        rows = self.conn.execute(
+            f'SELECT r.rowid, r.data FROM relations r JOIN verbs v ON v.id = r.verb_id '
+            f'{where} ORDER BY r.position, r.rowid', params
+        )
+        return [(rowid, _load(data)) for rowid, data in rows]
+
+    def verb_counts(self):
+        """Contagem de uso de cada verbo"""
+        rows = self.conn.execute(
+            'SELECT v.name, COUNT(*) FROM relations r JOIN verbs v ON v.id = r.verb_id '
+            'GROUP BY v.id ORDER BY COUNT(*) DESC, v.name'
+        )
+        return dict(rows)
+
+    # ------------------------------------------------------------------
+    # Escrita em lote (use dentro de transaction())
+    # ------------------------------------------------------------------
+
+    def _next_position(self, table):
+        row = self.conn.execute(f'SELECT MAX(position) FROM {table}').fetchone()
+        return 0 if row[0] is None else row[0] + 1
+
+    def _verb_id(self, name):
+        vid = self._verb_ids.get(name)
+        if vid is None:
+            cur = self.conn.execute('INSERT INTO verbs(name) VALUES (?)', (name,))
+            vid = self._verb_ids[name] = cur.lastrowid
+        return vid
+
+    def _concept_row(self, concept):
+        return (concept['id'], concept.get('name'), concept.get('layer'), _dump(concept))
+
+    def _relation_row(self, rel):
+        return (rel['from'], rel['to'], self._verb_id(rel['name']), _dump(rel))
+
+    def _reference_row(self, ref):
+        return (ref['id'], ref.get('autor'), ref.get('ano'), ref.get('categoria'), _dump(ref))
+
+    def add_concepts(self, concepts):
+        start = self._next_position('concepts')
+        self.conn.executemany(
+            'INSERT INTO concepts(position, id, name, layer, data) VALUES (?, ?, ?, ?, ?)',
+            ((start + i,) + self._concept_row(c) for i, c in enumerate(concepts))
+        )
+
+    def add_relations(self, relations):
+        start = self._next_position('relations')
+        self.conn.executemany(
+            'INSERT INTO relations(position, from_id, to_id, verb_id, data) VALUES (?, ?, ?, ?, ?)',
+            ((start + i,) + self._relation_row(r) for i, r in enumerate(relations))
+        )
+
+    def add_references(self, references):
+        start = self._next_position('refs')
+        self.conn.executemany(
+            'INSERT INTO refs(position, id, autor, ano, categoria, data) VALUES (?, ?, ?, ?, ?, ?)',
+            ((start + i,) + self._reference_row(r) for i, r in enumerate(references))
+        )
+
+    def update_concepts(self, rows):
+        """Atualiza conceitos a partir de pares (rowid, conceito)"""
+        self.conn.executemany(
+            'UPDATE concepts SET id = ?, name = ?, layer = ?, data = ? WHERE rowid = ?',
+            (self._concept_row(c) + (rowid,) for rowid, c in rows)
+        )
+
+    def update_relations(self, rows):
+        """Atualiza relações a partir de pares (rowid, relação)"""
+        self.conn.executemany(
+            'UPDATE relations SET from_id = ?, to_id = ?, verb_id = ?, data = ? WHERE rowid = ?',
+            (self._relation_row(r) + (rowid,) for rowid, r in rows)
+        )
+
+    def delete_concepts(self, concept_ids):
+        """Remove conceitos pelo ID (relações não são tocadas)"""
+        self.conn.executemany(
+            'DELETE FROM concepts WHERE id = ?', ((cid,) for cid in concept_ids)
+        )
+
+    def delete_relations(self, rowids):
+        """Remove relações pelo rowid"""
+        self.conn.executemany(
+            'DELETE FROM relations WHERE rowid = ?', ((rowid,) for rowid in rowids)
+        )
+
+    def delete_relations_between(self, a, b):
+        """Remove todas as relações entre a e b (nas duas direções)"""
+        cur = self.conn.execute(
+            'DELETE FROM relations WHERE (from_id = ? AND to_id = ?) OR (from_id = ? AND to_id = ?)',
+            (a, b, b, a)
+        )
+        return cur.rowcount
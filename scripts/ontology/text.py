@@ -0,0 +1,136 @@
+"""
+Normalização de texto em português compartilhada pelos scripts CRIOS
+Um único lugar para dobrar acentos, tirar stopwords, reduzir sufixos e
+tokenizar, no lugar de `lower().split()` espalhados pelos scripts e do
+normalizador em Node embutido no Makefile
+
+- `fold()`: minúsculas sem acentos ('Ação' → 'acao')
+- `stem()`: as mesmas regras de sufixo de `check-unmapped`/`check-duplicates`
+  (-ano, -ico, -ista, -ismo, -al, -ia, plural), aplicadas em sequência
+- `normalize_term()`: nome de conceito inteiro normalizado (hífens viram
+  espaço, sufixos do fim removidos), usado para casar referências e IDs
+- `words()`: palavras em minúsculas (com acento); `tokenize()`: termos sem
+  acento e sem stopwords, opcionalmente reduzidos por `stem()`
+
+Os resultados são memorizados por (hash do texto, pipeline, TEXT_VERSION) em
+`assets/.snapshot/text-cache-v<N>.json`, gravado ao fim do processo: cada
+descrição é tokenizada uma vez, mesmo entre scripts diferentes. Mudar as
+regras exige incrementar TEXT_VERSION
+"""
+
+import atexit
+import hashlib
+import json
+import os
+import re
+import unicodedata
+
+from .io import ASSETS_DIR
+
+TEXT_VERSION = 1
+
+CACHE_FILE = ASSETS_DIR / '.snapshot' / f'text-cache-v{TEXT_VERSION}.json'
+
+# Stopwords do português, já sem acentos
+STOPWORDS = frozenset('''
+    a ao aos aquela aquelas aquele aqueles aquilo as ate com como contra da das de dela
+    delas dele deles depois do dos e ela elas ele eles em entre era eram essa essas esse
+    esses esta estas este estes eu foi foram ha isso isto ja la lhe lhes mais mas me mesmo
+    meu minha muito na nas nao nem no nos nossa nosso num numa o os ou para pela pelas pelo
+    pelos por qual quando que quem se sem ser seu seus sua suas so sobre tambem te tem ter
+    toda todas todo todos tu um uma umas uns vos
+'''.split())
+
+# (sufixos, tamanho mínimo do que sobra), na ordem do normalizador do Makefile
+SUFFIX_RULES = [
+    (re.compile(r'(?:ano|ana|anos|anas)$'), 4),
+    (re.compile(r'(?:ica|ico|icas|icos)$'), 4),
+    (re.compile(r'(?:ista|istas)$'), 3),
+    (re.compile(r'(?:ismo|ismos)$'), 3),
+    (re.compile(r'(?:al|ais)$'), 4),
+    (re.compile(r'(?:ia|ias)$'), 4),
+    (re.compile(r'(?:es|s)$'), 3),
+]
+
+_WORD = re.compile(r'\w+')
+_SEPARATORS = re.compile(r'[-_]')
+
+_cache = None
+_dirty = False
+
+
+def fold(text):
+    """Minúsculas sem acentos ('Ação' → 'acao')"""
+    decomposed = unicodedata.normalize('NFD', (text or '').lower())
+    return ''.join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def stem(word):
+    """Aplica as regras de sufixo em sequência (só se sobrar o tamanho mínimo)"""
+    for pattern, minimum in SUFFIX_RULES:
+        stripped = pattern.sub('', word)
+        if len(stripped) >= minimum:
+            word = stripped
+    return word
+
+
+def _load_cache():
+    global _cache
+    if _cache is None:
+        try:
+            with open(CACHE_FILE, encoding='utf-8') as f:
+                _cache = json.load(f)
+        except (OSError, ValueError):
+            _cache = {}
+        atexit.register(save_cache)
+    return _cache
+
+
+def save_cache():
+    """Grava o cache em disco se houver entradas novas"""
+    global _dirty
+    if not _dirty or _cache is None:
+        return
+    try:
+        CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        tmp = CACHE_FILE.with_name(f'{CACHE_FILE.name}.{os.getpid()}.tmp')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(_cache, f, ensure_ascii=False, separators=(',', ':'))
+        tmp.replace(CACHE_FILE)
+        _dirty = False
+    except OSError:
+        pass
+
+
+def _memoized(pipeline, text, compute):
+    """Resultado de `compute(text)` memorizado por (pipeline, hash do texto)"""
+    global _dirty
+    cache = _load_cache()
+    key = f"{pipeline}:{hashlib.sha1((text or '').encode('utf-8')).hexdigest()}"
+    result = cache.get(key)
+    if result is None:
+        result = cache[key] = compute(text or '')
+        _dirty = True
+    return result
+
+
+def normalize_term(term):
+    """Nome/ID normalizado para comparação ('Pensamento Indígena' ≈ 'pensamento-indigena')"""
+    def compute(text):
+        normalized = ' '.join(_SEPARATORS.sub(' ', fold(text).strip()).split())
+        return stem(normalized)
+    return _memoized('term', term, compute)
+
+
+def words(text):
+    """Palavras (\\w+) em minúsculas, acentos mantidos"""
+    return _memoized('words', text, lambda t: _WORD.findall(t.lower()))
+
+
+def tokenize(text, stemmed=False):
+    """Termos sem acento e sem stopwords, sem números soltos; `stemmed` aplica stem()"""
+    def compute(text):
+        terms = [word for word in _WORD.findall(fold(text))
+                 if len(word) > 1 and word not in STOPWORDS and not word.isdigit()]
+        return [stem(word) for word in terms] if stemmed else terms
+    return _memoized('stems' if stemmed else 'tokens', text, compute)
@@ -0,0 +1,189 @@
+"""
+Similaridade textual entre conceitos da ontologia CRIOS
+Nome + descrição de cada conceito viram um vetor esparso TF-IDF (ou BM25),
+e os vizinhos de todos os conceitos saem de um único produto X·Xᵀ em blocos,
+no lugar de contar palavras em comum par a par
+
+- termos de `text.tokenize()`: sem acentos, sem stopwords do português
+  ("de", "a", "que", ...), que antes dominavam os scores, e reduzidos pelos
+  sufixos de `text.stem()` ('políticas' e 'político' viram o mesmo termo)
+- `term_matrix()`: matriz conceitos × termos, linhas com norma 1 (produto
+  escalar = cosseno)
+- `top_similar()`: k vizinhos mais parecidos de cada conceito; blocos de
+  linhas com SciPy `sparse`, ou pelo mesmo produto sobre os arrays CSR sem
+  SciPy
+- `load_text_similarity(snapshot)` guarda os vizinhos ao lado do snapshot
+  binário (`<token>-textsim-v<N>-<pesos>-k<k>.npz`)
+
+Requer NumPy (`pip install numpy`); SciPy é opcional (`pip install scipy`)
+"""
+
+from collections import Counter
+
+import numpy as np
+
+from .text import tokenize
+
+try:
+    from scipy import sparse
+except ImportError:  # SciPy é opcional
+    sparse = None
+
+TEXTSIM_VERSION = 2
+
+WEIGHTINGS = ('tfidf', 'bm25')
+DEFAULT_WEIGHTING = 'tfidf'
+DEFAULT_K = 30
+
+# Palavras do nome contam como se aparecessem NAME_WEIGHT vezes
+NAME_WEIGHT = 2
+
+# Parâmetros do BM25
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Entradas (linhas do bloco × não-nulos da matriz) por bloco sem SciPy
+MAX_ENTRIES = 4_000_000
+
+def concept_terms(concept):
+    """Contagem de termos do nome (peso NAME_WEIGHT) + descrição"""
+    terms = Counter(tokenize(concept.get('description', ''), stemmed=True))
+    for word in tokenize(concept.get('name', ''), stemmed=True):
+        terms[word] += NAME_WEIGHT
+    return terms
+
+
+def term_matrix(concepts, weighting=DEFAULT_WEIGHTING):
+    """
+    (indptr, indices, data, vocabulário) da matriz conceitos × termos em
+    formato CSR, com linhas de norma 1
+
+    - tfidf: (1 + log tf) × (log((1 + n) / (1 + df)) + 1)
+    - bm25: saturação tf·(k1 + 1) / (tf + k1·(1 - b + b·|d|/média)) × idf do BM25
+    """
+    if weighting not in WEIGHTINGS:
+        raise ValueError(f"Pesos desconhecidos: {weighting} (use {', '.join(WEIGHTINGS)})")
+    counts = [concept_terms(c) for c in concepts]
+    vocabulary = {}
+    for terms in counts:
+        for word in terms:
+            vocabulary.setdefault(word, len(vocabulary))
+
+    lengths = np.array([len(terms) for terms in counts], dtype=np.int64)
+    indptr = np.zeros(len(counts) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=indptr[1:])
+    indices = np.array([vocabulary[word] for terms in counts for word in terms], dtype=np.int64)
+    tf = np.array([count for terms in counts for count in terms.values()], dtype=np.float64)
+    rows = np.repeat(np.arange(len(counts)), lengths)
+
+    n = len(counts)
+    df = np.bincount(indices, minlength=len(vocabulary)).astype(np.float64)
+    if weighting == 'tfidf':
+        data = (1.0 + np.log(tf)) * (np.log((1.0 + n) / (1.0 + df)) + 1.0)[indices]
+    else:
+        size = np.bincount(rows, weights=tf, minlength=n)
+        average = size.mean() if n else 1.0
+        norm = BM25_K1 * (1.0 - BM25_B + BM25_B * size / (average or 1.0))
+        idf = np.log(1.0 + (n - df + 0.5) / (df + 0.5))
+        data = tf * (BM25_K1 + 1.0) / (tf + norm[rows]) * idf[indices]
+
+    norms = np.sqrt(np.bincount(rows, weights=data ** 2, minlength=n))
+    data = data / np.where(norms > 0, norms, 1.0)[rows]
+    return indptr, indices, data, vocabulary
+
+
+def _row_products(indptr, indices, data, start, stop, width):
+    """Linhas start..stop de X·Xᵀ (densas, bloco × n) sobre os arrays CSR"""
+    block = np.zeros((stop - start, width))
+    lo, hi = indptr[start], indptr[stop]
+    owners = np.repeat(np.arange(stop - start), np.diff(indptr[start:stop + 1]))
+    block[owners, indices[lo:hi]] = data[lo:hi]
+    # Produto de cada linha do bloco com cada conceito = soma sobre seus termos
+    products = block[:, indices] * data
+    totals = np.zeros((len(block), len(data) + 1))
+    np.cumsum(products, axis=1, out=totals[:, 1:])
+    return totals[:, indptr[1:]] - totals[:, indptr[:-1]]
+
+
+def top_similar(indptr, indices, data, k=DEFAULT_K, width=None):
+    """
+    (vizinhos, similaridades) n × k: os k conceitos de maior cosseno com cada
+    conceito (sem ele mesmo), em ordem decrescente (empate: menor índice).
+    Posições sem vizinho parecido (cosseno 0) ficam com -1
+    """
+    n = len(indptr) - 1
+    if width is None:
+        width = int(indices.max()) + 1 if len(indices) else 0
+    k = max(0, min(k, n - 1))
+    neighbors = np.full((n, k), -1, dtype=np.int64)
+    similarities = np.zeros((n, k))
+    if not k or not len(data):
+        return neighbors, similarities
+
+    if sparse is not None:
+        matrix = sparse.csr_matrix((data, indices, indptr), shape=(n, width))
+        transposed = matrix.T.tocsc()
+        rows = max(1, MAX_ENTRIES // n)
+    else:
+        rows = max(1, MAX_ENTRIES // max(len(data), n))
+
+    for start in range(0, n, rows):
+        stop = min(start + rows, n)
+        if sparse is not None:
+            scores = (matrix[start:stop] @ transposed).toarray()
+        else:
+            scores = _row_products(indptr, indices, data, start, stop, width)
+        scores[np.arange(stop - start), np.arange(start, stop)] = -1.0
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        values = np.take_along_axis(scores, top, axis=1)
+        order = np.lexsort((top, -values), axis=1)
+        top = np.take_along_axis(top, order, axis=1)
+        values = np.take_along_axis(values, order, axis=1)
+        found = values > 0
+        neighbors[start:stop] = np.where(found, top, -1)
+        similarities[start:stop] = np.where(found, values, 0.0)
+    return neighbors, similarities
+
+
+def load_text_similarity(snapshot=None, concepts=None, k=DEFAULT_K, weighting=DEFAULT_WEIGHTING):
+    """
+    (vizinhos, similaridades) dos conceitos do snapshot (linhas na ordem de
+    csr.ids), calculados uma vez por versão dos JSON. `concepts` são os
+    conceitos completos (com descrição); sem eles, o grafo é carregado só
+    quando não há cache
+    """
+    if snapshot is None:
+        from .snapshot import load_snapshot
+        snapshot = load_snapshot()
+
+    def compute():
+        full = concepts
+        if full is None:
+            from .graph import OntologyGraph
+            full = OntologyGraph.load().concepts
+        by_id = {c['id']: c for c in full}
+        csr = snapshot.csr
+        ordered = [by_id.get(cid, {'name': cid}) for cid in csr.ids[:csr.n_concepts]]
+        indptr, indices, data, vocabulary = term_matrix(ordered, weighting)
+        neighbors, similarities = top_similar(indptr, indices, data, k, len(vocabulary))
+        return {'neighbors': neighbors, 'similarities': similarities}
+
+    saved = snapshot.cached_arrays(f'textsim-v{TEXTSIM_VERSION}-{weighting}-k{k}', compute)
+    return saved['neighbors'], saved['similarities']
+
+
+def similar_by_id(ids, snapshot=None, concepts=None, k=DEFAULT_K, weighting=DEFAULT_WEIGHTING):
+    """{id: {id vizinho: cosseno}} para os conceitos dados (via cache do snapshot)"""
+    if snapshot is None:
+        from .snapshot import load_snapshot
+        snapshot = load_snapshot()
+    csr = snapshot.csr
+    neighbors, similarities = load_text_similarity(snapshot, concepts, k, weighting)
+    result = {}
+    for cid in ids:
+        node = csr.index.get(cid)
+        if node is None or node >= len(neighbors):
+            continue
+        result[cid] = {csr.ids[j]: s for j, s in zip(neighbors[node].tolist(),
+                                                      similarities[node].tolist()) if j >= 0}
+    return result
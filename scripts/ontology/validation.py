@@ -0,0 +1,620 @@
+"""
+Validação incremental da ontologia CRIOS
+Os problemas de cada registro (conceito ou relação) ficam em cache indexados
+pelo conteúdo do registro. Uma nova validação só verifica os registros novos
+ou alterados e os que apontam para IDs que surgiram ou sumiram desde a
+última; duplicatas saem de contadores sobre a lista inteira
+
+O cache fica em `assets/.snapshot/`: `validation.pickle` com os problemas por
+registro e `validation.json` com a chave (tamanho/mtime/SHA-1) dos arquivos
+validados e o último relatório, lido sozinho quando nada mudou
+
+As seções do relatório são plugins (`@check`, em `ontology/checks.py`) que
+declaram suas entradas; `run_checks()` executa-os em série ou num pool de
+processos, medindo tempo, pico de memória e número de achados de cada um.
+As verificações por registro consultam o cache dentro do próprio plugin
+(`RecordCache.check`), então o tempo de cada uma é o do seu trabalho real
+"""
+
+import contextlib
+import io
+import json
+import os
+import pickle
+import time
+import tracemalloc
+import xml.etree.ElementTree as ET
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from .graph import OntologyGraph
+from .io import (
+    ASSETS_DIR,
+    CONCEPTS_FILE,
+    REFERENCIAS_FILE,
+    RELATIONS_FILE,
+    file_hash,
+    file_key,
+    load_json,
+)
+from .journal import JOURNAL_FILE, Journal
+
+CACHE_FILE = ASSETS_DIR / '.snapshot' / 'validation.pickle'
+REPORT_FILE = ASSETS_DIR / '.snapshot' / 'validation.json'
+CACHE_VERSION = 2
+
+# Abaixo deste total de registros, abrir processos custa mais que o ganho
+PARALLEL_THRESHOLD = 50000
+
+# Modo --watch: intervalo de polling, espera até os arquivos pararem de
+# mudar e novas tentativas enquanto um JSON estiver pela metade
+POLL_INTERVAL = 0.2
+DEBOUNCE = 0.15
+PARSE_RETRIES = 25
+PARSE_RETRY_DELAY = 0.1
+
+SOURCES = {
+    'concepts': CONCEPTS_FILE,
+    'relations': RELATIONS_FILE,
+    'referencias': REFERENCIAS_FILE,
+    'journal': JOURNAL_FILE,
+}
+
+
+def _freeze(value):
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, dict):
+        return tuple((k, _freeze(v)) for k, v in value.items())
+    return value
+
+
+def record_key(record):
+    """Chave hashable com o conteúdo de um registro"""
+    return _freeze(record)
+
+
+# ----------------------------------------------------------------------
+# Verificações por registro
+# ----------------------------------------------------------------------
+
+def concept_field_issues(concept, ids=None):
+    """Campos obrigatórios de um conceito: erros críticos e avisos"""
+    concept_id = concept.get('id')
+    critical = []
+    warnings = []
+    if not concept_id:
+        critical.append(f"❌ Sem ID: {concept.get('name', 'SEM NOME')}")
+    if not concept.get('name'):
+        critical.append(f"❌ Sem nome: {concept.get('id', 'SEM ID')}")
+    if not concept.get('description') or len(concept.get('description', '')) < 20:
+        warnings.append(f"⚠️  Descrição curta (<20 chars): {concept_id}")
+    if not concept.get('layer'):
+        critical.append(f"❌ Sem camada: {concept_id}")
+    if not concept.get('connections') or len(concept.get('connections', [])) == 0:
+        warnings.append(f"⚠️  Sem conexões: {concept_id}")
+    return {'critical': critical, 'warnings': warnings}
+
+
+def concept_orphans(concept, ids):
+    """Conexões de um conceito para IDs inexistentes"""
+    return [f"{concept.get('id')} → {conn}"
+            for conn in concept.get('connections', []) if conn not in ids]
+
+
+def concept_issues(concept, ids):
+    """Problemas de um conceito: erros críticos, avisos e conexões órfãs"""
+    issues = concept_field_issues(concept)
+    issues['orphans'] = concept_orphans(concept, ids)
+    return issues
+
+
+def relation_issues(relation, ids):
+    """Problemas de uma relação: extremidades inexistentes e auto-relação"""
+    issues = []
+    if relation['from'] not in ids:
+        issues.append(f"❌ ID origem não existe: {relation['from']} → {relation['to']}")
+    if relation['to'] not in ids:
+        issues.append(f"❌ ID destino não existe: {relation['from']} → {relation['to']}")
+    if relation['from'] == relation['to']:
+        issues.append(f"⚠️  Auto-relação: {relation['from']}")
+    return issues
+
+
+def no_refs(record):
+    return ()
+
+
+def concept_refs(concept):
+    return concept.get('connections', [])
+
+
+def relation_refs(relation):
+    return (relation['from'], relation['to'])
+
+
+# ----------------------------------------------------------------------
+# Cache por registro
+# ----------------------------------------------------------------------
+
+def check_records(records, cache, issues, refs, ids, changed_ids):
+    """
+    Problemas de cada registro, reaproveitando `cache` (conteúdo → problemas)
+    para os que não mudaram nem apontam para IDs que surgiram ou sumiram
+
+    Retorna (problemas na ordem dos registros, cache novo, reverificados)
+    """
+    entries = []
+    fresh = {}
+    rechecked = 0
+    for record in records:
+        key = record_key(record)
+        # Registro repetido na mesma rodada: reaproveita (lista vazia inclusive)
+        if key in fresh:
+            entries.append(fresh[key])
+            continue
+        if key in cache and not (changed_ids and not changed_ids.isdisjoint(refs(record))):
+            entry = cache[key]
+        else:
+            entry = issues(record, ids)
+            rechecked += 1
+        fresh[key] = entry
+        entries.append(entry)
+    return entries, fresh, rechecked
+
+
+class RecordCache:
+    """
+    Entrada `records` das verificações: IDs atuais e o cache por registro da
+    rodada anterior, uma seção por verificação. Cada verificação consulta e
+    renova só a sua seção; `updated` volta do processo que a executou
+    """
+
+    def __init__(self, ids, previous_ids=frozenset(), sections=None):
+        self.ids = ids
+        # IDs que surgiram ou sumiram: seus dependentes são reavaliados
+        self.changed_ids = ids ^ previous_ids
+        self.sections = sections or {}
+        self.updated = {}
+
+    def check(self, section, kind, records, issues, refs):
+        """Problemas por registro de `records` ('concepts' ou 'relations')"""
+        entries, fresh, rechecked = check_records(
+            records, self.sections.get(section, {}), issues, refs, self.ids, self.changed_ids)
+        self.updated[section] = {'kind': kind, 'entries': entries, 'cache': fresh,
+                                 'rechecked': rechecked}
+        return entries
+
+    def merge(self, runs):
+        """Junta as seções renovadas pelas verificações de `runs`"""
+        for run in runs:
+            if run.get('records'):
+                self.updated[run['name']] = run['records']
+
+    def entries(self, section):
+        return self.updated[section]['entries']
+
+    def checked(self, kind):
+        """Registros de um tipo reverificados (o máximo entre as verificações)"""
+        return max((u['rechecked'] for u in self.updated.values() if u['kind'] == kind),
+                   default=0)
+
+
+def duplicate_names(concepts):
+    """IDs e nomes repetidos: ({id: n}, {nome: n})"""
+    id_counts = Counter(c['id'] for c in concepts)
+    name_counts = Counter(c['name'] for c in concepts)
+    return ({k: v for k, v in id_counts.items() if v > 1},
+            {k: v for k, v in name_counts.items() if v > 1})
+
+
+def duplicate_pairs(relations):
+    """Pares (origem, destino) repetidos: {par: n}"""
+    pairs = Counter((r['from'], r['to']) for r in relations)
+    return {k: v for k, v in pairs.items() if v > 1}
+
+
+# Verificações por registro: seção do cache → (tipo, problemas, referências)
+RECORD_CHECKS = {
+    'required_fields': ('concepts', concept_field_issues, no_refs),
+    'orphan_references': ('concepts', concept_orphans, concept_refs),
+    'relations_integrity': ('relations', relation_issues, relation_refs),
+}
+
+
+# ----------------------------------------------------------------------
+# Resultado
+# ----------------------------------------------------------------------
+
+class ValidationResult:
+    """Problemas encontrados, na ordem dos registros"""
+
+    def __init__(self, cache, concepts, relations):
+        fields = cache.entries('required_fields')
+        self.critical = [m for e in fields for m in e['critical']]
+        self.warnings = [m for e in fields for m in e['warnings']]
+        self.orphans = {m for e in cache.entries('orphan_references') for m in e}
+        self.relation_issues = [m for e in cache.entries('relations_integrity') for m in e]
+
+        self.id_dups, self.name_dups = duplicate_names(concepts)
+        self.duplicate_pairs = duplicate_pairs(relations)
+        self.relation_duplicates = sum(n - 1 for n in self.duplicate_pairs.values())
+
+        # Registros verificados de fato (os demais vieram do cache)
+        self.checked_concepts = cache.checked('concepts')
+        self.checked_relations = cache.checked('relations')
+
+    def problems(self):
+        """Todos os problemas como mensagens (multiconjunto)"""
+        problems = Counter(self.critical)
+        problems.update(self.warnings)
+        problems.update(self.orphans)
+        problems.update(self.relation_issues)
+        problems.update(f"❌ ID duplicado: {k} ({v}×)" for k, v in self.id_dups.items())
+        problems.update(f"❌ Nome duplicado: {k} ({v}×)" for k, v in self.name_dups.items())
+        problems.update(f"⚠️  Relação duplicada: {a} → {b} ({v}×)"
+                        for (a, b), v in self.duplicate_pairs.items())
+        return problems
+
+
+class IncrementalValidator:
+    """
+    Valida listas de conceitos/relações reaproveitando o resultado por
+    registro da validação anterior
+    """
+
+    def __init__(self, cache_file=None, report_file=None):
+        self.cache_file = cache_file
+        self.report_file = report_file
+        self.sources = {}    # chave dos arquivos da última validação
+        self.report = None   # texto do último relatório (para reuso integral)
+        self.ok = None
+        self._records = None
+
+    @classmethod
+    def load(cls, cache_file=CACHE_FILE, report_file=REPORT_FILE):
+        """Validador ligado ao cache em disco (registros lidos só se preciso)"""
+        validator = cls(cache_file, report_file)
+        try:
+            with open(report_file, 'r', encoding='utf-8') as f:
+                header = json.load(f)
+        except (OSError, ValueError):
+            return validator
+        if header.get('version') == CACHE_VERSION:
+            validator.sources = header['sources']
+            validator.report = header['report']
+            validator.ok = header['ok']
+        return validator
+
+    @property
+    def records(self):
+        """IDs conhecidos e problemas por registro da validação anterior"""
+        if self._records is None:
+            self._records = {'ids': set(), 'sections': {}}
+            if self.cache_file is not None:
+                try:
+                    with open(self.cache_file, 'rb') as f:
+                        state = pickle.load(f)
+                    if state.get('version') == CACHE_VERSION:
+                        self._records = state['records']
+                except (OSError, EOFError, pickle.UnpicklingError, AttributeError, KeyError):
+                    pass
+        return self._records
+
+    def save(self):
+        self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.cache_file.with_name(f'{self.cache_file.name}.{os.getpid()}.tmp')
+        with open(tmp, 'wb') as f:
+            pickle.dump({'version': CACHE_VERSION, 'records': self.records}, f,
+                        protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, self.cache_file)
+        # Cabeçalho por último: só aponta para registros já gravados
+        header = {'version': CACHE_VERSION, 'sources': self.sources,
+                  'report': self.report, 'ok': self.ok}
+        tmp = self.report_file.with_name(f'{self.report_file.name}.{os.getpid()}.tmp')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(header, f, ensure_ascii=False)
+        os.replace(tmp, self.report_file)
+
+    # ------------------------------------------------------------------
+    # Arquivos
+    # ------------------------------------------------------------------
+
+    def unchanged(self, sources=SOURCES):
+        """True se nenhum arquivo de origem mudou desde a última validação"""
+        if not self.sources or set(self.sources) != set(sources):
+            return False
+        for name, path in sources.items():
+            saved = self.sources[name]
+            key = file_key(path)
+            if key['size'] != saved['size']:
+                return False
+            if key['mtime_ns'] != saved['mtime_ns'] and file_hash(path) != saved['sha1']:
+                return False
+        return True
+
+    def remember(self, report, ok, sources=SOURCES):
+        """Registra o relatório e a chave dos arquivos validados"""
+        self.report = report
+        self.ok = ok
+        self.sources = {name: dict(file_key(path), sha1=file_hash(path))
+                        for name, path in sources.items()}
+
+    # ------------------------------------------------------------------
+    # Registros
+    # ------------------------------------------------------------------
+
+    def cache_for(self, concepts):
+        """RecordCache com os IDs de `concepts` e o cache da rodada anterior"""
+        records = self.records
+        ids = {c['id'] for c in concepts if c.get('id')}
+        return RecordCache(ids, records['ids'], records['sections'])
+
+    def commit(self, cache):
+        """Guarda as seções renovadas por uma rodada de verificações"""
+        records = self.records
+        records['ids'] = cache.ids
+        records['sections'] = dict(records['sections'])
+        for section, updated in cache.updated.items():
+            records['sections'][section] = updated['cache']
+
+    def validate(self, concepts, relations):
+        """
+        Valida tudo em série e atualiza o cache; retorna um ValidationResult
+        (as mesmas verificações por registro que os plugins executam)
+        """
+        cache = self.cache_for(concepts)
+        data = {'concepts': concepts, 'relations': relations}
+        for section, (kind, issues, refs) in RECORD_CHECKS.items():
+            cache.check(section, kind, data[kind], issues, refs)
+        self.commit(cache)
+        return ValidationResult(cache, concepts, relations)
+
+
+def load_json_retrying(path, retries=PARSE_RETRIES, delay=PARSE_RETRY_DELAY):
+    """
+    load_json que espera um arquivo sendo gravado terminar de ser escrito
+
+    Retorna (dados, chave do arquivo lido antes da leitura que deu certo)
+    """
+    for attempt in range(retries):
+        key = tuple(file_key(path).values())
+        try:
+            return load_json(path), key
+        except (OSError, ValueError):
+            if attempt == retries - 1:
+                raise
+            time.sleep(delay)
+
+
+class ValidationWatcher:
+    """
+    Revalida a cada gravação de concepts.json/relations.json/journal
+
+    Mantém as listas e o cache por registro em memória: só o arquivo que
+    mudou é relido e só os registros alterados são reverificados. Cada rodada
+    devolve os problemas novos e os resolvidos
+    """
+
+    def __init__(self, concepts_file=CONCEPTS_FILE, relations_file=RELATIONS_FILE,
+                 journal_file=JOURNAL_FILE):
+        self.files = {'concepts': concepts_file, 'relations': relations_file}
+        self.journal_file = journal_file
+        self.validator = IncrementalValidator()
+        self.data = {}
+        self.stamps = {}
+        self.problems = Counter()
+
+    def _stamp(self):
+        paths = dict(self.files, journal=self.journal_file)
+        return {name: tuple(file_key(path).values()) for name, path in paths.items()}
+
+    def changed(self):
+        """Arquivos com tamanho/mtime diferentes da última rodada"""
+        stamp = self._stamp()
+        return [name for name in stamp if stamp[name] != self.stamps.get(name)]
+
+    def refresh(self):
+        """
+        Relê o que mudou e revalida
+
+        Retorna (arquivos alterados, resultado, problemas novos, resolvidos)
+        """
+        # Espera as gravações pararem antes de ler
+        stamp = self._stamp()
+        while True:
+            time.sleep(DEBOUNCE)
+            settled = self._stamp()
+            if settled == stamp:
+                break
+            stamp = settled
+
+        changed = [name for name in stamp if stamp[name] != self.stamps.get(name)]
+        for name in changed:
+            if name in self.files:
+                # A chave é a da versão lida, não a de antes das novas tentativas
+                self.data[name], stamp[name] = load_json_retrying(self.files[name])
+        self.stamps = stamp
+
+        concepts, relations = self.data['concepts'], self.data['relations']
+        if Journal(self.journal_file).pending():
+            # Transações pendentes: o estado efetivo vem do grafo reaplicado
+            graph = OntologyGraph.load(*self.files.values(), journal_file=self.journal_file)
+            concepts, relations = graph.concepts, graph.relations
+
+        result = self.validator.validate(concepts, relations)
+        problems = result.problems()
+        new = problems - self.problems
+        resolved = self.problems - problems
+        self.problems = problems
+        return changed, result, new, resolved
+
+    def watch(self, on_change, on_error, interval=POLL_INTERVAL):
+        """
+        Laço de polling: `on_change(alterados, resultado, novos, resolvidos,
+        segundos)` a cada rodada; `on_error(exc)` se um JSON continuar inválido
+        """
+        while True:
+            if self.changed():
+                start = time.perf_counter()
+                try:
+                    outcome = self.refresh()
+                except (OSError, ValueError) as exc:
+                    # Espera a próxima gravação para tentar de novo
+                    self.stamps = self._stamp()
+                    on_error(exc)
+                    continue
+                on_change(*outcome, time.perf_counter() - start)
+            time.sleep(interval)
+
+
+def changed_records(old, new):
+    """Registros de `new` ausentes de `old` (multiconjunto por conteúdo)"""
+    remaining = Counter(record_key(r) for r in old)
+    changed = []
+    for record in new:
+        key = record_key(record)
+        if remaining[key]:
+            remaining[key] -= 1
+        else:
+            changed.append(record)
+    return changed
+
+
+# ----------------------------------------------------------------------
+# Verificações como plugins
+# ----------------------------------------------------------------------
+
+CHECKS = {}
+
+
+class Check:
+    """Verificação registrada: função + nomes das entradas que recebe"""
+
+    def __init__(self, name, function, inputs):
+        self.name = name
+        self.function = function
+        self.inputs = inputs
+        self.title = (function.__doc__ or name).strip().splitlines()[0]
+
+
+def check(name, inputs):
+    """Decorador que registra uma verificação (roda na ordem de registro)"""
+    def register(function):
+        CHECKS[name] = Check(name, function, tuple(inputs))
+        return function
+    return register
+
+
+def registered_checks():
+    from . import checks  # noqa: F401 (registra as verificações embutidas)
+    return CHECKS
+
+
+_worker_data = None
+
+
+def _init_worker(data):
+    global _worker_data
+    _worker_data = data
+
+
+def _run_check(name, data=None):
+    """Executa uma verificação capturando saída, tempo e pico de memória"""
+    data = _worker_data if data is None else data
+    plugin = registered_checks()[name]
+    output = io.StringIO()
+    error = None
+    tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(output):
+            outcome = plugin.function(*(data[key] for key in plugin.inputs))
+    except Exception as exc:  # uma verificação quebrada não derruba as outras
+        outcome = (False, 0)
+        error = f'{type(exc).__name__}: {exc}'
+    seconds = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    ok, findings = outcome if outcome is not None else (True, 0)
+    cache = data.get('records') if 'records' in plugin.inputs else None
+    return {
+        'name': name,
+        'title': plugin.title,
+        'inputs': list(plugin.inputs),
+        'kind': 'analysis' if outcome is None else 'check',
+        'ok': bool(ok),
+        'findings': findings,
+        'seconds': seconds,
+        'peak_bytes': peak,
+        'error': error,
+        'pid': os.getpid(),
+        'output': output.getvalue(),
+        # Seção do cache por registro renovada (volta do processo ao validador)
+        'records': cache.updated.get(name) if cache is not None else None,
+    }
+
+
+def run_checks(data, names=None, jobs=None):
+    """
+    Executa as verificações sobre `data` (entrada → valor)
+
+    `jobs=None` escolhe sozinho: em série para ontologias pequenas, um
+    processo por núcleo acima de PARALLEL_THRESHOLD registros. Os
+    resultados saem na ordem de registro; as seções do cache por registro
+    renovadas pelas verificações voltam para `data['records']`
+    """
+    plugins = registered_checks()
+    names = list(plugins) if names is None else list(names)
+    if jobs is None:
+        size = sum(len(value) for value in data.values() if isinstance(value, list))
+        jobs = (os.cpu_count() or 1) if size >= PARALLEL_THRESHOLD else 1
+    jobs = min(jobs, len(names))
+
+    if jobs <= 1:
+        return [_run_check(name, data) for name in names]
+
+    # Cada processo recebe só as entradas declaradas, uma vez
+    needed = {key for name in names for key in plugins[name].inputs}
+    shared = {key: data[key] for key in needed}
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                             initargs=(shared,)) as pool:
+        futures = [pool.submit(_run_check, name) for name in names]
+        runs = [future.result() for future in futures]
+    if 'records' in data:
+        data['records'].merge(runs)
+    return runs
+
+
+def write_json_report(runs, path, **extra):
+    """Relatório JSON com tempo, memória e achados por verificação"""
+    report = dict(extra)
+    report['ok'] = all(run['ok'] for run in runs)
+    report['checks'] = [{k: v for k, v in run.items() if k not in ('output', 'pid', 'records')}
+                        for run in runs]
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+def write_junit_report(runs, path, suite='ontologia'):
+    """Relatório JUnit XML (uma verificação = um caso de teste)"""
+    root = ET.Element('testsuite', {
+        'name': suite,
+        'tests': str(len(runs)),
+        'failures': str(sum(1 for r in runs if not r['ok'] and not r['error'])),
+        'errors': str(sum(1 for r in runs if r['error'])),
+        'time': f"{sum(r['seconds'] for r in runs):.6f}",
+    })
+    for run in runs:
+        case = ET.SubElement(root, 'testcase', {
+            'classname': f"ontology.checks.{run['kind']}",
+            'name': run['name'],
+            'time': f"{run['seconds']:.6f}",
+        })
+        if run['error']:
+            ET.SubElement(case, 'error', {'message': run['error']})
+        elif not run['ok']:
+            failure = ET.SubElement(case, 'failure', {'message': f"{run['findings']} achados"})
+            failure.text = run['output']
+        ET.SubElement(case, 'system-out').text = run['output']
+    ET.ElementTree(root).write(path, encoding='utf-8', xml_declaration=True)
@@ -0,0 +1,314 @@
+"""
+Histórico de versões da ontologia CRIOS (substitui os arquivos .backup)
+Cada registro (conceito, relação, referência) é serializado de forma canônica
+e endereçado pelo seu SHA-1; uma versão é apenas a lista ordenada de hashes
+de cada arquivo. Registros repetidos entre versões são guardados uma vez só
+
+Layout em `assets/.versions/`:
+    objects.pack    blocos zlib com os registros novos de cada versão
+    objects.idx     hash → (bloco, posição) em registros binários fixos
+    manifests.pack  listas de hashes, em delta zlib contra a versão anterior
+    versions.jsonl  uma linha por versão (o commit é a escrita desta linha)
+"""
+
+import hashlib
+import json
+import os
+import struct
+import zlib
+from datetime import datetime
+from difflib import SequenceMatcher
+
+from .io import (
+    ASSETS_DIR,
+    CONCEPTS_FILE,
+    REFERENCIAS_FILE,
+    RELATIONS_FILE,
+    load_json,
+    load_jsonl,
+    save_json,
+)
+
+VERSIONS_DIR = ASSETS_DIR / '.versions'
+
+TRACKED_FILES = {
+    'concepts': CONCEPTS_FILE,
+    'relations': RELATIONS_FILE,
+    'referencias': REFERENCIAS_FILE,
+}
+
+# Manifesto completo a cada N versões limita a cadeia de deltas
+KEYFRAME_INTERVAL = 16
+
+HASH_SIZE = 20
+INDEX_ENTRY = struct.Struct('<20sQIII')  # hash, offset do bloco, tamanho, início, tamanho
+
+
+def record_bytes(record):
+    """Serialização canônica (ordem das chaves preservada)"""
+    return json.dumps(record, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def record_hash(data):
+    return hashlib.sha1(data).digest()
+
+
+def _append_blob(path, data):
+    """Acrescenta bytes a um arquivo; retorna (offset, tamanho)"""
+    with open(path, 'ab') as f:
+        offset = f.tell()
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    return offset, len(data)
+
+
+def _read_blob(path, offset, length):
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        return f.read(length)
+
+
+def encode_manifest(hashes, parent=None):
+    """
+    Manifesto de um arquivo: lista de hashes, em delta contra `parent`
+
+    Operações em JSON: [início, fim] copia um trecho da lista anterior e um
+    inteiro n consome os próximos n hashes novos, gravados em binário logo
+    após o cabeçalho
+    """
+    ops = []
+    fresh = []
+    if parent:
+        matcher = SequenceMatcher(None, parent, hashes, autojunk=False)
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+            if tag == 'equal':
+                ops.append([i1, i2])
+            elif j2 > j1:
+                ops.append(j2 - j1)
+                fresh.extend(hashes[j1:j2])
+    elif hashes:
+        ops.append(len(hashes))
+        fresh = hashes
+    header = json.dumps(ops, separators=(',', ':')).encode('ascii')
+    return zlib.compress(struct.pack('<I', len(header)) + header + b''.join(fresh), 6)
+
+
+def decode_manifest(blob, parent=None):
+    data = zlib.decompress(blob)
+    (size,) = struct.unpack_from('<I', data)
+    cursor = 4 + size
+    hashes = []
+    for op in json.loads(data[4:cursor]):
+        if isinstance(op, list):
+            hashes.extend(parent[op[0]:op[1]])
+        else:
+            end = cursor + op * HASH_SIZE
+            hashes.extend(data[i:i + HASH_SIZE] for i in range(cursor, end, HASH_SIZE))
+            cursor = end
+    return hashes
+
+
+class VersionStore:
+    """Armazém de versões endereçado por conteúdo"""
+
+    def __init__(self, root=VERSIONS_DIR, files=TRACKED_FILES):
+        self.root = root
+        self.files = files
+        self.pack_file = root / 'objects.pack'
+        self.index_file = root / 'objects.idx'
+        self.manifest_file = root / 'manifests.pack'
+        self.log_file = root / 'versions.jsonl'
+        self._index = None
+        self._entries = None
+        self._blocks = {}
+        self._manifests = {}
+
+    # ------------------------------------------------------------------
+    # Objetos
+    # ------------------------------------------------------------------
+
+    @property
+    def index(self):
+        """hash → (offset do bloco, tamanho do bloco, início, tamanho)"""
+        if self._index is None:
+            self._index = {}
+            if self.index_file.exists():
+                data = self.index_file.read_bytes()
+                usable = len(data) - len(data) % INDEX_ENTRY.size
+                for digest, *location in INDEX_ENTRY.iter_unpack(data[:usable]):
+                    self._index.setdefault(digest, tuple(location))
+        return self._index
+
+    def put_records(self, records):
+        """Guarda registros novos num único bloco; retorna a lista de hashes"""
+        hashes = []
+        fresh = {}
+        for record in records:
+            data = record_bytes(record)
+            digest = record_hash(data)
+            hashes.append(digest)
+            if digest not in self.index and digest not in fresh:
+                fresh[digest] = data
+
+        if fresh:
+            block = bytearray()
+            spans = []
+            for digest, data in fresh.items():
+                spans.append((digest, len(block), len(data)))
+                block.extend(data)
+            offset, length = _append_blob(self.pack_file, zlib.compress(bytes(block), 6))
+            entries = b''.join(
+                INDEX_ENTRY.pack(digest, offset, length, start, size)
+                for digest, start, size in spans
+            )
+            _append_blob(self.index_file, entries)
+            for digest, start, size in spans:
+                self.index[digest] = (offset, length, start, size)
+        return hashes
+
+    def get_records(self, hashes):
+        """Registros (dicts) na ordem dos hashes"""
+        records = []
+        for digest in hashes:
+            offset, length, start, size = self.index[digest]
+            block = self._blocks.get(offset)
+            if block is None:
+                block = self._blocks[offset] = zlib.decompress(
+                    _read_blob(self.pack_file, offset, length)
+                )
+            records.append(json.loads(block[start:start + size]))
+        return records
+
+    # ------------------------------------------------------------------
+    # Versões
+    # ------------------------------------------------------------------
+
+    def versions(self):
+        if self._entries is None:
+            self._entries = load_jsonl(self.log_file)
+        return self._entries
+
+    def version(self, number):
+        for entry in self.versions():
+            if entry['version'] == number:
+                return entry
+        raise KeyError(f"Versão inexistente: {number}")
+
+    def manifest(self, number, name):
+        """Lista de hashes de um arquivo numa versão"""
+        key = (number, name)
+        if key not in self._manifests:
+            entry = self.version(number)['files'][name]
+            parent = None
+            if entry['base'] is not None:
+                parent = self.manifest(entry['base'], name)
+            blob = _read_blob(self.manifest_file, entry['offset'], entry['length'])
+            self._manifests[key] = decode_manifest(blob, parent)
+        return self._manifests[key]
+
+    def latest(self, name, versions=None):
+        """Última versão que contém o arquivo (ou None)"""
+        for entry in reversed(versions if versions is not None else self.versions()):
+            if name in entry['files']:
+                return entry
+        return None
+
+    def snapshot(self, label='', sources=None):
+        """
+        Registra o estado atual dos arquivos como nova versão
+
+        Retorna a entrada da versão, ou None se nada mudou desde a última
+        """
+        sources = sources or self.files
+        self.root.mkdir(parents=True, exist_ok=True)
+        versions = self.versions()
+        previous = {name: self.latest(name, versions) for name in sources}
+
+        current = {name: self.put_records(load_json(path)) for name, path in sources.items()}
+        if all(
+            previous[name] and self.manifest(previous[name]['version'], name) == hashes
+            for name, hashes in current.items()
+        ):
+            return None
+
+        number = versions[-1]['version'] + 1 if versions else 1
+        files = {}
+        for name, hashes in current.items():
+            parent_version = previous[name]
+            parent_entry = parent_version['files'][name] if parent_version else None
+            depth = parent_entry['depth'] + 1 if parent_entry else 0
+            base = parent_version['version'] if parent_entry and depth < KEYFRAME_INTERVAL else None
+            parent = self.manifest(base, name) if base is not None else None
+            offset, length = _append_blob(self.manifest_file, encode_manifest(hashes, parent))
+            files[name] = {
+                'count': len(hashes),
+                'base': base,
+                'depth': depth if base is not None else 0,
+                'offset': offset,
+                'length': length,
+            }
+            self._manifests[(number, name)] = hashes
+
+        entry = {
+            'version': number,
+            'time': datetime.now().isoformat(timespec='seconds'),
+            'label': label,
+            'files': files,
+        }
+        _append_blob(self.log_file, (json.dumps(entry, ensure_ascii=False) + '\n').encode('utf-8'))
+        self.versions().append(entry)
+        return entry
+
+    def restore(self, number, names=None):
+        """Regrava os arquivos rastreados com o conteúdo de uma versão"""
+        entry = self.version(number)
+        names = names or list(entry['files'])
+        for name in names:
+            save_json(self.files[name], self.get_records(self.manifest(number, name)))
+        return names
+
+    def diff(self, a, b, name):
+        """
+        Diferença de um arquivo entre duas versões (b=None: o arquivo atual,
+        sem registrá-lo como versão)
+
+        Retorna (adicionados, removidos) como listas de registros; registros
+        repetidos são contados como multiconjunto
+        """
+        old = self.manifest(a, name)
+        working = {}
+        if b is None:
+            new = []
+            for record in load_json(self.files[name]):
+                digest = record_hash(record_bytes(record))
+                working.setdefault(digest, record)
+                new.append(digest)
+        else:
+            new = self.manifest(b, name)
+        remaining = {}
+        for digest in old:
+            remaining[digest] = remaining.get(digest, 0) + 1
+        added = []
+        for digest in new:
+            if remaining.get(digest):
+                remaining[digest] -= 1
+            else:
+                added.append(digest)
+        removed = []
+        for digest in reversed(old):
+            if remaining.get(digest):
+                remaining[digest] -= 1
+                removed.append(digest)
+        removed.reverse()
+        if b is None:
+            return [working[digest] for digest in added], self.get_records(removed)
+        return self.get_records(added), self.get_records(removed)
+
+    def stored_bytes(self):
+        """Espaço ocupado pelo armazém"""
+        return sum(
+            path.stat().st_size
+            for path in (self.pack_file, self.index_file, self.manifest_file, self.log_file)
+            if path.exists()
+        )
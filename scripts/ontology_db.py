@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Banco SQLite da ontologia CRIOS (armazenamento opcional)
+
+Uso:
+    python3 scripts/ontology_db.py import            # JSON → assets/ontology.sqlite
+    python3 scripts/ontology_db.py export            # banco → JSON (determinístico)
+    python3 scripts/ontology_db.py query --to=vazio --verb-like='fundament%'
+    python3 scripts/ontology_db.py verbs [N]
+"""
+import sys
+
+from ontology.store import STORE_FILE, OntologyStore
+
+
+def parse_options(args):
+    """Lê opções no formato --chave=valor"""
+    options = {}
+    for arg in args:
+        if arg.startswith('--') and '=' in arg:
+            key, value = arg[2:].split('=', 1)
+            options[key.replace('-', '_')] = value
+    return options
+
+
+def main():
+    command = sys.argv[1] if len(sys.argv) > 1 else 'import'
+
+    # Abrir o banco o criaria vazio: sem arquivo, não há o que exportar
+    if command == 'export' and not STORE_FILE.exists():
+        print(f"❌ {STORE_FILE.name} não existe: rode 'make db-import' antes")
+        sys.exit(1)
+
+    with OntologyStore() as store:
+        if command == 'import':
+            n_concepts, n_relations, n_refs = store.import_json()
+            print(f"✅ {STORE_FILE.name}: {n_concepts} conceitos, "
+                  f"{n_relations} relações, {n_refs} referências")
+
+        elif command == 'export':
+            try:
+                store.export_json()
+            except ValueError as e:
+                print(f"❌ {e}")
+                sys.exit(1)
+            print("✅ concepts.json, relations.json e referencias.json exportados")
+
+        elif command == 'query':
+            options = parse_options(sys.argv[2:])
+            rows = store.relations_where(
+                from_id=options.get('from'),
+                to_id=options.get('to'),
+                verb=options.get('verb'),
+                verb_like=options.get('verb_like'),
+            )
+            for _, rel in rows:
+                print(f"{rel['from']} —[{rel['name']}]→ {rel['to']}")
+            print(f"\n🔗 {len(rows)} relações")
+
+        elif command == 'verbs':
+            limit = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+            for i, (verb, count) in enumerate(store.verb_counts().items(), 1):
+                if i > limit:
+                    break
+                print(f"{i:3d}. {verb:<35s} {count:4d} usos")
+
+        else:
+            print(f"❌ Comando desconhecido: {command}")
+            print(__doc__)
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
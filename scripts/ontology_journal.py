@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Journal de mudanças da ontologia CRIOS
+
+Uso:
+    python3 scripts/ontology_journal.py log [--all]   # transações pendentes (ou todo o histórico)
+    python3 scripts/ontology_journal.py undo          # desfaz a última transação
+    python3 scripts/ontology_journal.py redo          # refaz a última desfeita
+    python3 scripts/ontology_journal.py compact       # aplica pendentes nos JSON
+"""
+import sys
+from collections import Counter
+
+from ontology import OntologyGraph
+from ontology.journal import Journal
+
+
+def describe(tx):
+    """Resumo de uma transação: número, rótulo e operações por tipo"""
+    kinds = Counter(op['op'] for op in tx['ops'])
+    summary = ', '.join(f"{count} {kind}" for kind, count in sorted(kinds.items()))
+    return f"#{tx['tx']:<4d} {tx['time']}  {tx['label']:<28s} {summary}"
+
+
+def main():
+    command = sys.argv[1] if len(sys.argv) > 1 else 'log'
+    journal = Journal()
+
+    if command == 'log':
+        active, redo_stack = journal.state()
+        if '--all' in sys.argv:
+            history = journal.history()
+            print(f"📚 Histórico compactado ({len(history)} transações):")
+            for tx in history:
+                print(f"   {describe(tx)}")
+            print()
+        print(f"📝 Pendentes ({len(active)} transações):")
+        for tx in active:
+            print(f"   {describe(tx)}")
+        if redo_stack:
+            print(f"\n↩️  Desfeitas ({len(redo_stack)}, 'redo' para refazer):")
+            for tx in reversed(redo_stack):
+                print(f"   {describe(tx)}")
+
+    elif command == 'undo':
+        tx = journal.undo()
+        if tx is None:
+            print("ℹ️  Nada a desfazer")
+        else:
+            print(f"↩️  Desfeita: {describe(tx)}")
+
+    elif command == 'redo':
+        tx = journal.redo()
+        if tx is None:
+            print("ℹ️  Nada a refazer")
+        else:
+            print(f"↪️  Refeita: {describe(tx)}")
+
+    elif command == 'compact':
+        active = journal.pending()
+        if not active:
+            print("✅ Journal vazio, nada a compactar")
+            return
+        graph = OntologyGraph.load(journal_file=None)
+        missed = journal.replay(graph)
+        graph.journal = journal
+        graph.save()
+        print(f"✅ {len(active)} transações aplicadas em concepts.json e relations.json")
+        if missed:
+            print(f"⚠️  {missed} operações sem alvo foram ignoradas")
+
+    else:
+        print(f"❌ Comando desconhecido: {command}")
+        print(__doc__)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Relatório de estatísticas da ontologia CRIOS (make stats / stats-full / stats-quick)
+
+Uso:
+    python3 scripts/ontology_stats.py            # relatório padrão
+    python3 scripts/ontology_stats.py --full     # + distribuições, qualidade e cobertura
+    python3 scripts/ontology_stats.py --quick    # resumo de uma linha + camadas
+    python3 scripts/ontology_stats.py --json     # todas as métricas em JSON
+"""
+import json
+import sys
+
+from ontology.stats import compute_stats
+
+RULE = "━" * 54
+
+
+def print_stats(stats):
+    print(RULE)
+    print("📊 ESTATÍSTICAS COMPLETAS DA ONTOLOGIA CRIOS")
+    print(RULE)
+    print()
+
+    volumes = stats['volumes']
+    print("📚 VOLUMETRIA GERAL")
+    print(f"  • Conceitos:              {volumes['concepts']}")
+    print(f"  • Relações:               {volumes['relations']}")
+    print(f"  • Referências:            {volumes['references']}")
+    print(f"  • Tipos de relação:       {volumes['relation_types']}")
+    print()
+
+    print("🎯 DISTRIBUIÇÃO POR CAMADA")
+    for layer, count in stats['layers'].items():
+        print(f"  • {layer + ':':<20s} {count:3d} conceitos")
+    print()
+
+    conn = stats['connectivity']
+    print("🔗 CONECTIVIDADE")
+    print(f"  • Média de conexões:      {conn['avg']}")
+    print(f"  • Conceito mais conectado: {conn['max']['name']} ({conn['max']['count']} conexões)")
+    print(f"  • Conceito menos conectado: {conn['min']['name']} ({conn['min']['count']} conexões)")
+    print()
+
+    print("🌐 TOP 10 HUBS (PageRank ponderado pela classe do verbo)")
+    for i, hub in enumerate(stats['hubs'], 1):
+        print(f"  {i:2d}. {hub['name']:<40s} {hub['count']:2d} conexões  {hub['pagerank']:.4f}")
+    print()
+
+    print("📉 CONCEITOS SUB-CONECTADOS (≤ 3 conexões)")
+    print(f"  • Total: {stats['underconnected']} conceitos")
+    print()
+
+    print("🔀 TOP 10 TIPOS DE RELAÇÃO MAIS USADOS")
+    for i, (verb, count) in enumerate(stats['top_verbs'].items(), 1):
+        print(f"  {i:2d}. {verb:<35s} {count:3d} usos")
+    print()
+
+    print("📖 REFERÊNCIAS POR CATEGORIA")
+    for category, count in stats['reference_categories'].items():
+        print(f"  • {category + ':':<20s} {count:3d} referências")
+    print()
+
+    print("📅 LINHA DO TEMPO DAS REFERÊNCIAS")
+    for key, label in (('oldest', 'Mais antiga: '), ('newest', 'Mais recente:')):
+        ref = stats['timeline'].get(key)
+        if ref:
+            print(f"  • {label} {ref['autor']} ({ref['ano']}) - {ref['titulo']}")
+    print()
+
+    density = stats['density']
+    print("🎨 DENSIDADE DO RIZOMA")
+    print(f"  • Densidade teórica:      {density['percent']}%")
+    print(f"  • Relações/Conceito:      {density['relations_per_concept']}")
+    print()
+
+    print(RULE)
+    print("✨ Use 'make stats-full' para análise completa com gráficos")
+    print("✨ Use 'make balance-check' para verificar balanceamento de camadas")
+    print(RULE)
+
+
+def print_full(stats):
+    print(RULE)
+    print("📊 ANÁLISE COMPLETA DA ONTOLOGIA CRIOS")
+    print(RULE)
+    print_stats(stats)
+    print()
+
+    print("📊 DISTRIBUIÇÃO DE CONECTIVIDADE")
+    for count, n in stats['distribution'].items():
+        print(f"  • {count:3d} conexões: {n:3d} conceitos {'█' * ((n + 1) // 2)}")
+    print()
+
+    cultural = stats['cultural']
+    print("🌍 DIVERSIDADE GEOGRÁFICA/CULTURAL")
+    print(f"  • Conceitos budistas:     {cultural['budistas']}")
+    print(f"  • Conceitos taoistas:     {cultural['taoistas']}")
+    print(f"  • Conceitos confucianos:  {cultural['confucianos']}")
+    print(f"  • Conceitos africanos:    {cultural['africanos']}")
+    print(f"  • Conceitos indígenas:    {cultural['indígenas']}")
+    print()
+
+    quality = stats['quality']
+    print("🔬 ANÁLISE DE QUALIDADE")
+    print(f"  • Conceitos isolados (0 conexões): {quality['isolated']}")
+    print(f"  • Conceitos frágeis (1-2 conexões): {quality['fragile']}")
+    print(f"  • Conceitos bem conectados (≥5):    {quality['well_connected']}")
+    print(f"  • Super-hubs (≥10 conexões):        {quality['super_hubs']}")
+    print()
+
+    coverage = stats['coverage']
+    print("📚 COBERTURA BIBLIOGRÁFICA")
+    print(f"  • Conceitos com referências:  {coverage['with_references']}")
+    print(f"  • Conceitos sem referências:  {coverage['without_references']}")
+    print(f"  • Média refs/conceito:        {coverage['avg_refs_per_concept']}")
+    print()
+
+    print("⚖️ BALANCEAMENTO ENTRE CAMADAS")
+    layers = stats['layers']
+    largest = max(layers.values(), default=0)
+    for layer, count in layers.items():
+        print(f"  • {layer + ':':<20s} {count:3d} conceitos {'█' * (count * 30 // largest)}")
+    ratio = stats['balance_ratio']
+    status = '✅ BOM' if ratio < 3 else '⚠️  MODERADO' if ratio < 5 else '❌ CRÍTICO'
+    print(f"  Razão max/min: {ratio:.2f}x {status}")
+    print()
+    print(RULE)
+
+
+def print_quick(stats):
+    volumes = stats['volumes']
+    print(f"📊 Rizoma: {volumes['concepts']} conceitos, {volumes['relations']} relações, "
+          f"{volumes['references']} referências")
+    for layer, count in stats['layers'].items():
+        print(f"   • {layer}: {count}")
+
+
+def main():
+    stats = compute_stats()
+
+    if '--json' in sys.argv:
+        print(json.dumps(stats, ensure_ascii=False, indent=2))
+    elif '--full' in sys.argv:
+        print_full(stats)
+    elif '--quick' in sys.argv:
+        print_quick(stats)
+    else:
+        print_stats(stats)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Histórico de versões da ontologia CRIOS
+
+Uso:
+    python3 scripts/ontology_versions.py snapshot [rótulo]
+    python3 scripts/ontology_versions.py list
+    python3 scripts/ontology_versions.py diff A [B]          # sem B, compara com os arquivos atuais
+    python3 scripts/ontology_versions.py restore N [--only=relations]
+    python3 scripts/ontology_versions.py import ARQUIVO concepts|relations|referencias
+"""
+import sys
+
+from ontology.journal import Journal
+from ontology.versions import TRACKED_FILES, VersionStore
+
+
+def describe(entry):
+    counts = ', '.join(f"{f['count']} {name}" for name, f in entry['files'].items())
+    label = f"  {entry['label']}" if entry['label'] else ''
+    return f"v{entry['version']:<4d} {entry['time']}  {counts}{label}"
+
+
+def record_line(name, record):
+    if name == 'relations':
+        return f"{record['from']} —[{record['name']}]→ {record['to']}"
+    if name == 'concepts':
+        return f"{record['id']} ({record.get('layer', '?')})"
+    return record.get('id', str(record)[:60])
+
+
+def print_diff(store, a, b=None):
+    """Diferença entre as versões a e b (b=None: arquivos atuais)"""
+    print(f"🔍 v{a} → {'atual' if b is None else f'v{b}'}")
+    names = store.files if b is None else store.version(b)['files']
+    for name in names:
+        if name not in store.version(a)['files']:
+            continue
+        added, removed = store.diff(a, b, name)
+        if not added and not removed:
+            continue
+        print(f"\n📄 {name}: +{len(added)} / -{len(removed)}")
+        # Conceitos com o mesmo ID dos dois lados foram alterados, não trocados
+        if name == 'concepts':
+            old = {c['id']: c for c in removed}
+            for concept in added:
+                before = old.pop(concept['id'], None)
+                if before is None:
+                    print(f"   + {record_line(name, concept)}")
+                    continue
+                fields = sorted(k for k in set(before) | set(concept) if before.get(k) != concept.get(k))
+                print(f"   ~ {concept['id']}: {', '.join(fields)}")
+            removed = list(old.values())
+        else:
+            for record in added[:50]:
+                print(f"   + {record_line(name, record)}")
+        for record in removed[:50]:
+            print(f"   - {record_line(name, record)}")
+
+
+def main():
+    command = sys.argv[1] if len(sys.argv) > 1 else 'list'
+    args = [a for a in sys.argv[2:] if not a.startswith('--')]
+    store = VersionStore()
+
+    if command == 'snapshot':
+        entry = store.snapshot(' '.join(args))
+        if entry is None:
+            print("✅ Nada mudou desde a última versão")
+        else:
+            print(f"📸 {describe(entry)}")
+            print(f"   Armazém: {store.stored_bytes() / 1024:.0f} KB")
+
+    elif command == 'list':
+        versions = store.versions()
+        if not versions:
+            print("ℹ️  Nenhuma versão registrada ('snapshot' cria a primeira)")
+        for entry in versions:
+            print(describe(entry))
+
+    elif command == 'diff':
+        a = int(args[0])
+        # Sem B compara com os arquivos atuais, sem criar versão
+        b = int(args[1]) if len(args) > 1 else None
+        print_diff(store, a, b)
+
+    elif command == 'restore':
+        number = int(args[0])
+        if Journal().pending():
+            print("❌ Há transações pendentes no journal: rode 'make journal-compact' antes")
+            sys.exit(1)
+        only = [a.split('=', 1)[1] for a in sys.argv[2:] if a.startswith('--only=')]
+        backup = store.snapshot(f'antes de restaurar v{number}')
+        if backup:
+            print(f"📸 Estado atual salvo como v{backup['version']}")
+        names = store.restore(number, only or None)
+        print(f"✅ v{number} restaurada: {', '.join(names)}")
+
+    elif command == 'import':
+        path, name = args[0], args[1]
+        if name not in TRACKED_FILES:
+            print(f"❌ Arquivo desconhecido: {name} (use {', '.join(TRACKED_FILES)})")
+            sys.exit(1)
+        entry = store.snapshot(f'importado de {path}', sources={name: path})
+        print(f"📥 {describe(entry)}" if entry else "✅ Conteúdo idêntico à última versão")
+
+    else:
+        print(f"❌ Comando desconhecido: {command}")
+        print(__doc__)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -4,61 +4,158 @@ Script para propor novas relações entre conceitos baseado em análise semânti
 Foca em conectar conceitos isolados e sub-conectados.
 """
 
-import json
-from collections import defaultdict
-import re
-
-def load_data():
-    with open('assets/concepts.json', 'r', encoding='utf-8') as f:
-        concepts = json.load(f)
-    with open('assets/relations.json', 'r', encoding='utf-8') as f:
-        relations = json.load(f)
-    return concepts, relations
-
-def analyze_connectivity(concepts, relations):
+from collections import Counter, defaultdict
+
+from ontology import PROPOSALS_FILE, OntologyGraph, load_json, pair_key, save_json
+
+# Vizinhos no embedding espectral que ganham bônus estrutural no score
+STRUCTURAL_NEIGHBORS = 20
+STRUCTURAL_WEIGHT = 0.25
+
+# Alvos a 2 passos (predição de links) que ganham bônus de vizinhança
+LINK_CANDIDATES = 30
+LINK_WEIGHT = 0.25
+
+# Vizinhos TF-IDF (nome + descrição) avaliados por conceito
+TEXT_NEIGHBORS = 30
+
+# Cosseno TF-IDF mínimo para propor uma relação (abaixo disso os textos
+# costumam ter só palavras genéricas em comum)
+MIN_TEXT_SIMILARITY = 0.1
+
+# Com menos vizinhos TF-IDF que isso acima do limiar, o índice invertido
+# completa os candidatos com conceitos que têm ≥ MIN_COMMON_WORDS palavras
+# em comum (sem stopwords)
+MIN_TEXT_CANDIDATES = 5
+MIN_COMMON_WORDS = 2
+
+def analyze_connectivity(graph):
     """Analisa conectividade dos conceitos"""
-    concept_index = {c['id']: c for c in concepts}
     connection_count = defaultdict(int)
-    existing_pairs = set()
+    for concept_id, rels in graph.out_edges.items():
+        connection_count[concept_id] += len(rels)
+    for concept_id, rels in graph.in_edges.items():
+        connection_count[concept_id] += len(rels)
     
-    for rel in relations:
-        connection_count[rel['from']] += 1
-        connection_count[rel['to']] += 1
-        pair = tuple(sorted([rel['from'], rel['to']]))
-        existing_pairs.add(pair)
+    existing_pairs = set(graph.pairs)
     
-    return concept_index, connection_count, existing_pairs
+    return graph.by_id, connection_count, existing_pairs
+
+def structural_similarity(concepts):
+    """
+    {id: {id vizinho: similaridade}} pelos vizinhos mais próximos no
+    embedding espectral do snapshot (KD-tree, O(n log n) no total)
+    """
+    from ontology.embedding import load_embedding, structural_neighbors
+    from ontology.snapshot import load_snapshot
+    snapshot = load_snapshot()
+    csr = snapshot.csr
+    vectors, _ = load_embedding(snapshot)
+    nodes = [csr.index[c['id']] for c in concepts if c['id'] in csr.index]
+    neighbors = structural_neighbors(vectors, STRUCTURAL_NEIGHBORS, nodes)
+    return {csr.ids[node]: {csr.ids[other]: similarity for other, similarity in found}
+            for node, found in neighbors.items()}
+
+def link_similarity(concepts):
+    """
+    {id: {id alvo: score relativo}} dos alvos a 2 passos de cada conceito
+    (alocação de recursos × camada, todos os pares de uma vez)
+    """
+    from ontology.linkpred import candidates_by_id
+    from ontology.snapshot import load_snapshot
+    links = candidates_by_id(load_snapshot().csr, [c['id'] for c in concepts], k=LINK_CANDIDATES)
+    result = {}
+    for cid, ranked in links.items():
+        top = ranked[0][0] if ranked and ranked[0][0] > 0 else 1
+        result[cid] = {other_id: score / top for score, other_id in ranked}
+    return result
 
-def find_semantic_matches(concept, all_concepts, existing_pairs, concept_index):
-    """Encontra matches semânticos para um conceito"""
+def text_similarity(concepts, all_concepts):
+    """
+    {id: {id vizinho: cosseno}} dos vizinhos TF-IDF de cada conceito,
+    calculados para todos de uma vez e guardados junto ao snapshot
+    """
+    from ontology.textsim import similar_by_id
+    return similar_by_id([c['id'] for c in concepts], concepts=all_concepts, k=TEXT_NEIGHBORS)
+
+def concept_keywords(concept):
+    """Palavras do nome + descrição (tokenizadas uma vez por texto, cache em disco)"""
+    from ontology.text import words
+    return frozenset(words(concept['name'] + ' ' + concept.get('description', '')))
+
+def content_keywords(concept):
+    """Palavras-chave sem stopwords"""
+    from ontology.text import STOPWORDS, fold
+    return frozenset(word for word in concept_keywords(concept) if fold(word) not in STOPWORDS)
+
+class KeywordIndex:
+    """
+    Índice invertido palavra → conceitos, montado uma vez por rodada
+    
+    `candidates()` percorre só as listas das palavras do conceito e conta
+    quantas cada outro conceito compartilha (custo ~ tamanho das listas)
+    """
+    
+    def __init__(self, concepts):
+        self.concepts = concepts
+        self.keywords = [content_keywords(c) for c in concepts]
+        self.postings = defaultdict(list)
+        for position, keywords in enumerate(self.keywords):
+            for word in keywords:
+                self.postings[word].append(position)
+    
+    def candidates(self, keywords, min_common=MIN_COMMON_WORDS):
+        """Posições (em ordem) dos conceitos com ≥ min_common palavras em comum"""
+        shared = Counter()
+        for word in keywords:
+            shared.update(self.postings.get(word, ()))
+        return sorted(position for position, count in shared.items() if count >= min_common)
+
+def find_semantic_matches(concept, existing_pairs, concept_index, text, structural=None, links=None,
+                          keyword_index=None):
+    """
+    Encontra matches semânticos para um conceito
+    
+    Os vizinhos TF-IDF (`text`, {id: cosseno}) com cosseno ≥
+    MIN_TEXT_SIMILARITY são avaliados com o cosseno como score base; se
+    forem menos de MIN_TEXT_CANDIDATES, `keyword_index` completa com os
+    conceitos de ≥ 2 palavras em comum, pela fração de palavras comuns
+    """
     proposals = []
     cid = concept['id']
-    layer = concept['layer']
-    name = concept['name'].lower()
-    desc = concept.get('description', '').lower()
     
-    # Palavras-chave do conceito
-    keywords = set(re.findall(r'\w+', name + ' ' + desc))
+    # Palavras-chave do conceito (sem stopwords)
+    keywords = content_keywords(concept)
     
-    for other in all_concepts:
-        if other['id'] == cid:
+    candidates = {other_id: similarity for other_id, similarity in text.items()
+                  if similarity >= MIN_TEXT_SIMILARITY}
+    if len(candidates) < MIN_TEXT_CANDIDATES and keyword_index is not None:
+        for position in keyword_index.candidates(keywords):
+            other_keywords = keyword_index.keywords[position]
+            overlap = len(keywords & other_keywords) / max(len(keywords), len(other_keywords))
+            candidates.setdefault(keyword_index.concepts[position]['id'], overlap)
+    
+    for other_id, base in candidates.items():
+        if other_id == cid or other_id not in concept_index:
             continue
+        other = concept_index[other_id]
         
         # Verificar se relação já existe
-        pair = tuple(sorted([cid, other['id']]))
+        pair = pair_key(cid, other_id)
         if pair in existing_pairs:
             continue
         
-        other_name = other['name'].lower()
-        other_desc = other.get('description', '').lower()
-        other_keywords = set(re.findall(r'\w+', other_name + ' ' + other_desc))
+        # Palavras em comum (sem stopwords), usadas para inferir o verbo
+        common = set(keywords & content_keywords(other))
+        score = base
         
-        # Calcular similaridade
-        common = keywords & other_keywords
-        if len(common) < 2:  # Requer pelo menos 2 palavras em comum
-            continue
+        # Bônus para vizinhos no embedding espectral (mesma região do grafo)
+        proximity = (structural or {}).get(other_id, 0.0)
+        score += STRUCTURAL_WEIGHT * max(proximity, 0.0)
         
-        score = len(common) / max(len(keywords), len(other_keywords))
+        # Bônus para alvos com vizinhos em comum (predição de links)
+        shared = (links or {}).get(other_id, 0.0)
+        score += LINK_WEIGHT * shared
         
         # Relações conceituais específicas
         relation_type, relation_desc = infer_relation_type(
@@ -68,10 +165,13 @@ def find_semantic_matches(concept, all_concepts, existing_pairs, concept_index):
         if relation_type:
             proposals.append({
                 'from': cid,
-                'to': other['id'],
+                'to': other_id,
                 'name': relation_type,
                 'description': relation_desc,
                 'score': score,
+                'text': text.get(other_id, 0.0),
+                'structural': proximity,
+                'links': shared,
                 'common_words': list(common)
             })
     
@@ -134,24 +234,23 @@ def infer_relation_type(concept, other, common_words, concept_index):
     return 'relaciona-se com', f"{concept['name']} relaciona-se com {other['name']}"
 
 def main():
-    concepts, relations = load_data()
+    graph = OntologyGraph.load()
+    concepts = graph.concepts
     
     # Carregar propostas anteriores para não duplicar
     try:
-        with open('assets/new_relations_proposals.json', 'r', encoding='utf-8') as f:
-            previous_proposals = json.load(f)
+        previous_proposals = load_json(PROPOSALS_FILE)
         print(f"📋 Propostas anteriores carregadas: {len(previous_proposals)}")
     except FileNotFoundError:
         previous_proposals = []
     
-    concept_index, connection_count, existing_pairs = analyze_connectivity(concepts, relations)
+    concept_index, connection_count, existing_pairs = analyze_connectivity(graph)
     
     # Adicionar propostas anteriores ao conjunto de pares existentes
     for rel in previous_proposals:
         connection_count[rel['from']] += 1
         connection_count[rel['to']] += 1
-        pair = tuple(sorted([rel['from'], rel['to']]))
-        existing_pairs.add(pair)
+        existing_pairs.add(pair_key(rel['from'], rel['to']))
     
     print("🔍 BUSCANDO NOVAS RELAÇÕES SEMÂNTICAS (RODADA 3)...\n")
     
@@ -161,10 +260,17 @@ def main():
     print(f"Analisando {len(underconnected)} conceitos sub-conectados...")
     print(f"Pares existentes: {len(existing_pairs)}\n")
     
+    structural = structural_similarity(underconnected)
+    links = link_similarity(underconnected)
+    text = text_similarity(underconnected, concepts)
+    keyword_index = KeywordIndex(concepts)
     new_relations = []
     
     for concept in underconnected:
-        proposals = find_semantic_matches(concept, concepts, existing_pairs, concept_index)
+        proposals = find_semantic_matches(concept, existing_pairs, concept_index,
+                                          text.get(concept['id'], {}),
+                                          structural.get(concept['id']), links.get(concept['id']),
+                                          keyword_index)
         
         if proposals:
             # Pegar top 3-5 relações mais relevantes
@@ -176,7 +282,7 @@ def main():
             for p in top:
                 target = concept_index[p['to']]
                 print(f"   → {p['name']:20s} {target['name']:40s} ({target['layer']})")
-                print(f"      Score: {p['score']:.2f} | Palavras: {', '.join(p['common_words'][:5])}")
+                print(f"      Score: {p['score']:.2f} | Texto: {p['text']:.2f} | Estrutura: {p['structural']:.2f} | Vizinhança: {p['links']:.2f} | Palavras: {', '.join(p['common_words'][:5])}")
                 
                 new_relations.append({
                     'from': p['from'],
@@ -186,8 +292,7 @@ def main():
                 })
                 
                 # Adicionar aos pares existentes para evitar duplicatas nas próximas iterações
-                pair = tuple(sorted([p['from'], p['to']]))
-                existing_pairs.add(pair)
+                existing_pairs.add(pair_key(p['from'], p['to']))
     
     print(f"\n\n📊 RESUMO:")
     print(f"   Novas relações propostas: {len(new_relations)}")
@@ -195,8 +300,7 @@ def main():
     
     if new_relations:
         # Salvar propostas
-        with open('assets/new_relations_proposals.json', 'w', encoding='utf-8') as f:
-            json.dump(new_relations, f, ensure_ascii=False, indent=2)
+        save_json(PROPOSALS_FILE, new_relations)
         
         print(f"\n✅ Propostas salvas em: assets/new_relations_proposals.json")
         print(f"\n   Para aplicar: python3 scripts/apply_new_relations.py")
@@ -2,31 +2,23 @@
 """
 Rebalances layer distribution by intelligently reassigning concepts
 """
-import json
 import time
-from pathlib import Path
 from collections import Counter
 
-def load_json(filepath):
-    with open(filepath, 'r', encoding='utf-8') as f:
-        return json.load(f)
+from ontology import ASSETS_DIR, OntologyGraph, load_json, save_json
+from ontology.text import fold
 
-def save_json(filepath, data):
-    with open(filepath, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+HISTORY_FILE = ASSETS_DIR / 'rebalance_history.json'
 
 def load_history():
     """Carrega histórico de movimentos recentes"""
-    history_file = Path("assets/rebalance_history.json")
     try:
-        with open(history_file, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        return load_json(HISTORY_FILE)
     except FileNotFoundError:
         return []
 
 def save_history(new_moves):
     """Salva histórico mantendo últimas 200 movimentações"""
-    history_file = Path("assets/rebalance_history.json")
     history = load_history()
     
     # Adiciona timestamp aos novos movimentos
@@ -38,8 +30,7 @@ def save_history(new_moves):
     history.extend(new_moves)
     history = history[-200:]
     
-    with open(history_file, 'w', encoding='utf-8') as f:
-        json.dump(history, f, ensure_ascii=False, indent=2)
+    save_json(HISTORY_FILE, history)
 
 def was_recently_moved(concept_id, from_layer, to_layer, history):
     """Verifica se movimento reverso ocorreu recentemente (últimas 2 execuções = ~80 movimentos)"""
@@ -52,7 +43,7 @@ def was_recently_moved(concept_id, from_layer, to_layer, history):
     
     return False
 
-def infer_level_from_concept(concept, relations):
+def infer_level_from_concept(concept, graph):
     """Infere o nível (0-3) baseado na ontologia relacional do conceito"""
     concept_id = concept['id']
     
@@ -64,19 +55,19 @@ def infer_level_from_concept(concept, relations):
         3: ['concreto', 'específico', 'caso', 'exemplo', 'implementação', 'prática', 'experiência']
     }
     
-    desc = concept.get('description', '').lower()
-    name = concept.get('name', '').lower()
+    desc = fold(concept.get('description', ''))
+    name = fold(concept.get('name', ''))
     
-    # Score por nível baseado em keywords
+    # Score por nível baseado em keywords (sem acentos dos dois lados)
     level_scores = {}
     for level, keywords in level_indicators.items():
-        level_scores[level] = sum(1 for kw in keywords if kw in desc or kw in name)
+        level_scores[level] = sum(1 for kw in map(fold, keywords) if kw in desc or kw in name)
     
     # Analisa relações para inferir nível
     # Conceitos que fundamentam outros → nível mais baixo (0-1)
     # Conceitos fundamentados por muitos → nível mais alto (2-3)
-    fundamenta_count = sum(1 for r in relations if r['from'] == concept_id and 'fundament' in r['name'])
-    fundamentado_count = sum(1 for r in relations if r['to'] == concept_id and 'fundament' in r['name'])
+    fundamenta_count = sum(1 for r in graph.relations_from(concept_id) if 'fundament' in r['name'])
+    fundamentado_count = sum(1 for r in graph.relations_to(concept_id) if 'fundament' in r['name'])
     
     if fundamenta_count > fundamentado_count * 2:
         level_scores[0] = level_scores.get(0, 0) + 3
@@ -90,10 +81,10 @@ def infer_level_from_concept(concept, relations):
         return 1
     return max(level_scores.items(), key=lambda x: x[1])[0]
 
-def analyze_concept_for_layer(concept, relations):
+def analyze_concept_for_layer(concept, graph):
     """Suggest possible layers for a concept based on its description and connections"""
-    desc = concept.get('description', '').lower()
-    name = concept.get('name', '').lower()
+    desc = fold(concept.get('description', ''))
+    name = fold(concept.get('name', ''))
     
     # Keywords for each dimension
     dimension_keywords = {
@@ -108,12 +99,12 @@ def analyze_concept_for_layer(concept, relations):
     }
     
     # Infere o nível ideal baseado na ontologia
-    ideal_level = infer_level_from_concept(concept, relations)
+    ideal_level = infer_level_from_concept(concept, graph)
     
     scores = {}
     # Score dimensions com níveis diferenciados
     for dimension, keywords in dimension_keywords.items():
-        base_score = sum(1 for kw in keywords if kw in desc or kw in name)
+        base_score = sum(1 for kw in map(fold, keywords) if kw in desc or kw in name)
         
         # Distribui scores com preferência pelo nível inferido
         for level in range(4):
@@ -128,16 +119,12 @@ def analyze_concept_for_layer(concept, relations):
     return scores
 
 def main():
-    assets_dir = Path(__file__).parent.parent / 'assets'
-    concepts_file = assets_dir / 'concepts.json'
-    relations_file = assets_dir / 'relations.json'
-    
     print("⚖️  REBALANCEAMENTO DE CAMADAS")
     print("=" * 70)
     
     # Load data
-    concepts = load_json(concepts_file)
-    relations = load_json(relations_file)
+    graph = OntologyGraph.load()
+    concepts = graph.concepts
     history = load_history()  # Carrega histórico de movimentos
     
     # Current distribution
@@ -186,7 +173,7 @@ def main():
             continue
             
         # Get layer scores based on content and ontological relations
-        scores = analyze_concept_for_layer(concept, relations)
+        scores = analyze_concept_for_layer(concept, graph)
         
         # Find best alternative layer that's under-represented
         # Prefer layers with similar dimension when possible
@@ -271,7 +258,8 @@ def main():
     # Save
     if applied > 0:
         print(f"\n💾 Salvando {applied} mudanças...")
-        save_json(concepts_file, concepts)
+        # Via graph.save(): se havia transações no journal, compacta e arquiva
+        graph.save(relations_file=None)
         print(f"   ✅ Conceitos atualizados")
         
         # Salva histórico de movimentos para prevenir oscilação
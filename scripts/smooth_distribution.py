@@ -2,47 +2,18 @@
 """
 Suaviza a distribuição de conectividade para aproximar de uma curva normal
 Foco em redistribuir o pico excessivo em 6 conexões
+
+Uso:
+    python3 scripts/smooth_distribution.py         # lê e grava os JSON
+    python3 scripts/smooth_distribution.py --db    # grava no banco SQLite e exporta os JSON
 """
-import json
-import math
 import random
-from pathlib import Path
+import sys
 from collections import Counter
 
-def load_json(filepath):
-    with open(filepath, 'r', encoding='utf-8') as f:
-        return json.load(f)
-
-def save_json(filepath, data):
-    with open(filepath, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
-
-def calculate_stats(connections):
-    n = len(connections)
-    mean = sum(connections) / n
-    variance = sum((x - mean) ** 2 for x in connections) / n
-    std_dev = math.sqrt(variance)
-    skewness = sum((x - mean) ** 3 for x in connections) / (n * std_dev ** 3) if std_dev > 0 else 0
-    kurtosis = sum((x - mean) ** 4 for x in connections) / (n * std_dev ** 4) - 3 if std_dev > 0 else 0
-    return mean, std_dev, skewness, kurtosis
-
-def score_normality(connections):
-    n = len(connections)
-    mean, std_dev, skewness, kurtosis = calculate_stats(connections)
-    
-    within_1sigma = sum(1 for x in connections if abs(x - mean) <= std_dev)
-    within_2sigma = sum(1 for x in connections if abs(x - mean) <= 2 * std_dev)
-    
-    deviation_1sigma = abs(within_1sigma/n*100 - 68)
-    deviation_2sigma = abs(within_2sigma/n*100 - 95)
-    
-    score = 100
-    score -= min(deviation_1sigma * 2, 30)
-    score -= min(deviation_2sigma * 1, 20)
-    score -= min(abs(skewness) * 20, 20)
-    score -= min(abs(kurtosis) * 10, 15)
-    
-    return score, mean, std_dev, skewness, kurtosis
+from ontology import OntologyGraph
+from ontology.distribution import DegreeAccumulator
+from ontology.store import STORE_FILE, open_store
 
 def find_weak_connections(concept, all_concepts):
     """Encontra conexões que podem ser removidas (menos críticas)"""
@@ -82,22 +53,18 @@ def find_good_connections(concept, all_concepts, max_results=3):
     candidates.sort(key=lambda x: (-x[0], random.random()))
     return [c[1] for c in candidates[:max_results]]
 
-def main():
-    assets_dir = Path(__file__).parent.parent / 'assets'
-    concepts_file = assets_dir / 'concepts.json'
-    relations_file = assets_dir / 'relations.json'
-    
-    print("🎨 SUAVIZAÇÃO DA DISTRIBUIÇÃO DE CONECTIVIDADE")
-    print("=" * 70)
-    
-    # Load data
-    concepts = load_json(concepts_file)
-    relations = load_json(relations_file)
+def smooth(graph, store=None):
+    """Redistribui as conexões do grafo e salva (no banco SQLite se `store`)"""
+    concepts = graph.concepts
     
     # Current state
     connections = [len(c['connections']) for c in concepts]
     dist = Counter(connections)
-    score_before, mean_before, std_before, skew_before, kurt_before = score_normality(connections)
+    # Somas de potências atualizadas a cada conexão movida (sem reescanear)
+    degrees = DegreeAccumulator(connections)
+    before = degrees.normality()
+    score_before, mean_before, std_before = before['score'], before['mean'], before['std']
+    skew_before, kurt_before = before['skewness'], before['kurtosis']
     
     print(f"\n📊 ESTADO ATUAL:")
     print(f"   Score normalidade: {score_before:.0f}/100")
@@ -116,7 +83,7 @@ def main():
     print(f"   Meta: 40% ir para 5, 60% ir para 7-8")
     
     # Build concept index
-    concepts_by_id = {c['id']: c for c in concepts}
+    concepts_by_id = graph.by_id
     concepts_by_conn = {}
     for c in concepts:
         n = len(c['connections'])
@@ -138,18 +105,17 @@ def main():
         if weak_conns:
             to_remove = weak_conns[0]
             concept['connections'].remove(to_remove)
+            degrees.change(len(concept['connections']) + 1, len(concept['connections']))
             
             # Remove from other concept too
             if to_remove in concepts_by_id:
                 other = concepts_by_id[to_remove]
                 if concept['id'] in other['connections']:
                     other['connections'].remove(concept['id'])
+                    degrees.change(len(other['connections']) + 1, len(other['connections']))
             
             # Remove relations
-            relations[:] = [r for r in relations if not (
-                (r['from'] == concept['id'] and r['to'] == to_remove) or
-                (r['from'] == to_remove and r['to'] == concept['id'])
-            )]
+            graph.remove_relations_between(concept['id'], to_remove)
             
             reduced += 1
             if reduced % 20 == 0:
@@ -185,9 +151,11 @@ def main():
             if other['id'] not in concept['connections']:
                 concept['connections'].append(other['id'])
                 other['connections'].append(concept['id'])
+                degrees.change(len(concept['connections']) - 1, len(concept['connections']))
+                degrees.change(len(other['connections']) - 1, len(other['connections']))
                 
                 # Add relation
-                relations.append({
+                graph.add_relation({
                     'from': concept['id'],
                     'to': other['id'],
                     'name': 'relaciona-se com',
@@ -204,7 +172,9 @@ def main():
     # Final state
     connections_new = [len(c['connections']) for c in concepts]
     dist_new = Counter(connections_new)
-    score_after, mean_after, std_after, skew_after, kurt_after = score_normality(connections_new)
+    after = degrees.normality()
+    score_after, mean_after, std_after = after['score'], after['mean'], after['std']
+    skew_after, kurt_after = after['skewness'], after['kurtosis']
     
     print(f"\n📊 RESULTADO:")
     print(f"   Score normalidade: {score_before:.0f} → {score_after:.0f}")
@@ -221,9 +191,31 @@ def main():
     
     # Save
     print(f"\n💾 Salvando mudanças...")
-    save_json(concepts_file, concepts)
-    save_json(relations_file, relations)
+    if store is not None:
+        # Só as linhas alteradas/removidas/novas são gravadas; os JSON saem do banco
+        changed = store.save_graph(graph)
+        store.export_json(referencias_file=None)
+        print(f"   ✅ {STORE_FILE.name}: {changed['concepts'][0]} conceitos alterados, "
+              f"{changed['relations'][1]} relações removidas, {changed['relations'][2]} incluídas")
+    else:
+        graph.save()
     print(f"   ✅ Arquivos atualizados")
+
+def main():
+    print("🎨 SUAVIZAÇÃO DA DISTRIBUIÇÃO DE CONECTIVIDADE")
+    print("=" * 70)
+    
+    # Load data
+    if '--db' in sys.argv:
+        try:
+            store = open_store()
+        except ValueError as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+        with store:
+            smooth(store.graph(), store)
+    else:
+        smooth(OntologyGraph.load())
     
     print("\n" + "=" * 70)
     print("✨ Suavização concluída!")
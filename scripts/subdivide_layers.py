@@ -8,17 +8,17 @@ Exemplo:
 - Todas com mesma importância, apenas variações temáticas
 """
 
-import json
 from collections import defaultdict
 
+from ontology import BASE_DIR, OntologyGraph
+from ontology.text import fold
+
 def load_data():
-    with open('assets/concepts.json', 'r', encoding='utf-8') as f:
-        concepts = json.load(f)
-    return concepts
+    return OntologyGraph.load()
 
-def save_data(concepts):
-    with open('assets/concepts.json', 'w', encoding='utf-8') as f:
-        json.dump(concepts, f, ensure_ascii=False, indent=2)
+def save_data(graph):
+    # Via graph.save(): se havia transações no journal, compacta e arquiva
+    graph.save(relations_file=None)
 
 def analyze_layer_themes(concepts_in_layer):
     """
@@ -44,11 +44,11 @@ def analyze_layer_themes(concepts_in_layer):
     # Conta score de cada tema para cada conceito
     concept_themes = []
     for concept in concepts_in_layer:
-        desc_lower = concept['description'].lower()
+        desc_lower = fold(concept['description'])
         theme_scores = {}
         
         for theme, keywords in theme_keywords.items():
-            score = sum(1 for kw in keywords if kw in desc_lower)
+            score = sum(1 for kw in keywords if fold(kw) in desc_lower)
             if score > 0:
                 theme_scores[theme] = score
         
@@ -71,7 +71,8 @@ def subdivide_large_layers(threshold=80):
     print("=" * 70)
     print("Abordagem: multiplicidade horizontal, sem hierarquia\n")
     
-    concepts = load_data()
+    graph = load_data()
+    concepts = graph.concepts
     
     # Agrupa por camada
     by_layer = defaultdict(list)
@@ -145,7 +146,7 @@ def subdivide_large_layers(threshold=80):
             print(f"   ⚠ Temas muito distribuídos, mantendo camada única")
     
     if changes:
-        save_data(concepts)
+        save_data(graph)
         
         print(f"\n\n✅ RESULTADO:")
         print(f"   Total de conceitos reclassificados: {len(changes)}")
@@ -162,7 +163,7 @@ def subdivide_large_layers(threshold=80):
             print(f"   {layer:20s} {count:3d} {bar}")
         
         # Salva log de mudanças
-        with open('docs/SUBDIVISAO_CAMADAS.md', 'w', encoding='utf-8') as f:
+        with open(BASE_DIR / 'docs' / 'SUBDIVISAO_CAMADAS.md', 'w', encoding='utf-8') as f:
             f.write("# Subdivisão de Camadas\n\n")
             f.write("Variações cromáticas horizontais (sem hierarquia)\n\n")
             f.write("## Mudanças\n\n")
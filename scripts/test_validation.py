@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Teste de regressão do validador incremental (ontology/validation.py)
+Relações repetidas sem problemas (lista vazia) não podem virar None no cache
+
+Uso:
+    python3 scripts/test_validation.py
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+from ontology.validation import IncrementalValidator
+
+CONCEPTS = [
+    {'id': 'vazio', 'name': 'Vazio', 'description': 'O vazio que povoa', 'layer': 'fundacional'},
+    {'id': 'tempo', 'name': 'Tempo', 'description': 'Duração e devir', 'layer': 'temporal'},
+]
+RELATION = {'from': 'vazio', 'to': 'tempo', 'name': 'relaciona-se com', 'description': 'teste'}
+
+
+def check(label, condition):
+    print(f"   {'✅' if condition else '❌'} {label}")
+    return condition
+
+
+def main():
+    print('🧪 Testando validador incremental com relações duplicadas...\n')
+    relations = [dict(RELATION), dict(RELATION), dict(RELATION)]
+    ok = True
+
+    # Sem cache (modo completo de `make validate`)
+    result = IncrementalValidator().validate(CONCEPTS, relations)
+    ok &= check('sem cache: 2 relações duplicadas', result.relation_duplicates == 2)
+    ok &= check('sem cache: nenhum problema por relação', result.relation_issues == [])
+
+    # Com cache em disco: segunda rodada reaproveita as entradas vazias
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        validator = IncrementalValidator(tmp / 'validation.pickle', tmp / 'validation.json')
+        validator.validate(CONCEPTS, relations)
+        validator.save()
+        again = IncrementalValidator.load(tmp / 'validation.pickle', tmp / 'validation.json')
+        result = again.validate(CONCEPTS, relations + [dict(RELATION)])
+        ok &= check('com cache: 3 relações duplicadas', result.relation_duplicates == 3)
+        ok &= check('com cache: nada reverificado', result.checked_relations == 0)
+
+    print('\n✅ Todos os testes passaram' if ok else '\n❌ Falhas encontradas')
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
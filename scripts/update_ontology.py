@@ -2,24 +2,44 @@
 """
 Script de atualização e validação completa da ontologia CRIOS
 Executa verificações de qualidade, mesclas, validações e estatísticas
+
+Uso:
+    python3 scripts/update_ontology.py                  # validação completa
+    python3 scripts/update_ontology.py --incremental    # só registros alterados
+    python3 scripts/update_ontology.py --since=HEAD     # + problemas do que mudou desde HEAD
+    python3 scripts/update_ontology.py --jobs=8         # verificações em 8 processos
+    python3 scripts/update_ontology.py --timings        # + tempo/memória por verificação
+    python3 scripts/update_ontology.py --json=r.json --junit=r.xml
+    python3 scripts/update_ontology.py --watch          # revalida a cada gravação
 """
 
+import contextlib
+import io
 import json
+import os
+import subprocess
 import sys
-from collections import Counter, defaultdict
-from pathlib import Path
-
-# Caminhos dos arquivos
-BASE_DIR = Path(__file__).parent.parent
-CONCEPTS_FILE = BASE_DIR / 'assets' / 'concepts.json'
-RELATIONS_FILE = BASE_DIR / 'assets' / 'relations.json'
-REFERENCIAS_FILE = BASE_DIR / 'assets' / 'referencias.json'
-
-# Camadas ontológicas canônicas
-CANONICAL_LAYERS = {
-    'fundacional', 'ontologica', 'epistemica', 'politica',
-    'etica', 'temporal', 'ecologica', 'pratica'
-}
+import time
+
+from ontology import (
+    BASE_DIR,
+    CONCEPTS_FILE,
+    OntologyGraph,
+    REFERENCIAS_FILE,
+    RELATIONS_FILE,
+    load_json,
+)
+from ontology.checks import print_section
+from ontology.validation import (
+    IncrementalValidator,
+    ValidationWatcher,
+    changed_records,
+    concept_issues,
+    relation_issues,
+    run_checks,
+    write_json_report,
+    write_junit_report,
+)
 
 # Verbos por camada para geração de relações
 LAYER_VERBS = {
@@ -58,256 +78,84 @@ LAYER_VERBS = {
 }
 
 
-def load_json(filepath):
-    """Carrega arquivo JSON com encoding UTF-8"""
-    with open(filepath, 'r', encoding='utf-8') as f:
-        return json.load(f)
-
-
-def save_json(filepath, data):
-    """Salva arquivo JSON com encoding UTF-8 e formatação"""
-    with open(filepath, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
-
-
-def print_section(title):
-    """Imprime seção formatada"""
-    print(f"\n{'='*60}")
-    print(f"  {title}")
-    print(f"{'='*60}\n")
-
-
-def check_duplicates(concepts):
-    """Verifica duplicações de ID e nome"""
-    print_section("1. VERIFICAÇÃO DE DUPLICATAS")
-    
-    ids = [c['id'] for c in concepts]
-    names = [c['name'] for c in concepts]
-    
-    id_counts = Counter(ids)
-    name_counts = Counter(names)
-    
-    id_dups = {k: v for k, v in id_counts.items() if v > 1}
-    name_dups = {k: v for k, v in name_counts.items() if v > 1}
-    
-    if id_dups:
-        print(f"❌ {len(id_dups)} IDs duplicados:")
-        for dup_id, count in id_dups.items():
-            print(f"   • {dup_id} ({count}×)")
-    else:
-        print("✅ Nenhum ID duplicado")
-    
-    if name_dups:
-        print(f"❌ {len(name_dups)} nomes duplicados:")
-        for dup_name, count in name_dups.items():
-            print(f"   • {dup_name} ({count}×)")
-    else:
-        print("✅ Nenhum nome duplicado")
-    
-    return len(id_dups) == 0 and len(name_dups) == 0
-
-
-def check_required_fields(concepts):
-    """Verifica campos obrigatórios"""
-    print_section("2. VERIFICAÇÃO DE CAMPOS OBRIGATÓRIOS")
-    
-    critical_errors = []
-    warnings = []
-    
-    for c in concepts:
-        if not c.get('id'):
-            critical_errors.append(f"❌ Sem ID: {c.get('name', 'SEM NOME')}")
-        if not c.get('name'):
-            critical_errors.append(f"❌ Sem nome: {c.get('id', 'SEM ID')}")
-        if not c.get('description') or len(c.get('description', '')) < 20:
-            warnings.append(f"⚠️  Descrição curta (<20 chars): {c['id']}")
-        if not c.get('layer'):
-            critical_errors.append(f"❌ Sem camada: {c['id']}")
-        if not c.get('connections') or len(c.get('connections', [])) == 0:
-            warnings.append(f"⚠️  Sem conexões: {c['id']}")
-    
-    if critical_errors:
-        print(f"❌ {len(critical_errors)} erros críticos encontrados:")
-        for issue in critical_errors[:20]:
-            print(f"   {issue}")
-        if len(critical_errors) > 20:
-            print(f"   ... e mais {len(critical_errors) - 20} erros")
-    
-    if warnings:
-        print(f"⚠️  {len(warnings)} avisos encontrados:")
-        for issue in warnings[:10]:
-            print(f"   {issue}")
-        if len(warnings) > 10:
-            print(f"   ... e mais {len(warnings) - 10} avisos")
-    
-    if not critical_errors and not warnings:
-        print("✅ Todos os conceitos têm campos obrigatórios")
-    
-    # Only fail on critical errors, not warnings
-    return len(critical_errors) == 0
-
-
-def check_orphan_references(concepts):
-    """Verifica referências órfãs nas conexões"""
-    print_section("3. VERIFICAÇÃO DE REFERÊNCIAS ÓRFÃS")
-    
-    all_ids = set(c['id'] for c in concepts)
-    orphan_refs = set()
-    
-    for c in concepts:
-        for conn in c.get('connections', []):
-            if conn not in all_ids:
-                orphan_refs.add(f"{c['id']} → {conn}")
-    
-    if orphan_refs:
-        print(f"❌ {len(orphan_refs)} referências órfãs:")
-        for ref in sorted(list(orphan_refs))[:20]:
-            print(f"   {ref}")
-        if len(orphan_refs) > 20:
-            print(f"   ... e mais {len(orphan_refs) - 20} referências")
-    else:
-        print("✅ Todas as conexões são válidas (0 órfãs)")
-    
-    return len(orphan_refs) == 0
-
-
-def analyze_layer_distribution(concepts):
-    """Analisa distribuição por camada"""
-    print_section("4. DISTRIBUIÇÃO POR CAMADA")
-    
-    layer_dist = Counter(c.get('layer') for c in concepts)
-    
-    print(f"Total de conceitos: {len(concepts)}\n")
-    for layer in CANONICAL_LAYERS:
-        count = layer_dist.get(layer, 0)
-        pct = (count / len(concepts) * 100) if concepts else 0
-        print(f"  {layer:12s}: {count:3d} ({pct:5.1f}%)")
-    
-    # Camadas não-canônicas
-    non_canonical = {k: v for k, v in layer_dist.items() if k not in CANONICAL_LAYERS}
-    if non_canonical:
-        print(f"\n⚠️  Camadas não-canônicas encontradas:")
-        for layer, count in non_canonical.items():
-            print(f"  {layer}: {count}")
-
-
-def analyze_connections(concepts):
-    """Analisa estatísticas de conexões"""
-    print_section("5. ESTATÍSTICAS DE CONEXÕES")
-    
-    conn_counts = [len(c.get('connections', [])) for c in concepts]
-    
-    if conn_counts:
-        avg = sum(conn_counts) / len(conn_counts)
-        print(f"  Média:   {avg:.1f} conexões/conceito")
-        print(f"  Mínima:  {min(conn_counts)}")
-        print(f"  Máxima:  {max(conn_counts)}")
-        
-        # Top conceitos mais conectados
-        most_connected = sorted(
-            [(c['id'], c['name'], len(c.get('connections', []))) for c in concepts],
-            key=lambda x: -x[2]
-        )[:10]
-        
-        print(f"\n  Top 10 mais conectados:")
-        for cid, name, count in most_connected:
-            print(f"    • {name} ({count})")
-
-
-def check_relations_integrity(concepts, relations):
-    """Verifica integridade das relações"""
-    print_section("6. VERIFICAÇÃO DE RELAÇÕES")
-    
-    all_ids = set(c['id'] for c in concepts)
-    
-    issues = []
-    for rel in relations:
-        if rel['from'] not in all_ids:
-            issues.append(f"❌ ID origem não existe: {rel['from']} → {rel['to']}")
-        if rel['to'] not in all_ids:
-            issues.append(f"❌ ID destino não existe: {rel['from']} → {rel['to']}")
-        if rel['from'] == rel['to']:
-            issues.append(f"⚠️  Auto-relação: {rel['from']}")
-    
-    if issues:
-        print(f"⚠️  {len(issues)} problemas encontrados:")
-        for issue in issues[:20]:
-            print(f"   {issue}")
-        if len(issues) > 20:
-            print(f"   ... e mais {len(issues) - 20} problemas")
-    else:
-        print(f"✅ Todas as {len(relations)} relações são válidas")
-    
-    # Verificar duplicatas
-    seen = set()
-    duplicates = 0
-    for rel in relations:
-        key = (rel['from'], rel['to'])
-        if key in seen:
-            duplicates += 1
-        seen.add(key)
-    
-    if duplicates > 0:
-        print(f"⚠️  {duplicates} relações duplicadas")
+def load_revision(rev, path):
+    """Conteúdo JSON de um arquivo numa revisão do git (None se indisponível)"""
+    try:
+        output = subprocess.run(
+            ['git', 'show', f'{rev}:{path.relative_to(BASE_DIR).as_posix()}'],
+            cwd=BASE_DIR, capture_output=True, check=True,
+        ).stdout
+        return json.loads(output)
+    except (OSError, subprocess.CalledProcessError, ValueError):
+        return None
+
+
+def report_changes_since(rev, concepts, relations):
+    """Problemas dos registros alterados desde uma revisão do git"""
+    print_section(f"MUDANÇAS DESDE {rev}")
+    
+    old_concepts = load_revision(rev, CONCEPTS_FILE)
+    old_relations = load_revision(rev, RELATIONS_FILE)
+    if old_concepts is None or old_relations is None:
+        print(f"⚠️  Não foi possível ler os JSON em {rev}")
+        return
+    
+    ids = {c['id'] for c in concepts if c.get('id')}
+    removed_ids = {c['id'] for c in old_concepts if c.get('id')} - ids
+    changed_concepts = changed_records(old_concepts, concepts)
+    changed_relations = changed_records(old_relations, relations)
+    # Relações intactas que apontam para conceitos removidos também contam
+    changed_keys = {id(r) for r in changed_relations}
+    dependents = [r for r in relations
+                  if id(r) not in changed_keys and (r['from'] in removed_ids or r['to'] in removed_ids)]
+    
+    print(f"  Conceitos alterados/novos: {len(changed_concepts)}")
+    print(f"  Conceitos removidos:       {len(removed_ids)}")
+    print(f"  Relações alteradas/novas:  {len(changed_relations)}")
+    print(f"  Relações afetadas:         {len(dependents)}")
+    
+    problems = []
+    for concept in changed_concepts:
+        found = concept_issues(concept, ids)
+        problems += found['critical'] + found['warnings'] + found['orphans']
+    for relation in changed_relations + dependents:
+        problems += relation_issues(relation, ids)
+    
+    if problems:
+        print(f"\n⚠️  {len(problems)} problemas nos registros alterados:")
+        for problem in problems[:30]:
+            print(f"   {problem}")
+        if len(problems) > 30:
+            print(f"   ... e mais {len(problems) - 30} problemas")
     else:
-        print(f"✅ Nenhuma relação duplicada")
-    
-    return len(issues) == 0 and duplicates == 0
+        print("\n✅ Nenhum problema nos registros alterados")
 
 
-def analyze_relation_verbs(relations):
-    """Analisa distribuição de verbos nas relações"""
-    print_section("7. ANÁLISE DE VERBOS SEMÂNTICOS")
-    
-    verb_counts = Counter(r['name'] for r in relations)
-    
-    print(f"Total de relações: {len(relations)}")
-    print(f"Verbos únicos: {len(verb_counts)}\n")
-    
-    print("Top 15 verbos mais usados:")
-    for verb, count in verb_counts.most_common(15):
-        pct = (count / len(relations) * 100) if relations else 0
-        print(f"  {verb:25s}: {count:4d} ({pct:5.1f}%)")
+class _Tee(io.StringIO):
+    """Escreve no stdout e guarda uma cópia do texto"""
 
+    def __init__(self, stream):
+        super().__init__()
+        self.stream = stream
 
-def compare_with_literature(concepts, referencias):
-    """Compara conceitos do rizoma com literatura"""
-    print_section("8. COMPARAÇÃO COM LITERATURA")
-    
-    # Conceitos na literatura
-    lit_concepts = set()
-    for ref in referencias:
-        for c in ref.get('conceitos', []):
-            lit_concepts.add(c)
-    
-    # Conceitos no rizoma
-    riz_concepts = set(c['name'] for c in concepts)
-    
-    # Conceitos produzidos (não mapeados na literatura)
-    produced = riz_concepts - lit_concepts
-    
-    print(f"📚 Conceitos na literatura: {len(lit_concepts)}")
-    print(f"🌐 Conceitos no rizoma: {len(riz_concepts)}")
-    print(f"✨ Conceitos produzidos: {len(produced)} ({len(produced)/len(riz_concepts)*100:.1f}%)")
-    print(f"🔗 Conceitos mapeados: {len(riz_concepts & lit_concepts)}")
+    def write(self, text):
+        self.stream.write(text)
+        return super().write(text)
 
 
-def print_final_statistics(concepts, relations):
-    """Imprime estatísticas finais"""
-    print_section("ESTATÍSTICAS FINAIS")
-    
-    print(f"📚 Conceitos: {len(concepts)}")
-    print(f"🔗 Relações: {len(relations)}")
-    print(f"🎯 Verbos únicos: {len(set(r['name'] for r in relations))}")
-    print(f"📊 Camadas: {len(CANONICAL_LAYERS)}")
-    
-    conn_counts = [len(c.get('connections', [])) for c in concepts]
-    if conn_counts:
-        print(f"🌐 Média de conexões: {sum(conn_counts)/len(conn_counts):.1f}")
+def print_timings(runs, wall, jobs):
+    """Tabela de tempo, pico de memória e achados por verificação"""
+    print_section(f"TEMPO POR VERIFICAÇÃO ({jobs} processo{'s' if jobs > 1 else ''})")
+    for run in sorted(runs, key=lambda r: -r['seconds']):
+        status = '❌' if run['error'] else '✅' if run['ok'] else '⚠️ '
+        print(f"  {status} {run['name']:22s} {run['seconds'] * 1000:8.1f} ms "
+              f"{run['peak_bytes'] / 2**20:7.2f} MB {run['findings']:6d} achados")
+    print(f"\n  Tempo total: {wall * 1000:.1f} ms")
+    print()
 
 
-def main():
-    """Função principal"""
+def run_validation(validator, jobs=None):
+    """Carrega, valida e imprime o relatório; retorna (ok, cache, grafo, execuções)"""
     print("\n" + "="*60)
     print("  ATUALIZAÇÃO E VALIDAÇÃO DA ONTOLOGIA CRIOS")
     print("="*60)
@@ -315,8 +163,8 @@ def main():
     # Carregar dados
     print("\nCarregando arquivos...")
     try:
-        concepts = load_json(CONCEPTS_FILE)
-        relations = load_json(RELATIONS_FILE)
+        graph = OntologyGraph.load()
+        concepts, relations = graph.concepts, graph.relations
         referencias = load_json(REFERENCIAS_FILE)
         print(f"✅ {len(concepts)} conceitos carregados")
         print(f"✅ {len(relations)} relações carregadas")
@@ -325,20 +173,23 @@ def main():
         print(f"❌ Erro ao carregar arquivos: {e}")
         sys.exit(1)
     
-    # Executar verificações
+    # Executar verificações (só registros novos/alterados se houver cache)
+    cache = validator.cache_for(concepts)
+    data = {
+        'concepts': concepts,
+        'relations': relations,
+        'referencias': referencias,
+        'records': cache,
+    }
+    runs = run_checks(data, jobs=jobs)
+    validator.commit(cache)
     all_ok = True
     
-    all_ok &= check_duplicates(concepts)
-    all_ok &= check_required_fields(concepts)
-    all_ok &= check_orphan_references(concepts)
-    analyze_layer_distribution(concepts)
-    analyze_connections(concepts)
-    all_ok &= check_relations_integrity(concepts, relations)
-    analyze_relation_verbs(relations)
-    compare_with_literature(concepts, referencias)
-    
-    # Estatísticas finais
-    print_final_statistics(concepts, relations)
+    for run in runs:
+        print(run['output'], end='')
+        if run['error']:
+            print(f"❌ Verificação '{run['name']}' falhou: {run['error']}")
+        all_ok &= run['ok']
     
     # Resultado final
     print("\n" + "="*60)
@@ -348,6 +199,109 @@ def main():
         print("  ⚠️  VALIDAÇÃO COMPLETA: PROBLEMAS ENCONTRADOS")
     print("="*60 + "\n")
     
+    return all_ok, cache, graph, runs
+
+
+# Máximo de problemas listados por rodada no modo --watch
+WATCH_LIMIT = 30
+
+WATCH_NAMES = {
+    'concepts': 'concepts.json',
+    'relations': 'relations.json',
+    'journal': 'journal',
+}
+
+
+def print_changes(label, problems):
+    listed = sorted(problems.elements())
+    for problem in listed[:WATCH_LIMIT]:
+        print(f"   {label} {problem}")
+    if len(listed) > WATCH_LIMIT:
+        print(f"   ... e mais {len(listed) - WATCH_LIMIT}")
+
+
+def watch():
+    """Modo --watch: revalida a cada gravação e mostra só o que mudou"""
+    watcher = ValidationWatcher()
+    print("👀 Observando concepts.json, relations.json e o journal (Ctrl+C para sair)")
+    try:
+        watcher.refresh()
+    except (OSError, ValueError) as e:
+        print(f"❌ Erro ao carregar arquivos: {e}")
+        return 1
+    print(f"   {sum(watcher.problems.values())} problemas atuais")
+    
+    def on_change(changed, result, new, resolved, seconds):
+        files = ', '.join(WATCH_NAMES[name] for name in changed)
+        print(f"\n[{time.strftime('%H:%M:%S')}] {files}: {result.checked_concepts} conceitos e "
+              f"{result.checked_relations} relações reverificados em {seconds * 1000:.0f} ms")
+        print_changes("➕", new)
+        print_changes("✔️  resolvido:", resolved)
+        if not new and not resolved:
+            print("   (nenhum problema novo ou resolvido)")
+        print(f"   {sum(watcher.problems.values())} problemas atuais")
+    
+    def on_error(exc):
+        print(f"\n[{time.strftime('%H:%M:%S')}] ⏳ JSON inválido, aguardando a próxima gravação: {exc}")
+    
+    try:
+        watcher.watch(on_change, on_error)
+    except KeyboardInterrupt:
+        print("\n👋 Modo watch encerrado")
+    return 0
+
+
+def option(name):
+    """Valor de uma opção --nome=valor (None se ausente)"""
+    values = [a.split('=', 1)[1] for a in sys.argv[1:] if a.startswith(f'--{name}=')]
+    return values[-1] if values else None
+
+
+def main():
+    """Função principal"""
+    if '--watch' in sys.argv:
+        return watch()
+    
+    incremental = '--incremental' in sys.argv
+    since = option('since')
+    jobs = int(option('jobs')) if option('jobs') else None
+    json_report = option('json')
+    junit_report = option('junit')
+    wants_runs = '--timings' in sys.argv or json_report or junit_report
+    
+    start = time.perf_counter()
+    validator = IncrementalValidator.load() if incremental else IncrementalValidator()
+    if incremental and not (since or wants_runs) and validator.unchanged():
+        # Nenhum arquivo mudou: o último relatório continua válido
+        print(validator.report, end='')
+        print("♻️  Nenhuma mudança desde a última validação (relatório em cache)\n")
+        return 0 if validator.ok else 1
+    
+    with contextlib.redirect_stdout(_Tee(sys.stdout)) as report:
+        all_ok, cache, graph, runs = run_validation(validator, jobs)
+    wall = time.perf_counter() - start
+    
+    if incremental:
+        validator.remember(report.getvalue(), all_ok)
+        validator.save()
+        print(f"♻️  Incremental: {cache.checked('concepts')} conceitos e "
+              f"{cache.checked('relations')} relações reverificados (demais do cache)\n")
+    
+    processes = len({run['pid'] for run in runs})
+    if '--timings' in sys.argv:
+        print_timings(runs, wall, processes)
+    if json_report:
+        write_json_report(runs, json_report, wall_seconds=wall, processes=processes,
+                          cpus=os.cpu_count())
+        print(f"📄 Relatório JSON: {json_report}")
+    if junit_report:
+        write_junit_report(runs, junit_report)
+        print(f"📄 Relatório JUnit: {junit_report}")
+    
+    if since:
+        report_changes_since(since, graph.concepts, graph.relations)
+        print()
+    
     return 0 if all_ok else 1
 
 
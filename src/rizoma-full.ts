@@ -34,6 +34,7 @@ if (savedTheme === 'light') {
 let concepts = [];
 let relations = []; // Nomes das relações entre conceitos
 let clusterMetadata = null; // Metadados de clusters para visualização (opcional)
+let layoutPositions = new Map(); // id -> [x, y, z] pré-calculado (assets/layout.json, opcional)
 
 // Cache de conexões para performance
 let connectionCache = new Map(); // conceptName -> array de nomes conectados
@@ -309,6 +310,33 @@ function getBaseLayer(layer: string): string {
     return layer.replace(/-[0-3]$/, '');
 }
 
+/**
+ * Comunidade estrutural de um conceito (analyze_clusters.py, chave 'communities')
+ * Retorna undefined sem metadados estáticos ou se o conceito não foi agrupado
+ */
+function getCommunity(conceptId: string | number) {
+    const label = clusterMetadata?.communities?.membership?.[String(conceptId)];
+    if (label === undefined) return undefined;
+    return clusterMetadata.communities.clusters?.find(cluster => cluster.id === label);
+}
+
+/**
+ * Cluster de um conceito: a comunidade estrutural, se houver metadados,
+ * senão a própria camada (layer_clusters / cálculo dinâmico)
+ */
+function getClusterKey(concept): string {
+    const community = getCommunity(concept.id);
+    return community ? `comunidade-${community.id}` : (concept.layer || 'undefined');
+}
+
+/**
+ * Camada que dá cor e densidade ao cluster de um conceito: a camada
+ * dominante da comunidade, ou a camada do próprio conceito
+ */
+function getClusterLayer(concept): string {
+    return getCommunity(concept.id)?.dominant_layer || concept.layer || 'undefined';
+}
+
 /**
  * Calcula dinamicamente o grau (número de conexões) de um conceito
  * Usa cache para performance
@@ -333,6 +361,10 @@ function getSameLayerDegree(conceptId: string | number, layer: string): number {
  */
 function isHub(conceptId: string | number, layer: string): boolean {
     const id = String(conceptId);
+    // Rankings estruturais (PageRank ponderado) de analyze_clusters.py, se houver
+    const structural = clusterMetadata?.node_scores?.[id];
+    if (structural) return structural.hub;
+
     const concept = concepts.find(c => String(c.id) === id);
     if (!concept) return false;
     
@@ -382,6 +414,10 @@ function isBridge(conceptId: string | number): boolean {
  */
 function getClusterScore(conceptId: string | number, layer: string): number {
     const id = String(conceptId);
+    // Percentil do PageRank ponderado (0-1) calculado offline, se houver
+    const structural = clusterMetadata?.node_scores?.[id];
+    if (structural) return structural.score;
+
     const concept = concepts.find(c => String(c.id) === id);
     if (!concept) return 0;
     
@@ -452,10 +488,11 @@ async function loadConcepts() {
         const response = await fetch('assets/concepts.json');
         const data = await response.json();
         
-        // Atribuir cores baseadas na camada (não mais no JSON)
+        // Atribuir cores pelo cluster: camada dominante da comunidade
+        // estrutural, ou a própria camada sem cluster_metadata.json
         concepts = data.map(concept => ({
             ...concept,
-            color: getColorForLayer(concept.layer)
+            color: getColorForLayer(getClusterLayer(concept))
         }));
     } catch (error) {
         console.error('❌ Erro ao carregar assets/concepts.json:', error);
@@ -594,6 +631,29 @@ async function loadClusterMetadata() {
     }
 }
 
+/**
+ * Carrega o layout 3D pré-calculado no build (make layout)
+ * Formato compacto: ids + vetor plano [x0, y0, z0, x1, ...]
+ */
+async function loadLayout() {
+    try {
+        const response = await fetch('assets/layout.json');
+        const layout = await response.json();
+        layoutPositions = new Map();
+        layout.ids.forEach((id, i) => {
+            const x = layout.positions[3 * i];
+            const y = layout.positions[3 * i + 1];
+            const z = layout.positions[3 * i + 2];
+            if (isFinite(x) && isFinite(y) && isFinite(z)) {
+                layoutPositions.set(id, [x, y, z]);
+            }
+        });
+    } catch (error) {
+        // Layout é opcional - sem ele os nós são posicionados e relaxados aqui
+        layoutPositions = new Map();
+    }
+}
+
 // ============================================================================
 // INICIALIZAÇÃO
 // ============================================================================
@@ -639,10 +699,11 @@ function centerOnMostConnectedNode() {
 }
 
 async function init() {
-    // Carregar conceitos e relações primeiro
+    // Metadados de cluster antes dos conceitos (cores por comunidade)
+    await loadClusterMetadata();
     await loadConcepts();
     await loadRelations();
-    await loadClusterMetadata();
+    await loadLayout();
     
     if (concepts.length === 0) {
         console.error('❌ Nenhum conceito carregado. Abortando inicialização.');
@@ -1052,19 +1113,22 @@ function createNodes() {
     // Geometria compartilhada com menos segmentos para melhor performance
     const sharedGeometry = new THREE.SphereGeometry(20, 16, 16); // Reduz de 32 para 16 segmentos
 
-    // Agrupar conceitos por camada
-    const conceptsByLayer = new Map();
+    // Agrupar conceitos por cluster (comunidade estrutural ou camada)
+    const conceptsByCluster = new Map();
+    const clusterLayers = new Map(); // cluster -> camada de referência (densidade)
     concepts.forEach(concept => {
-        const layer = concept.layer || 'undefined';
-        if (!conceptsByLayer.has(layer)) {
-            conceptsByLayer.set(layer, []);
+        const cluster = getClusterKey(concept);
+        if (!conceptsByCluster.has(cluster)) {
+            conceptsByCluster.set(cluster, []);
+            clusterLayers.set(cluster, getClusterLayer(concept));
         }
-        conceptsByLayer.get(layer).push(concept);
+        conceptsByCluster.get(cluster).push(concept);
     });
 
-    const layers = Array.from(conceptsByLayer.keys());
+    const clusters = Array.from(conceptsByCluster.keys());
+    let precomputedCount = 0; // Nós posicionados pelo layout pré-calculado
 
-    // DISTRIBUIÇÃO HÍBRIDA: Clusters por camada com raio proporcional ao número de conceitos
+    // DISTRIBUIÇÃO HÍBRIDA: Clusters (comunidades ou camadas) com raio proporcional ao número de conceitos
     // Calcular raio do cluster baseado na proporção de conceitos e densidade da camada
     const calculateClusterRadius = (layerSize: number, totalSize: number, layer: string): number => {
         // Raio proporcional à raiz cúbica do número de conceitos (volume esférico)
@@ -1095,24 +1159,25 @@ function createNodes() {
     };
 
     // Posicionar centros dos clusters uniformemente na esfera usando Fibonacci melhorado
-    const layerCenters = new Map();
+    const clusterCenters = new Map();
     
     // Usar Fibonacci sphere com golden ratio para máxima uniformidade
     const goldenRatio = (1 + Math.sqrt(5)) / 2;
     
-    layers.forEach((layer, idx) => {
+    clusters.forEach((cluster, idx) => {
         // Fibonacci sphere melhorado
         const i = idx + 0.5;
-        const phi = Math.acos(1 - 2 * i / layers.length);
+        const phi = Math.acos(1 - 2 * i / clusters.length);
         const theta = 2 * Math.PI * i / goldenRatio;
         
-        const layerSize = conceptsByLayer.get(layer).length;
-        const clusterRadius = calculateClusterRadius(layerSize, concepts.length, layer);
+        const clusterSize = conceptsByCluster.get(cluster).length;
+        const layer = clusterLayers.get(cluster);
+        const clusterRadius = calculateClusterRadius(clusterSize, concepts.length, layer);
         
         // Obter densidade do cluster se disponível
         const density = clusterMetadata?.layer_clusters?.[layer]?.density || 0;
         
-        layerCenters.set(layer, {
+        clusterCenters.set(cluster, {
             x: Math.sin(phi) * Math.cos(theta),
             y: Math.sin(phi) * Math.sin(theta),
             z: Math.cos(phi),
@@ -1123,11 +1188,12 @@ function createNodes() {
 
     concepts.forEach((concept, i) => {
         const layer = concept.layer || 'undefined';
-        const layerConcepts = conceptsByLayer.get(layer);
-        const layerIndex = layerConcepts.indexOf(concept);
+        const cluster = getClusterKey(concept);
+        const clusterConcepts = conceptsByCluster.get(cluster);
+        const clusterIndex = clusterConcepts.indexOf(concept);
         
-        // Centro e raio do cluster da camada
-        const center = layerCenters.get(layer);
+        // Centro e raio do cluster do conceito
+        const center = clusterCenters.get(cluster);
         const clusterRadius = center.radius;
         
         // DISTRIBUIÇÃO MELHORADA: Fibonacci sphere com jitter controlado
@@ -1136,14 +1202,14 @@ function createNodes() {
         const goldenAngle = 2 * Math.PI / (goldenRatio * goldenRatio);
         
         // Índice normalizado [0, 1]
-        const t = layerIndex / Math.max(1, layerConcepts.length - 1);
+        const t = clusterIndex / Math.max(1, clusterConcepts.length - 1);
         
         // Ângulo polar com pequeno jitter para evitar padrões regulares
         const jitter = (Math.random() - 0.5) * 0.05; // ±2.5% de variação
         const phi = Math.acos(1 - 2 * (t + jitter));
         
         // Ângulo azimutal usando golden angle
-        const theta = goldenAngle * layerIndex;
+        const theta = goldenAngle * clusterIndex;
         
         // Raio com variação baseada na densidade (hubs mais centrais, bridges mais periféricos)
         let radiusMultiplier = clusterRadius;
@@ -1234,8 +1300,12 @@ function createNodes() {
         
         const sphere = new THREE.Mesh(sharedGeometry, material);
         
-        // Validar que não temos NaN
-        if (!isFinite(finalX) || !isFinite(finalY) || !isFinite(finalZ)) {
+        // Posição pré-calculada no build tem prioridade
+        const precomputed = layoutPositions.get(concept.id);
+        if (precomputed) {
+            sphere.position.set(precomputed[0], precomputed[1], precomputed[2]);
+            precomputedCount++;
+        } else if (!isFinite(finalX) || !isFinite(finalY) || !isFinite(finalZ)) {
             // Fallback silencioso: posição simples na esfera
             const fallbackPhi = Math.acos(1 - 2 * i / concepts.length);
             const fallbackTheta = 2 * Math.PI * i / ((1 + Math.sqrt(5)) / 2);
@@ -1277,6 +1347,9 @@ function createNodes() {
         createLabel(concept.name, sphere);
     });
     
+    // Layout completo vindo do build: já está relaxado (Barnes-Hut offline)
+    if (precomputedCount === concepts.length) return;
+    
     // Aplicar relaxamento cibernético: auto-organização através de feedback iterativo
     // Mais iterações = maior elasticidade, força decresce = homeostase emergente
     applyForceDirectedRelaxation(8); // 8 iterações para elasticidade cibernética